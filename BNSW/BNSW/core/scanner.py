@@ -8,32 +8,107 @@ Classes:
     Scanner: Main class for Nmap scanning operations
 """
 
+import functools
+import contextlib
+import collections
+import ipaddress
 import os
 import re
 import sys
 import time
 import uuid
 import shlex
-import tempfile
+import selectors
 import threading
 import subprocess
+import concurrent.futures
 import xml.etree.ElementTree as ET
 from datetime import datetime
 from typing import Dict, List, Any, Callable, Optional, Tuple
 
+# lxml is an optional accelerator for XML parsing
+try:
+    from lxml import etree as LET
+    _USE_LXML = True
+except ImportError:
+    LET = None
+    _USE_LXML = False
+
+# Precompiled patterns
+_PROGRESS_RE = re.compile(rb'<taskprogress [^>]*?percent="(\d+(?:\.\d+)?)"')
+_TARGET_RE = re.compile(
+    r'(?P<ip>(?:\d{1,3}\.){3}\d{1,3})'
+    r'(?:/(?P<prefix>\d{1,2})|-(?P<end>(?:\d{1,3}\.){3}\d{1,3}))?'
+    r'|(?P<host>[a-zA-Z0-9][-a-zA-Z0-9.]*[a-zA-Z0-9])'
+)
+
+# Bytes kept between reads, longer than any <taskprogress> record
+_PROGRESS_CARRY = 512
+
+# Highest progress reported while a scan runs, 100 means finished
+_MAX_RUNNING_PROGRESS = 99.9
+
+# Flags that need raw socket access
+_ADMIN_FLAGS = frozenset({'-O', '--osscan-guess', '-sS', '-A'})
+
+
+@functools.lru_cache(maxsize=64)
+def _split_args(arguments: str) -> Tuple[str, ...]:
+    """Split an argument string, cached for repeated profiles."""
+    return tuple(shlex.split(arguments))
+
+
+class MutableScanState:
+    """
+    Fields of a scan record that change while the scan runs.
+    
+    Every scan has its own lock, so a scan thread writing progress never
+    contends with status reads of other scans.
+    """
+    
+    __slots__ = ('lock', 'fields')
+    
+    def __init__(self, **fields):
+        self.lock = threading.Lock()
+        self.fields = fields
+    
+    def update(self, **fields):
+        """Update fields."""
+        with self.lock:
+            self.fields.update(fields)
+    
+    def snapshot(self) -> Dict[str, Any]:
+        """Return a copy of the current fields."""
+        with self.lock:
+            return dict(self.fields)
+
+
 class Scanner:
     """Thread-safe Nmap scanner with progress updates."""
     
-    def __init__(self, max_concurrent_scans=3):
+    def __init__(self, max_concurrent_scans=3, max_retained_scans=100):
         """
         Initialize scanner with concurrency limit.
         
         Args:
             max_concurrent_scans: Maximum number of concurrent scans
+            max_retained_scans: Number of finished scans kept for status queries
         """
-        self.scan_semaphore = threading.Semaphore(max_concurrent_scans)
-        self.running_scans = {}
+        self._executor = concurrent.futures.ThreadPoolExecutor(
+            max_workers=max_concurrent_scans,
+            thread_name_prefix='bnsw-scan'
+        )
+        # Fields fixed at registration are read without locking, the rest
+        # live in a MutableScanState. scan_lock only guards membership.
+        self._scan_const = {}
+        self._scan_mut = {}
         self.scan_lock = threading.Lock()
+        
+        # Finished scans, oldest first, evicted past max_retained_scans
+        self.max_retained_scans = max_retained_scans
+        self._completion_order = collections.deque()
+        
+        self._nmap_version_cache: Optional[Tuple[bool, str]] = None
     
     def scan(self, target: str, arguments: str = "-sV", callback: Callable = None) -> str:
         """
@@ -57,13 +132,28 @@ class Scanner:
         # Generate scan ID
         scan_id = str(uuid.uuid4())
         
-        # Start scan thread
-        scan_thread = threading.Thread(
-            target=self._scan_thread,
-            args=(scan_id, target, safe_args, callback)
+        # Register scan
+        state = MutableScanState(
+            start_time=None,
+            start_mono=None,
+            progress=0,
+            status='queued',
+            process=None,
+            future=None,
+            result=None,
+            error_message=None
         )
-        scan_thread.daemon = True
-        scan_thread.start()
+        with self.scan_lock:
+            self._scan_const[scan_id] = {
+                'target': target,
+                'arguments': shlex.join(safe_args),
+                'needs_admin': self._needs_admin_privileges(safe_args)
+            }
+            self._scan_mut[scan_id] = state
+        
+        # Queue scan on the worker pool
+        future = self._executor.submit(self._scan_thread, scan_id, target, safe_args, callback)
+        state.update(future=future)
         
         return scan_id
     
@@ -78,7 +168,12 @@ class Scanner:
             Dict[str, Any]: Scan status dictionary
         """
         with self.scan_lock:
-            return self.running_scans.get(scan_id, {}).copy()
+            const = self._scan_const.get(scan_id)
+            state = self._scan_mut.get(scan_id)
+        
+        if const is None:
+            return {}
+        return {**const, **state.snapshot()}
     
     def get_all_scans(self) -> Dict[str, Dict[str, Any]]:
         """
@@ -88,7 +183,9 @@ class Scanner:
             Dict[str, Dict[str, Any]]: Dictionary of scan ID to scan status
         """
         with self.scan_lock:
-            return self.running_scans.copy()
+            scan_ids = list(self._scan_const)
+        
+        return {scan_id: self.get_scan_status(scan_id) for scan_id in scan_ids}
     
     def cancel_scan(self, scan_id: str) -> bool:
         """
@@ -101,11 +198,16 @@ class Scanner:
             bool: True if scan was cancelled, False otherwise
         """
         with self.scan_lock:
-            if scan_id not in self.running_scans:
-                return False
+            state = self._scan_mut.get(scan_id)
+        
+        if state is None:
+            return False
+        
+        with state.lock:
+            scan_info = state.fields
+            status = scan_info.get('status')
             
-            scan_info = self.running_scans[scan_id]
-            if scan_info.get('process') and scan_info.get('status') == 'running':
+            if status == 'running' and scan_info.get('process'):
                 try:
                     scan_info['process'].terminate()
                     scan_info['status'] = 'cancelled'
@@ -113,84 +215,96 @@ class Scanner:
                 except:
                     return False
             
-            return False
+            if status not in ('queued', 'running'):
+                return False
+            
+            # Drop scans still waiting for a worker, a worker already
+            # starting nmap stops it once started
+            future = scan_info.get('future')
+            if status == 'running' or not future or not future.cancel():
+                if future and future.done():
+                    return False
+                scan_info['cancel_requested'] = True
+                scan_info['status'] = 'cancelled'
+                return True
+            
+            scan_info['status'] = 'cancelled'
+        
+        # A cancelled queued scan never reaches a worker, retire it here
+        self._retire_scan(scan_id)
+        return True
     
-    def _scan_thread(self, scan_id: str, target: str, arguments: str, callback: Callable):
+    def cancel_all_scans(self) -> None:
+        """Cancel all queued and running scans."""
+        with self.scan_lock:
+            scan_ids = list(self._scan_mut)
+        
+        for scan_id in scan_ids:
+            self.cancel_scan(scan_id)
+    
+    def _scan_thread(self, scan_id: str, target: str, arguments: List[str], callback: Callable):
         """
         Scan thread function.
         
         Args:
             scan_id: Scan ID
             target: Target to scan
-            arguments: Nmap arguments
+            arguments: Nmap argument list
             callback: Progress callback function
         """
-        # Acquire semaphore
-        self.scan_semaphore.acquire()
+        with self.scan_lock:
+            state = self._scan_mut[scan_id]
         
         try:
-            # Register scan
-            with self.scan_lock:
-                self.running_scans[scan_id] = {
-                    'target': target,
-                    'arguments': arguments,
-                    'start_time': datetime.now(),
-                    'progress': 0,
-                    'status': 'running',
-                    'process': None,
-                    'output': None,
-                    'result': None,
-                    'error_message': None
-                }
-            
-            # Create temporary files
-            output_file = tempfile.NamedTemporaryFile(delete=False, suffix='.xml')
-            output_file.close()
-            
-            # Check if admin privileges are needed
-            needs_admin = self._needs_admin_privileges(arguments)
+            # Mark scan as started. Durations use the monotonic clock,
+            # the datetime is only for display.
+            start_mono = time.monotonic()
+            state.update(start_time=datetime.now(), start_mono=start_mono, status='running')
             
-            # Update scan info with privilege requirement
-            with self.scan_lock:
-                self.running_scans[scan_id]['needs_admin'] = needs_admin
-            
-            # Build command
-            cmd = f"nmap {arguments} -oX {output_file.name} {target}"
+            # Build command, XML goes to stdout with periodic progress records
+            cmd = ["nmap", "--stats-every", "1s", *arguments, "-oX", "-", target]
             
             # Start process
             process = subprocess.Popen(
                 cmd,
-                shell=True,
                 stdout=subprocess.PIPE,
                 stderr=subprocess.PIPE,
-                universal_newlines=True
+                close_fds=True
             )
             
-            # Update process in scan info
-            with self.scan_lock:
-                self.running_scans[scan_id]['process'] = process
+            # Publish the process, stopping it if the scan was cancelled
+            # while nmap was starting
+            with state.lock:
+                state.fields['process'] = process
+                cancel_requested = state.fields.get('cancel_requested')
+            if cancel_requested:
+                process.terminate()
+            
+            # Parse XML as it arrives so hosts show up while the scan runs
+            result = {'scan_info': {}, 'hosts': []}
+            parser = self._create_xml_parser()
+            strcache = {}
+            
+            def feed_xml(chunk: bytes):
+                # Stop feeding once the document is known to be broken
+                if 'error' in result:
+                    return
+                try:
+                    parser.feed(chunk)
+                    self._read_xml_events(parser, result, strcache, state.lock)
+                except Exception as e:
+                    print(f"Error parsing XML: {str(e)}")
+                    result['error'] = str(e)
             
-            # Monitor progress
-            while process.poll() is None:
-                # Read output
-                line = process.stdout.readline()
-                
-                # Update progress
-                progress = self._parse_progress(line)
-                if progress is not None:
-                    with self.scan_lock:
-                        self.running_scans[scan_id]['progress'] = progress
-                    
-                    # Call callback
-                    if callback:
-                        callback(scan_id, progress)
-                
-                # Sleep to reduce CPU usage
-                time.sleep(0.1)
+            # Update live result in scan info
+            state.update(result=result)
+            
+            # Monitor progress and parse output
+            stderr_data = self._drain_output(scan_id, state, process, callback, feed_xml)
             
             # Process completed
             return_code = process.wait()
-            stderr_output = process.stderr.read()
+            stderr_output = stderr_data.decode(errors='replace')
             
             # Check for permission errors
             permission_error = False
@@ -202,39 +316,36 @@ class Scanner:
                 else:
                     error_message = f"Scan failed with error code {return_code}: {stderr_output}"
             
-            # Read output file
-            try:
-                with open(output_file.name, 'r') as f:
-                    output = f.read()
-                
-                # Parse XML output
-                if return_code == 0:
+            # Finish XML parsing
+            if return_code == 0:
+                if 'error' not in result:
                     try:
-                        # Parse XML directly
-                        result = self._parse_nmap_xml(output)
+                        parser.close()
+                        self._read_xml_events(parser, result, strcache, state.lock)
                     except Exception as e:
                         print(f"Error parsing XML: {str(e)}")
-                        result = None
-                        error_message = f"Error parsing scan results: {str(e)}"
-                else:
-                    result = None
-            except Exception as e:
-                print(f"Error reading output file: {str(e)}")
-                output = None
+                        result['error'] = str(e)
+                if 'error' in result:
+                    error_message = f"Error parsing scan results: {result['error']}"
+            else:
                 result = None
-                error_message = f"Error reading scan results: {str(e)}"
             
             # Update scan status
-            with self.scan_lock:
-                self.running_scans[scan_id]['end_time'] = datetime.now()
-                if permission_error:
-                    self.running_scans[scan_id]['status'] = 'permission_denied'
-                else:
-                    self.running_scans[scan_id]['status'] = 'completed' if return_code == 0 else 'failed'
-                self.running_scans[scan_id]['output'] = output
-                self.running_scans[scan_id]['result'] = result
-                self.running_scans[scan_id]['return_code'] = return_code
-                self.running_scans[scan_id]['error_message'] = error_message
+            if permission_error:
+                status = 'permission_denied'
+            else:
+                status = 'completed' if return_code == 0 else 'failed'
+            
+            end_mono = time.monotonic()
+            state.update(
+                end_time=datetime.now(),
+                end_mono=end_mono,
+                elapsed=end_mono - start_mono,
+                status=status,
+                result=result,
+                return_code=return_code,
+                error_message=error_message
+            )
             
             # Call callback with final progress
             if callback:
@@ -242,243 +353,472 @@ class Scanner:
                     callback(scan_id, -2)  # Special code for permission denied
                 else:
                     callback(scan_id, 100 if return_code == 0 else -1)
+        
+        except Exception as e:
+            # Errors would otherwise be swallowed by the worker future
+            print(f"Error running scan: {str(e)}")
+            state.update(
+                status='failed',
+                error_message=f"Error running scan: {str(e)}"
+            )
             
-            # Clean up
-            try:
-                os.unlink(output_file.name)
-            except:
-                pass
+            if callback:
+                callback(scan_id, -1)
         
         finally:
-            # Release semaphore
-            self.scan_semaphore.release()
+            self._retire_scan(scan_id)
     
-    def _parse_nmap_xml(self, xml_content):
+    def _retire_scan(self, scan_id: str):
         """
-        Parse Nmap XML output directly.
+        Mark scan as finished and evict the oldest finished scans.
         
         Args:
-            xml_content: XML content to parse
+            scan_id: Scan ID
+        """
+        with self.scan_lock:
+            self._completion_order.append(scan_id)
+            while len(self._completion_order) > self.max_retained_scans:
+                old_scan_id = self._completion_order.popleft()
+                self._scan_const.pop(old_scan_id, None)
+                self._scan_mut.pop(old_scan_id, None)
+    
+    def _drain_output(self, scan_id: str, state: MutableScanState,
+                      process: subprocess.Popen, callback: Callable,
+                      on_output: Callable) -> bytes:
+        """
+        Pass process output on while reporting progress.
+        
+        stdout (XML) and stderr are drained together so nmap never blocks
+        on a full pipe. On POSIX every wake-up reads all available output
+        at once and only the most recent progress record is reported.
+        
+        Args:
+            scan_id: Scan ID
+            state: Mutable scan state
+            process: Nmap process
+            callback: Progress callback function
+            on_output: Called with each chunk of stdout
             
         Returns:
-            Dict: Parsed data
+            bytes: stderr output
         """
+        stdout_fd = process.stdout.fileno()
+        stderr_fd = process.stderr.fileno()
+        stderr_chunks = []
+        last_progress = -1
+        
+        if os.name != 'posix':
+            # Pipes cannot be selected on Windows, fall back to polling
+            while process.poll() is None:
+                line = process.stdout.readline()
+                on_output(line)
+                
+                progress = self._parse_progress(line)
+                if progress is not None and progress != last_progress:
+                    last_progress = progress
+                    self._report_progress(scan_id, state, progress, callback)
+            
+            on_output(process.stdout.read())
+            return process.stderr.read()
+        
+        tail = b''
+        
+        # A pidfd becomes readable when nmap exits, so the loop can sleep
+        # until something happens instead of polling (Linux 5.3+)
         try:
-            # Parse XML
-            root = ET.fromstring(xml_content)
+            pidfd = os.pidfd_open(process.pid)
+        except (AttributeError, OSError):
+            pidfd = None
+        timeout = None if pidfd is not None else 0.25
+        exited = False
+        
+        with selectors.DefaultSelector() as selector:
+            for fd in (stdout_fd, stderr_fd):
+                os.set_blocking(fd, False)
+                selector.register(fd, selectors.EVENT_READ)
+            if pidfd is not None:
+                selector.register(pidfd, selectors.EVENT_READ)
+            
+            while not exited:
+                # Wait for output or process exit
+                for key, _ in selector.select(timeout):
+                    if key.fd == pidfd:
+                        selector.unregister(pidfd)
+                        exited = True
+                        continue
+                    
+                    try:
+                        chunk = os.read(key.fd, 65536)
+                    except BlockingIOError:
+                        continue
+                    
+                    # Stop watching closed streams
+                    if not chunk:
+                        selector.unregister(key.fd)
+                        continue
+                    
+                    if key.fd != stdout_fd:
+                        stderr_chunks.append(chunk)
+                        continue
+                    
+                    on_output(chunk)
+                    
+                    # Find latest progress in one pass over the raw chunk. The
+                    # end of the previous chunk is kept so a record split
+                    # across two reads is still matched.
+                    buf = tail + chunk
+                    tail = buf[-_PROGRESS_CARRY:]
+                    match = None
+                    for match in _PROGRESS_RE.finditer(buf):
+                        pass
+                    
+                    # Update progress only when it changed
+                    progress = float(match.group(1)) if match else None
+                    if progress is not None and progress != last_progress:
+                        last_progress = progress
+                        self._report_progress(scan_id, state, progress, callback)
+                
+                if pidfd is None and process.poll() is not None:
+                    exited = True
             
-            # Extract scan info
-            scan_info = {}
-            for attr, value in root.attrib.items():
-                scan_info[attr] = value
+            # Collect whatever is left in the pipes after exit
+            for key in list(selector.get_map().values()):
+                while True:
+                    try:
+                        chunk = os.read(key.fd, 65536)
+                    except BlockingIOError:
+                        break
+                    if not chunk:
+                        break
+                    if key.fd == stdout_fd:
+                        on_output(chunk)
+                    else:
+                        stderr_chunks.append(chunk)
+        
+        if pidfd is not None:
+            os.close(pidfd)
+        
+        return b''.join(stderr_chunks)
+    
+    def _report_progress(self, scan_id: str, state: MutableScanState,
+                         progress: float, callback: Callable):
+        """
+        Store and report scan progress.
+        
+        Args:
+            scan_id: Scan ID
+            state: Mutable scan state
+            progress: Progress percentage
+            callback: Progress callback function
+        """
+        state.update(progress=progress)
+        
+        # Call callback, below 100 since only the finished scan reports 100
+        # and a phase of the scan can reach 100 on its own
+        if callback:
+            callback(scan_id, min(progress, _MAX_RUNNING_PROGRESS))
+    
+    def _create_xml_parser(self):
+        """
+        Create a pull parser for Nmap XML.
+        
+        Returns:
+            XMLPullParser: lxml parser when available, ElementTree otherwise
+        """
+        if _USE_LXML:
+            return LET.XMLPullParser(
+                events=('start', 'end'),
+                tag=('nmaprun', 'host', 'runstats'),
+                resolve_entities=False
+            )
+        return ET.XMLPullParser(events=('start', 'end'))
+    
+    def _read_xml_events(self, parser, result: Dict[str, Any], strcache: Dict[str, str],
+                         lock=None):
+        """
+        Move parsed elements from the pull parser into a result dict.
+        
+        Args:
+            parser: Pull parser created by _create_xml_parser
+            result: Result dict with 'scan_info' and 'hosts'
+            strcache: String dedup cache kept for the whole document
+            lock: Lock to hold while updating result, if it is shared
+        """
+        scan_info = None
+        hosts = []
+        
+        for event, elem in parser.read_events():
+            tag = elem.tag
+            
+            if event == 'start':
+                # Extract scan info
+                if tag == 'nmaprun':
+                    scan_info = dict(elem.attrib)
+                continue
+            
+            if tag == 'host':
+                # Extract host and release its subtree
+                hosts.append(self._build_host(elem, strcache))
+                self._release_element(elem)
+            elif tag == 'runstats':
+                # Extract runstats
+                if scan_info is None:
+                    scan_info = dict(result['scan_info'])
+                scan_info['runstats'] = self._build_runstats(elem)
+        
+        if scan_info is None and not hosts:
+            return
+        
+        with lock or contextlib.nullcontext():
+            if scan_info is not None:
+                result['scan_info'] = scan_info
+            result['hosts'].extend(hosts)
+    
+    def _release_element(self, elem):
+        """
+        Free a fully processed element.
+        
+        Args:
+            elem: Processed element
+        """
+        elem.clear()
+        
+        # lxml keeps cleared siblings attached to the root, drop them too
+        if _USE_LXML:
+            while elem.getprevious() is not None:
+                del elem.getparent()[0]
+    
+    def _build_host(self, host_node, strcache: Dict[str, str] = None) -> Dict[str, Any]:
+        """
+        Build host dictionary from a <host> element.
+        
+        Short enumerated attributes (protocol, state, service, ...) repeat
+        for every port, so they are interned. Longer repeated values are
+        deduplicated through strcache.
+        
+        Args:
+            host_node: Host element
+            strcache: Dedup cache shared by all hosts of a scan
             
-            # Extract hosts
-            hosts = []
-            host_nodes = root.findall('.//host')
+        Returns:
+            Dict[str, Any]: Host dictionary
+        """
+        if strcache is None:
+            strcache = {}
+        intern = sys.intern
+        
+        host = {
+            'addresses': [],
+            'hostnames': [],
+            'ports': [],
+            'os': {}
+        }
+        
+        for child in host_node:
+            tag = child.tag
+            attrib = child.attrib
             
-            for host_node in host_nodes:
-                host = {}
-                
+            if tag == 'status':
                 # Extract status
-                status_node = host_node.find('status')
-                if status_node is not None:
-                    host['status'] = status_node.get('state', '')
+                host['status'] = intern(attrib.get('state', ''))
+            
+            elif tag == 'address':
+                # Extract address
+                addr_type = intern(attrib.get('addrtype', ''))
+                addr = attrib.get('addr', '')
                 
-                # Extract addresses
-                host['addresses'] = []
-                address_nodes = host_node.findall('address')
-                for address_node in address_nodes:
-                    addr_type = address_node.get('addrtype', '')
-                    addr = address_node.get('addr', '')
+                if addr_type == 'ipv4':
+                    host['ip'] = addr
+                elif addr_type == 'mac':
+                    host['mac'] = addr
+                
+                host['addresses'].append({
+                    'type': addr_type,
+                    'addr': addr
+                })
+            
+            elif tag == 'hostnames':
+                # Extract hostnames
+                for hostname_node in child:
+                    if hostname_node.tag != 'hostname':
+                        continue
+                    
+                    hostname = hostname_node.attrib.get('name', '')
+                    hostname_type = intern(hostname_node.attrib.get('type', ''))
                     
-                    if addr_type == 'ipv4':
-                        host['ip'] = addr
-                    elif addr_type == 'mac':
-                        host['mac'] = addr
+                    if hostname_type == 'user':
+                        host['hostname'] = hostname
                     
-                    host['addresses'].append({
-                        'type': addr_type,
-                        'addr': addr
+                    host['hostnames'].append({
+                        'name': hostname,
+                        'type': hostname_type
                     })
-                
-                # Extract hostnames
-                host['hostnames'] = []
-                hostnames_node = host_node.find('hostnames')
-                if hostnames_node is not None:
-                    hostname_nodes = hostnames_node.findall('hostname')
-                    for hostname_node in hostname_nodes:
-                        hostname = hostname_node.get('name', '')
-                        hostname_type = hostname_node.get('type', '')
-                        
-                        if hostname_type == 'user':
-                            host['hostname'] = hostname
-                        
-                        host['hostnames'].append({
-                            'name': hostname,
-                            'type': hostname_type
-                        })
-                
+            
+            elif tag == 'ports':
                 # Extract ports
-                host['ports'] = []
-                ports_node = host_node.find('ports')
-                if ports_node is not None:
-                    port_nodes = ports_node.findall('port')
-                    for port_node in port_nodes:
-                        port = {}
-                        port['protocol'] = port_node.get('protocol', '')
-                        port['portid'] = port_node.get('portid', '')
-                        
-                        # Extract state
-                        state_node = port_node.find('state')
-                        if state_node is not None:
-                            port['state'] = state_node.get('state', '')
-                            port['reason'] = state_node.get('reason', '')
-                        
-                        # Extract service
-                        service_node = port_node.find('service')
-                        if service_node is not None:
-                            port['service'] = service_node.get('name', '')
-                            port['product'] = service_node.get('product', '')
-                            port['version'] = service_node.get('version', '')
-                            
-                            # Create a combined version string for display
-                            version_info = []
-                            if port['product']:
-                                version_info.append(port['product'])
-                            if port['version']:
-                                version_info.append(port['version'])
-                            
-                            port['version_info'] = ' '.join(version_info)
-                            
-                            # Extract additional service info
-                            for attr in ['extrainfo', 'ostype', 'devicetype', 'servicefp']:
-                                value = service_node.get(attr, '')
-                                if value:
-                                    port[attr] = value
-                        
-                        # Extract scripts
-                        script_nodes = port_node.findall('script')
-                        if script_nodes:
-                            port['scripts'] = []
-                            for script_node in script_nodes:
-                                script = {
-                                    'id': script_node.get('id', ''),
-                                    'output': script_node.get('output', '')
-                                }
-                                port['scripts'].append(script)
-                        
-                        host['ports'].append(port)
-                
-                # Extract OS
-                host['os'] = {}
-                os_node = host_node.find('os')
-                if os_node is not None:
-                    # Extract OS matches
-                    osmatch_nodes = os_node.findall('osmatch')
-                    if osmatch_nodes:
-                        host['os_matches'] = []
-                        for osmatch_node in osmatch_nodes:
-                            osmatch = {
-                                'name': osmatch_node.get('name', ''),
-                                'accuracy': osmatch_node.get('accuracy', ''),
-                                'line': osmatch_node.get('line', '')
-                            }
-                            
-                            # Extract OS class
-                            osclass_nodes = osmatch_node.findall('osclass')
-                            if osclass_nodes:
-                                osmatch['classes'] = []
-                                for osclass_node in osclass_nodes:
-                                    osclass = {
-                                        'type': osclass_node.get('type', ''),
-                                        'vendor': osclass_node.get('vendor', ''),
-                                        'osfamily': osclass_node.get('osfamily', ''),
-                                        'osgen': osclass_node.get('osgen', ''),
-                                        'accuracy': osclass_node.get('accuracy', '')
-                                    }
-                                    osmatch['classes'].append(osclass)
-                            
-                            host['os_matches'].append(osmatch)
+                for port_node in child:
+                    if port_node.tag == 'port':
+                        host['ports'].append(self._build_port(port_node, strcache))
+            
+            elif tag == 'os':
+                # Extract OS matches, the first one is the best match
+                for osmatch_node in child:
+                    if osmatch_node.tag != 'osmatch':
+                        continue
+                    
+                    osmatch_attrib = osmatch_node.attrib
+                    osmatch = {
+                        'name': osmatch_attrib.get('name', ''),
+                        'accuracy': osmatch_attrib.get('accuracy', ''),
+                        'line': osmatch_attrib.get('line', '')
+                    }
+                    
+                    # Extract OS classes
+                    for osclass_node in osmatch_node:
+                        if osclass_node.tag != 'osclass':
+                            continue
                         
+                        osclass_attrib = osclass_node.attrib
+                        osmatch.setdefault('classes', []).append({
+                            'type': intern(osclass_attrib.get('type', '')),
+                            'vendor': intern(osclass_attrib.get('vendor', '')),
+                            'osfamily': intern(osclass_attrib.get('osfamily', '')),
+                            'osgen': osclass_attrib.get('osgen', ''),
+                            'accuracy': osclass_attrib.get('accuracy', '')
+                        })
+                    
+                    if 'os_matches' not in host:
                         # Use the best match for the main OS info
-                        best_match = osmatch_nodes[0]
                         host['os'] = {
-                            'name': best_match.get('name', ''),
-                            'accuracy': best_match.get('accuracy', '')
+                            'name': osmatch['name'],
+                            'accuracy': osmatch['accuracy']
                         }
-                
+                        host['os_matches'] = []
+                    
+                    host['os_matches'].append(osmatch)
+            
+            elif tag == 'uptime':
                 # Extract uptime
-                uptime_node = host_node.find('uptime')
-                if uptime_node is not None:
-                    host['uptime'] = {
-                        'seconds': uptime_node.get('seconds', ''),
-                        'lastboot': uptime_node.get('lastboot', '')
-                    }
-                
+                host['uptime'] = {
+                    'seconds': attrib.get('seconds', ''),
+                    'lastboot': attrib.get('lastboot', '')
+                }
+            
+            elif tag == 'distance':
                 # Extract distance
-                distance_node = host_node.find('distance')
-                if distance_node is not None:
-                    host['distance'] = {
-                        'value': distance_node.get('value', '')
-                    }
-                
+                host['distance'] = {
+                    'value': attrib.get('value', '')
+                }
+            
+            elif tag == 'trace':
                 # Extract trace
-                trace_node = host_node.find('trace')
-                if trace_node is not None:
-                    host['trace'] = {
-                        'proto': trace_node.get('proto', ''),
-                        'port': trace_node.get('port', ''),
-                        'hops': []
-                    }
-                    
-                    hop_nodes = trace_node.findall('hop')
-                    for hop_node in hop_nodes:
-                        hop = {
-                            'ttl': hop_node.get('ttl', ''),
-                            'ipaddr': hop_node.get('ipaddr', ''),
-                            'host': hop_node.get('host', ''),
-                            'rtt': hop_node.get('rtt', '')
+                host['trace'] = {
+                    'proto': attrib.get('proto', ''),
+                    'port': attrib.get('port', ''),
+                    'hops': [
+                        {
+                            'ttl': hop_node.attrib.get('ttl', ''),
+                            'ipaddr': hop_node.attrib.get('ipaddr', ''),
+                            'host': hop_node.attrib.get('host', ''),
+                            'rtt': hop_node.attrib.get('rtt', '')
                         }
-                        host['trace']['hops'].append(hop)
-                
-                hosts.append(host)
+                        for hop_node in child if hop_node.tag == 'hop'
+                    ]
+                }
+        
+        return host
+    
+    def _build_port(self, port_node, strcache: Dict[str, str] = None) -> Dict[str, Any]:
+        """
+        Build port dictionary from a <port> element.
+        
+        Args:
+            port_node: Port element
+            strcache: Dedup cache shared by all hosts of a scan
             
-            # Extract runstats
-            runstats_node = root.find('runstats')
-            if runstats_node is not None:
-                scan_info['runstats'] = {}
+        Returns:
+            Dict[str, Any]: Port dictionary
+        """
+        if strcache is None:
+            strcache = {}
+        intern = sys.intern
+        dedup = strcache.setdefault
+        
+        portid = port_node.attrib.get('portid', '')
+        port = {
+            'protocol': intern(port_node.attrib.get('protocol', '')),
+            'portid': dedup(portid, portid)
+        }
+        
+        for child in port_node:
+            tag = child.tag
+            attrib = child.attrib
+            
+            if tag == 'state':
+                # Extract state
+                port['state'] = intern(attrib.get('state', ''))
+                port['reason'] = intern(attrib.get('reason', ''))
+            
+            elif tag == 'service':
+                # Extract service
+                product = attrib.get('product', '')
+                version = attrib.get('version', '')
+                port['service'] = intern(attrib.get('name', ''))
+                port['product'] = dedup(product, product)
+                port['version'] = dedup(version, version)
                 
-                # Extract finished info
-                finished_node = runstats_node.find('finished')
-                if finished_node is not None:
-                    scan_info['runstats']['finished'] = {
-                        'time': finished_node.get('time', ''),
-                        'timestr': finished_node.get('timestr', ''),
-                        'elapsed': finished_node.get('elapsed', ''),
-                        'summary': finished_node.get('summary', '')
-                    }
+                # Create a combined version string for display
+                version_info = ' '.join(value for value in (product, version) if value)
+                port['version_info'] = dedup(version_info, version_info)
                 
-                # Extract hosts info
-                hosts_node = runstats_node.find('hosts')
-                if hosts_node is not None:
-                    scan_info['runstats']['hosts'] = {
-                        'up': hosts_node.get('up', ''),
-                        'down': hosts_node.get('down', ''),
-                        'total': hosts_node.get('total', '')
-                    }
+                # Extract additional service info
+                for attr in ('extrainfo', 'ostype', 'devicetype', 'servicefp'):
+                    value = attrib.get(attr, '')
+                    if value:
+                        port[attr] = intern(value) if attr in ('ostype', 'devicetype') else value
+            
+            elif tag == 'script':
+                # Extract scripts
+                port.setdefault('scripts', []).append({
+                    'id': attrib.get('id', ''),
+                    'output': attrib.get('output', '')
+                })
+        
+        return port
+    
+    def _build_runstats(self, runstats_node) -> Dict[str, Any]:
+        """
+        Build runstats dictionary from a <runstats> element.
+        
+        Args:
+            runstats_node: Runstats element
             
-            return {
-                'scan_info': scan_info,
-                'hosts': hosts
-            }
+        Returns:
+            Dict[str, Any]: Runstats dictionary
+        """
+        runstats = {}
         
-        except Exception as e:
-            print(f"Error parsing XML: {str(e)}")
-            return {
-                'error': str(e),
-                'scan_info': {},
-                'hosts': []
-            }
+        for child in runstats_node:
+            attrib = child.attrib
+            
+            if child.tag == 'finished':
+                # Extract finished info
+                runstats['finished'] = {
+                    'time': attrib.get('time', ''),
+                    'timestr': attrib.get('timestr', ''),
+                    'elapsed': attrib.get('elapsed', ''),
+                    'summary': attrib.get('summary', '')
+                }
+            
+            elif child.tag == 'hosts':
+                # Extract hosts info
+                runstats['hosts'] = {
+                    'up': attrib.get('up', ''),
+                    'down': attrib.get('down', ''),
+                    'total': attrib.get('total', '')
+                }
+        
+        return runstats
     
     def _validate_target(self, target: str) -> bool:
         """
@@ -490,120 +830,74 @@ class Scanner:
         Returns:
             bool: True if target is valid, False otherwise
         """
-        # IP address
-        ip_pattern = r'^(\d{1,3}\.){3}\d{1,3}$'
-        if re.match(ip_pattern, target):
-            # Check each octet is in range 0-255
-            octets = target.split('.')
-            if all(0 <= int(octet) <= 255 for octet in octets):
-                return True
+        match = _TARGET_RE.fullmatch(target)
+        if not match:
             return False
         
-        # CIDR notation
-        cidr_pattern = r'^(\d{1,3}\.){3}\d{1,3}/\d{1,2}$'
-        if re.match(cidr_pattern, target):
-            # Split into IP and prefix
-            ip, prefix = target.split('/')
-            
-            # Validate IP
-            octets = ip.split('.')
-            if not all(0 <= int(octet) <= 255 for octet in octets):
-                return False
-            
-            # Validate prefix
-            try:
-                prefix_int = int(prefix)
-                if 0 <= prefix_int <= 32:
-                    return True
-            except ValueError:
-                pass
-            
-            return False
-        
-        # IP range
-        ip_range_pattern = r'^(\d{1,3}\.){3}\d{1,3}-(\d{1,3}\.){3}\d{1,3}$'
-        if re.match(ip_range_pattern, target):
-            # Split into start and end IPs
-            start_ip, end_ip = target.split('-')
-            
-            # Validate start IP
-            start_octets = start_ip.split('.')
-            if not all(0 <= int(octet) <= 255 for octet in start_octets):
-                return False
-            
-            # Validate end IP
-            end_octets = end_ip.split('.')
-            if not all(0 <= int(octet) <= 255 for octet in end_octets):
-                return False
-            
-            return True
-        
         # Hostname
-        hostname_pattern = r'^[a-zA-Z0-9][-a-zA-Z0-9.]*[a-zA-Z0-9]$'
-        if re.match(hostname_pattern, target):
+        if match.group('host'):
             return True
         
-        return False
+        # IP address, CIDR notation or IP range
+        ip, prefix, end = match.group('ip', 'prefix', 'end')
+        try:
+            if prefix is not None:
+                ipaddress.IPv4Network(f"{ip}/{prefix}", strict=False)
+            else:
+                ipaddress.IPv4Address(ip)
+                if end is not None:
+                    ipaddress.IPv4Address(end)
+        except ValueError:
+            return False
+        
+        return True
     
-    def _sanitize_arguments(self, arguments: str) -> str:
+    def _sanitize_arguments(self, arguments: str) -> List[str]:
         """
         Sanitize Nmap arguments.
         
+        The arguments are passed to nmap as an argv list without a shell,
+        so splitting them is all the sanitizing needed.
+        
         Args:
             arguments: Nmap arguments
             
         Returns:
-            str: Sanitized arguments
+            List[str]: Argument list
         """
-        # Split arguments
-        args = shlex.split(arguments)
-        
-        # Sanitize each argument
-        sanitized = [shlex.quote(arg) for arg in args]
-        
-        # Join arguments
-        return ' '.join(sanitized)
+        return list(_split_args(arguments))
     
-    def _parse_progress(self, line: str) -> Optional[float]:
+    def _parse_progress(self, line: bytes) -> Optional[float]:
         """
         Parse progress from Nmap output.
         
         Args:
-            line: Nmap output line
+            line: Raw Nmap output line
             
         Returns:
             Optional[float]: Progress percentage, or None if not found
         """
         # Match progress line
-        match = re.search(r'About (\d+\.\d+)% done', line)
-        if match:
-            return float(match.group(1))
-        
-        return None
+        match = _PROGRESS_RE.search(line)
+        return float(match.group(1)) if match else None
     
-    def _needs_admin_privileges(self, arguments: str) -> bool:
+    def _needs_admin_privileges(self, arguments) -> bool:
         """
         Check if scan needs admin privileges.
         
+        OS detection (-O, --osscan-guess), SYN scans (-sS) and comprehensive
+        scans (-A, which include OS detection) need raw sockets.
+        
         Args:
-            arguments: Nmap arguments
+            arguments: Nmap argument list (a string is split first)
             
         Returns:
             bool: True if admin privileges are needed, False otherwise
         """
-        # Check for OS detection
-        if '-O' in arguments or '--osscan-guess' in arguments:
-            return True
+        if isinstance(arguments, str):
+            arguments = _split_args(arguments)
         
-        # Check for SYN scan
-        if '-sS' in arguments:
-            return True
-        
-        # Check for comprehensive scan (which typically includes OS detection)
-        if '-A' in arguments:
-            return True
-        
-        return False
+        return not _ADMIN_FLAGS.isdisjoint(arguments)
     
     def get_scan_profiles(self) -> Dict[str, str]:
         """
@@ -621,34 +915,43 @@ class Scanner:
             "Comprehensive": "-T4 -A -v -PE -PP -PS80,443 -PA3389 -PU40125 -PY -g 53"
         }
     
-    def check_nmap_installation(self) -> Tuple[bool, str]:
+    def check_nmap_installation(self, refresh: bool = False) -> Tuple[bool, str]:
         """
         Check if Nmap is installed.
         
+        The result is cached, so only the first call spawns nmap.
+        
+        Args:
+            refresh: Re-run the check instead of using the cached result
+            
         Returns:
             Tuple[bool, str]: (is_installed, version_string)
         """
+        if self._nmap_version_cache is not None and not refresh:
+            return self._nmap_version_cache
+        
         try:
             # Run nmap version command
-            process = subprocess.Popen(
+            process = subprocess.run(
                 ["nmap", "--version"],
-                stdout=subprocess.PIPE,
-                stderr=subprocess.PIPE,
-                universal_newlines=True
+                capture_output=True,
+                text=True,
+                timeout=5
             )
             
-            # Get output
-            stdout, stderr = process.communicate()
-            
             # Check if successful
-            if process.returncode == 0 and stdout:
+            if process.returncode == 0 and process.stdout:
                 # Extract version
-                match = re.search(r'Nmap version (\S+)', stdout)
+                match = re.search(r'Nmap version (\S+)', process.stdout)
                 if match:
-                    return True, match.group(1)
-                return True, "Unknown version"
-            
-            return False, ""
+                    result = (True, match.group(1))
+                else:
+                    result = (True, "Unknown version")
+            else:
+                result = (False, "")
         
         except:
-            return False, ""
+            result = (False, "")
+        
+        self._nmap_version_cache = result
+        return result
@@ -6,6 +6,7 @@ It integrates the scanner and parser components.
 """
 
 import os
+import functools
 import threading
 import logging
 import ctypes
@@ -16,6 +17,20 @@ from BNSW.core.scanner import Scanner
 
 logger = logging.getLogger('BNSW.core.scanner_manager')
 
+@functools.lru_cache(maxsize=None)
+def _is_admin() -> bool:
+    """Check for administrative privileges once, they don't change while running."""
+    if sys.platform == 'win32':
+        try:
+            is_user_an_admin = ctypes.windll.shell32.IsUserAnAdmin
+            is_user_an_admin.restype = ctypes.c_int
+            return is_user_an_admin() != 0
+        except Exception:
+            return False
+    else:
+        # On Unix-like systems, check for root
+        return os.geteuid() == 0
+
 class ScannerManager:
     """High-level manager for scanning operations."""
     
@@ -27,22 +42,17 @@ class ScannerManager:
             max_concurrent_scans: Maximum number of concurrent scans
         """
         self.scanner = Scanner(max_concurrent_scans=max_concurrent_scans)
+        self._profiles_cache = self.scanner.get_scan_profiles()
         self.scan_callbacks = {}
         self.scan_results = {}
+        # Single dict operations are atomic, the lock only guards eviction
         self.lock = threading.Lock()
 
     def check_admin_privileges(self):
         """
         Check if the script is running with administrative privileges (Windows).
         """
-        if sys.platform == 'win32':
-            try:
-                return ctypes.windll.shell32.IsUserAnAdmin() != 0
-            except Exception:
-                return False
-        else:
-            # On Unix-like systems, check for root
-            return os.geteuid() == 0
+        return _is_admin()
     
     def start_scan(self, target: str, profile: str = "Quick", callback: Callable = None) -> str:
         """
@@ -51,18 +61,21 @@ class ScannerManager:
         Args:
             target: Target to scan
             profile: Scan profile name
-            callback: Callback function for scan completion
+            callback: Callback function for scan progress and completion
             
         Returns:
             str: Scan ID
         """
         # Get profile arguments
-        profiles = self.scanner.get_scan_profiles()
-        arguments = profiles.get(profile, "-T4 -F")
+        arguments = self._profiles_cache.get(profile, "-T4 -F")
         
-        # Register callback
+        # Register callback, passing on progress while the scan runs
         def on_scan_complete(scan_id, progress):
-            if progress == 100:
+            if 0 <= progress < 100:
+                # Scan running
+                if callback:
+                    callback(scan_id, progress)
+            elif progress == 100:
                 # Scan completed successfully
                 self._process_scan_result(scan_id)
                 
@@ -82,8 +95,7 @@ class ScannerManager:
         scan_id = self.scanner.scan(target, arguments, on_scan_complete)
         
         # Store callback
-        with self.lock:
-            self.scan_callbacks[scan_id] = callback
+        self.scan_callbacks[scan_id] = callback
         
         return scan_id
     
@@ -109,8 +121,19 @@ class ScannerManager:
         Returns:
             Dict[str, Any]: Scan result
         """
-        with self.lock:
-            return self.scan_results.get(scan_id, {})
+        return self.scan_results.get(scan_id, {})
+    
+    def get_scan_status_and_result(self, scan_id: str) -> Tuple[Dict[str, Any], Dict[str, Any]]:
+        """
+        Get scan status and result together, as needed once a scan finishes.
+        
+        Args:
+            scan_id: Scan ID
+            
+        Returns:
+            Tuple[Dict[str, Any], Dict[str, Any]]: (scan_status, scan_result)
+        """
+        return self.scanner.get_scan_status(scan_id), self.scan_results.get(scan_id, {})
     
     def cancel_scan(self, scan_id: str) -> bool:
         """
@@ -124,6 +147,10 @@ class ScannerManager:
         """
         return self.scanner.cancel_scan(scan_id)
     
+    def cancel_all_scans(self) -> None:
+        """Cancel all queued and running scans."""
+        self.scanner.cancel_all_scans()
+    
     def get_all_scans(self) -> Dict[str, Dict[str, Any]]:
         """
         Get all scans.
@@ -133,14 +160,17 @@ class ScannerManager:
         """
         return self.scanner.get_all_scans()
     
-    def check_nmap_installation(self) -> Tuple[bool, str]:
+    def check_nmap_installation(self, refresh: bool = False) -> Tuple[bool, str]:
         """
         Check if Nmap is installed.
         
+        Args:
+            refresh: Re-run the check instead of using the cached result
+            
         Returns:
             Tuple[bool, str]: (is_installed, version_string)
         """
-        return self.scanner.check_nmap_installation()
+        return self.scanner.check_nmap_installation(refresh)
     
     def get_scan_profiles(self) -> Dict[str, str]:
         """
@@ -149,7 +179,7 @@ class ScannerManager:
         Returns:
             Dict[str, str]: Dictionary of profile name to Nmap arguments
         """
-        return self.scanner.get_scan_profiles()
+        return dict(self._profiles_cache)
     
     def _process_scan_result(self, scan_id: str) -> None:
         """
@@ -170,8 +200,12 @@ class ScannerManager:
             result = scan_status.get('result')
             
             # Store result
+            self.scan_results[scan_id] = result
+            
+            # Keep as many results as the scanner keeps scans
             with self.lock:
-                self.scan_results[scan_id] = result
+                while len(self.scan_results) > self.scanner.max_retained_scans:
+                    del self.scan_results[next(iter(self.scan_results))]
         
         except Exception as e:
             logger.exception(f"Error processing scan result: {str(e)}")
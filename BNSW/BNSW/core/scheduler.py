@@ -5,16 +5,23 @@ This module provides a scheduler for running scans at specified times.
 """
 
 import os
-import time
 import json
 import logging
 import threading
 import datetime
 from typing import Dict, List, Any, Optional
 
+from peewee import Case, fn
+
 from BNSW.core.scanner_manager import ScannerManager
 from BNSW.data.repositories import DatabaseManager
-from BNSW.data.models import ScheduledScan
+from BNSW.data.models import ScheduledScan, db
+
+# ciso8601 is an optional faster parser for schedule times
+try:
+    from ciso8601 import parse_datetime as _fromiso
+except ImportError:
+    _fromiso = datetime.datetime.fromisoformat
 
 # Set up logger
 logger = logging.getLogger('BNSW.core.scheduler')
@@ -22,20 +29,29 @@ logger = logging.getLogger('BNSW.core.scheduler')
 class Scheduler:
     """Scheduler for running scans at specified times."""
     
-    def __init__(self, check_interval=60):
+    def __init__(self, check_interval=3600):
         """
         Initialize scheduler.
         
         Args:
-            check_interval: Interval in seconds to check for scheduled scans
+            check_interval: Maximum interval in seconds between checks for
+                scheduled scans when none is due sooner
         """
         self.check_interval = check_interval
         self.scanner_manager = ScannerManager()
-        self.db_manager = DatabaseManager()
+        self.db_manager = DatabaseManager.instance()
         self.running = False
         self.thread = None
-        self.lock = threading.RLock()
+        # Guards the running flag and thread, active_scans is only
+        # accessed with single atomic dict operations
+        self.lock = threading.Lock()
         self.active_scans = {}
+        
+        # Set to make the scheduler loop re-check immediately
+        self._wakeup = threading.Event()
+        
+        # Called with (scheduled_scan_id, scheduled_scan) on changes
+        self._listeners = []
     
     def start(self):
         """Start scheduler."""
@@ -49,97 +65,231 @@ class Scheduler:
             logger.info("Scheduler started")
     
     def stop(self):
-        """Stop scheduler."""
+        """Stop scheduler, waiting up to a second for its thread to exit."""
+        thread = self.request_stop()
+        if thread is not None:
+            self.join(thread, timeout=1)
+    
+    def request_stop(self):
+        """
+        Stop scheduler without waiting for its thread to exit.
+        
+        Returns:
+            threading.Thread: Scheduler thread, to pass to join(), or None if
+                the scheduler was not running
+        """
         with self.lock:
             if not self.running:
-                return
+                return None
             
             self.running = False
-            if self.thread:
-                self.thread.join(timeout=5)
-                self.thread = None
+            # The loop wakes up at once, only an in-progress check can delay it
+            self._wakeup.set()
+            thread = self.thread
+            self.thread = None
+            
+            # Scan workers are not daemon threads, do not leave them running
+            self.scanner_manager.cancel_all_scans()
             logger.info("Scheduler stopped")
+            return thread
+    
+    def join(self, thread, timeout=None):
+        """
+        Wait for a stopped scheduler thread to exit.
+        
+        Args:
+            thread: Scheduler thread, as returned by request_stop()
+            timeout: Maximum time to wait in seconds, or None to wait until it exits
+        """
+        thread.join(timeout)
+    
+    def add_listener(self, listener):
+        """
+        Add a listener for scheduled scan changes.
+        
+        Listeners may be called from the scheduler thread.
+        
+        Args:
+            listener: Callable taking the scheduled scan ID and the scheduled
+                scan dictionary, or None if the scheduled scan was deleted
+        """
+        self._listeners.append(listener)
+    
+    def _notify(self, scheduled_scan_id, scheduled_scan):
+        """
+        Notify listeners of a scheduled scan change.
+        
+        Args:
+            scheduled_scan_id: Scheduled scan ID
+            scheduled_scan: Scheduled scan dictionary, or None if deleted
+        """
+        for listener in self._listeners:
+            try:
+                listener(scheduled_scan_id, scheduled_scan)
+            except Exception as e:
+                logger.exception(f"Error notifying scheduled scan change: {str(e)}")
+    
+    def _notify_changed(self, scheduled_scan_ids):
+        """
+        Notify listeners of changed scheduled scans.
+        
+        Args:
+            scheduled_scan_ids: IDs of the changed scheduled scans
+        """
+        if not self._listeners or not scheduled_scan_ids:
+            return
+        
+        try:
+            scheduled_scans = ScheduledScan.select().where(
+                ScheduledScan.id.in_(list(scheduled_scan_ids)))
+            for scan in scheduled_scans:
+                self._notify(scan.id, scan.to_dict(parse_metadata=True))
+        
+        except Exception as e:
+            logger.exception(f"Error getting changed scheduled scans: {str(e)}")
     
     def _scheduler_loop(self):
         """Scheduler loop."""
         while self.running:
             try:
+                # Changes made while checking trigger another check right away
+                self._wakeup.clear()
+                
                 # Check for scheduled scans
                 self._check_scheduled_scans()
                 
-                # Sleep for check interval
-                time.sleep(self.check_interval)
+                # Sleep until the next scan is due or the schedule changes
+                self._wakeup.wait(self._seconds_until_next_run())
             
             except Exception as e:
                 logger.exception(f"Error in scheduler loop: {str(e)}")
                 # Sleep for a bit to avoid tight loop in case of persistent error
-                time.sleep(5)
+                self._wakeup.wait(5)
     
+    @db.connection_context()
+    def _seconds_until_next_run(self):
+        """
+        Get time to wait before the next check.
+        
+        Returns:
+            float: Seconds until the earliest pending scan is due, capped at
+                check_interval
+        """
+        soonest = (ScheduledScan
+                   .select(fn.MIN(ScheduledScan.next_run))
+                   .where(ScheduledScan.status == 'pending')
+                   .scalar())
+        if soonest is None:
+            return self.check_interval
+        
+        delta = (soonest - datetime.datetime.now()).total_seconds()
+        return min(max(0, delta), self.check_interval)
+    
+    @db.connection_context()
     def _check_scheduled_scans(self):
         """Check for scheduled scans."""
         try:
             # Get current time
             now = datetime.datetime.now()
             
-            # Get all scheduled scans
-            scheduled_scans = self._get_scheduled_scans()
+            # Scans changed by this check, reported once committed
+            changed = set()
             
-            # Check each scheduled scan
-            for scan in scheduled_scans:
-                # Skip if already running
-                if scan.status == 'running':
-                    continue
-                
-                # Calculate next run if not set
-                if not scan.next_run:
-                    next_run = scan.calculate_next_run()
-                    if next_run:
-                        scan.next_run = next_run
-                        scan.save()
-                    continue
-                
-                # Check if it's time to run
-                if scan.next_run and scan.next_run <= now:
+            # Run scans that are due, recording them in one transaction that
+            # takes the write lock up front so concurrent ticks queue up
+            with db.atomic(lock_type='IMMEDIATE'):
+                next_runs = {}
+                for scan in self._get_due_scans(now):
+                    changed.add(scan.id)
+                    
                     # Run scan
-                    self._run_scheduled_scan(scan)
+                    if not self._run_scheduled_scan(scan):
+                        continue
                     
-                    # Update last run and next run
                     scan.last_run = now
-                    scan.next_run = scan.calculate_next_run()
+                    next_runs[scan.id] = scan.calculate_next_run(now)
+                
+                # Update last run and next run of all started scans
+                if next_runs:
+                    ScheduledScan.update(
+                        last_run=now,
+                        next_run=Case(ScheduledScan.id, list(next_runs.items()), None)
+                    ).where(ScheduledScan.id.in_(list(next_runs))).execute()
+            
+            # Calculate next run for scans that do not have one yet
+            for scan in self._get_unplanned_scans():
+                next_run = scan.calculate_next_run(now)
+                if next_run:
+                    scan.next_run = next_run
                     scan.save()
+                    changed.add(scan.id)
+            
+            self._notify_changed(changed)
         
         except Exception as e:
             logger.exception(f"Error checking scheduled scans: {str(e)}")
     
-    def _get_scheduled_scans(self):
+    def _get_due_scans(self, now):
         """
-        Get all scheduled scans.
+        Get pending scheduled scans that are due.
+        
+        Args:
+            now: Current time
+            
+        Returns:
+            List[ScheduledScan]: List of due scheduled scans
+        """
+        try:
+            return list(ScheduledScan.select().where(
+                (ScheduledScan.status == 'pending') &
+                (ScheduledScan.next_run <= now)
+            ))
+        
+        except Exception as e:
+            logger.exception(f"Error getting due scheduled scans: {str(e)}")
+            return []
+    
+    def _get_unplanned_scans(self):
+        """
+        Get pending scheduled scans without a next run time.
         
         Returns:
             List[ScheduledScan]: List of scheduled scans
         """
         try:
-            # Get all scheduled scans
             return list(ScheduledScan.select().where(
-                (ScheduledScan.status == 'pending') | 
-                (ScheduledScan.status == 'running')
+                (ScheduledScan.status == 'pending') &
+                ScheduledScan.next_run.is_null()
             ))
         
         except Exception as e:
-            logger.exception(f"Error getting scheduled scans: {str(e)}")
+            logger.exception(f"Error getting unplanned scheduled scans: {str(e)}")
             return []
     
     def _run_scheduled_scan(self, scheduled_scan):
         """
         Run scheduled scan.
         
+        The scan is claimed first by moving it from pending to running in a
+        single UPDATE, so a scan is never started twice when several
+        scheduler loops see it as due at the same time.
+        
         Args:
             scheduled_scan: Scheduled scan
+            
+        Returns:
+            bool: True if the scan was started, False otherwise
         """
         try:
-            # Update status
+            # Claim scan, bail out if another scheduler got it first
+            claimed = ScheduledScan.update(status='running').where(
+                (ScheduledScan.id == scheduled_scan.id) &
+                (ScheduledScan.status == 'pending')
+            ).execute()
+            if not claimed:
+                logger.info(f"Scheduled scan {scheduled_scan.id} already claimed")
+                return False
             scheduled_scan.status = 'running'
-            scheduled_scan.save()
             
             # Get scan parameters
             target = scheduled_scan.target
@@ -153,10 +303,10 @@ class Scheduler:
             )
             
             # Store scan ID
-            with self.lock:
-                self.active_scans[scheduled_scan.id] = scan_id
+            self.active_scans[scheduled_scan.id] = scan_id
             
             logger.info(f"Started scheduled scan {scheduled_scan.id} with scan ID {scan_id}")
+            return True
         
         except Exception as e:
             logger.exception(f"Error running scheduled scan {scheduled_scan.id}: {str(e)}")
@@ -164,7 +314,9 @@ class Scheduler:
             # Update status
             scheduled_scan.status = 'error'
             scheduled_scan.save()
+            return False
     
+    @db.connection_context()
     def _on_scan_progress(self, scheduled_scan_id, scan_id, progress):
         """
         Handle scan progress.
@@ -177,13 +329,6 @@ class Scheduler:
         try:
             # Check if scan is complete
             if progress == 100 or progress < 0:
-                # Get scheduled scan
-                try:
-                    scheduled_scan = ScheduledScan.get_by_id(scheduled_scan_id)
-                except Exception:
-                    logger.warning(f"Scheduled scan {scheduled_scan_id} not found")
-                    return
-                
                 # Get scan result
                 result = self.scanner_manager.get_scan_result(scan_id)
                 
@@ -196,19 +341,24 @@ class Scheduler:
                     except Exception as e:
                         logger.exception(f"Error saving scan result: {str(e)}")
                 
-                # Update status
-                if progress == 100:
-                    scheduled_scan.status = 'completed'
-                else:
-                    scheduled_scan.status = 'error'
-                
-                scheduled_scan.save()
+                # Update status only, a full save could write back last and
+                # next run times read before the check that started the scan
+                # committed them
+                status = 'completed' if progress == 100 else 'error'
+                updated = ScheduledScan.update(status=status).where(
+                    ScheduledScan.id == scheduled_scan_id).execute()
                 
                 # Remove from active scans
-                with self.lock:
-                    self.active_scans.pop(scheduled_scan_id, None)
+                self.active_scans.pop(scheduled_scan_id, None)
                 
-                logger.info(f"Scheduled scan {scheduled_scan_id} completed with status {scheduled_scan.status}")
+                if not updated:
+                    logger.warning(f"Scheduled scan {scheduled_scan_id} not found")
+                    return
+                
+                scheduled_scan = ScheduledScan.get_by_id(scheduled_scan_id)
+                self._notify(scheduled_scan_id, scheduled_scan.to_dict(parse_metadata=True))
+                
+                logger.info(f"Scheduled scan {scheduled_scan_id} completed with status {status}")
         
         except Exception as e:
             logger.exception(f"Error handling scan progress: {str(e)}")
@@ -224,8 +374,8 @@ class Scheduler:
             Tuple[bool, Optional[int], str]: (success, scheduled_scan_id, error_message)
         """
         try:
-            # Create scheduled scan
-            scheduled_scan = ScheduledScan.create(
+            # Create scheduled scan, inserted once all fields are set
+            scheduled_scan = ScheduledScan(
                 target=schedule_data.get('target', ''),
                 profile=schedule_data.get('profile', ''),
                 schedule_type=schedule_data.get('type', 'one_time')
@@ -234,15 +384,15 @@ class Scheduler:
             # Set type-specific fields
             if schedule_data.get('type') == 'one_time':
                 # One-time schedule
-                scheduled_time = datetime.datetime.fromisoformat(schedule_data.get('scheduled_time'))
+                scheduled_time = _fromiso(schedule_data.get('scheduled_time'))
                 scheduled_scan.scheduled_time = scheduled_time
                 scheduled_scan.next_run = scheduled_time
             else:
                 # Recurring schedule
                 scheduled_scan.interval_type = schedule_data.get('interval_type')
                 scheduled_scan.interval_value = schedule_data.get('interval_value')
-                scheduled_scan.start_time = datetime.datetime.fromisoformat(schedule_data.get('start_time'))
-                scheduled_scan.end_time = datetime.datetime.fromisoformat(schedule_data.get('end_time'))
+                scheduled_scan.start_time = _fromiso(schedule_data.get('start_time'))
+                scheduled_scan.end_time = _fromiso(schedule_data.get('end_time'))
                 scheduled_scan.next_run = scheduled_scan.calculate_next_run()
             
             # Save metadata
@@ -251,8 +401,10 @@ class Scheduler:
             # Save scheduled scan
             scheduled_scan.save()
             
-            # Ensure scheduler is running
+            # Ensure scheduler is running and picks up the new scan
             self.start()
+            self._wakeup.set()
+            self._notify(scheduled_scan.id, scheduled_scan.to_dict(parse_metadata=True))
             
             return True, scheduled_scan.id, ""
         
@@ -269,14 +421,10 @@ class Scheduler:
         """
         try:
             # Get all scheduled scans
-            scheduled_scans = list(ScheduledScan.select().order_by(ScheduledScan.created_at.desc()))
+            scheduled_scans = ScheduledScan.select().order_by(ScheduledScan.created_at.desc())
             
-            # Convert to dictionaries
-            result = []
-            for scan in scheduled_scans:
-                scan_dict = scan.to_dict()
-                scan_dict['metadata'] = scan.get_metadata()
-                result.append(scan_dict)
+            # Convert to dictionaries, metadata parsed once
+            result = [scan.to_dict(parse_metadata=True) for scan in scheduled_scans]
             
             return True, result, ""
         
@@ -303,15 +451,15 @@ class Scheduler:
                 return False, f"Scheduled scan already {scheduled_scan.status}"
             
             # Cancel active scan if running
-            with self.lock:
-                scan_id = self.active_scans.get(scheduled_scan_id)
-                if scan_id:
-                    self.scanner_manager.cancel_scan(scan_id)
-                    self.active_scans.pop(scheduled_scan_id, None)
+            scan_id = self.active_scans.pop(scheduled_scan_id, None)
+            if scan_id:
+                self.scanner_manager.cancel_scan(scan_id)
             
             # Update status
             scheduled_scan.status = 'cancelled'
             scheduled_scan.save()
+            self._wakeup.set()
+            self._notify(scheduled_scan_id, scheduled_scan.to_dict(parse_metadata=True))
             
             return True, ""
         
@@ -343,6 +491,8 @@ class Scheduler:
             
             # Delete scheduled scan
             scheduled_scan.delete_instance()
+            self._wakeup.set()
+            self._notify(scheduled_scan_id, None)
             
             return True, ""
         
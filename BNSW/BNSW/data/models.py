@@ -6,20 +6,105 @@ This module defines the database models for the BNSW application.
 
 import os
 import json
+import atexit
 import datetime
+import threading
 from peewee import *
+from playhouse.pool import PooledSqliteDatabase
+
+# orjson is an optional accelerator for metadata (de)serialization
+try:
+    import orjson
+    _USE_ORJSON = True
+except ImportError:
+    orjson = None
+    _USE_ORJSON = False
+
+# zstandard is optional, metadata is stored compressed when available
+try:
+    import zstandard
+    _USE_ZSTD = True
+except ImportError:
+    zstandard = None
+    _USE_ZSTD = False
+
+# Frame header of zstd compressed data
+_ZSTD_MAGIC = b'\x28\xb5\x2f\xfd'
+
+# Smaller metadata is not worth compressing
+_COMPRESS_MIN_SIZE = 256
+
+# zstd contexts are not thread-safe, keep one pair per thread
+_zstd_local = threading.local()
+
+
+def _zstd_contexts():
+    """Get this thread's zstd compressor and decompressor."""
+    if not hasattr(_zstd_local, 'compressor'):
+        _zstd_local.compressor = zstandard.ZstdCompressor(level=3)
+        _zstd_local.decompressor = zstandard.ZstdDecompressor()
+    return _zstd_local.compressor, _zstd_local.decompressor
+
+
+def _dumps(data):
+    """Serialize metadata to the stored form (compressed JSON bytes when possible)."""
+    if _USE_ORJSON:
+        raw = orjson.dumps(data)
+    else:
+        raw = json.dumps(data).encode('utf-8')
+    
+    if _USE_ZSTD and len(raw) >= _COMPRESS_MIN_SIZE:
+        compressor, _ = _zstd_contexts()
+        return compressor.compress(raw)
+    return raw
+
+
+def _metadata_json(value):
+    """Get JSON from a stored metadata value (text, JSON bytes or zstd bytes)."""
+    if isinstance(value, str):
+        return value
+    
+    value = bytes(value)
+    if value.startswith(_ZSTD_MAGIC):
+        if not _USE_ZSTD:
+            raise RuntimeError("zstandard is required to read compressed metadata")
+        _, decompressor = _zstd_contexts()
+        value = decompressor.decompress(value)
+    return value.decode('utf-8')
+
+
+def _loads(value):
+    """Parse a stored metadata value."""
+    text = _metadata_json(value)
+    if _USE_ORJSON:
+        return orjson.loads(text)
+    return json.loads(text)
+
+# Length of one recurring scan interval unit
+_INTERVAL_UNITS = {
+    'hours': datetime.timedelta(hours=1),
+    'days': datetime.timedelta(days=1),
+    'weeks': datetime.timedelta(weeks=1)
+}
+_DEFAULT_INTERVAL = datetime.timedelta(days=1)
 
 # Database file path
 DB_PATH = os.path.expanduser("~/.bnsw/bnsw.db")
 os.makedirs(os.path.dirname(DB_PATH), exist_ok=True)
 
-# Database instance
-db = SqliteDatabase(DB_PATH, pragmas={
+# Database instance, pooled so the scheduler and scan threads reuse connections.
+# Pooled connections move between threads, but each is used by one at a time.
+db = PooledSqliteDatabase(DB_PATH, max_connections=8, stale_timeout=300, timeout=10,
+                          check_same_thread=False, pragmas={
     'journal_mode': 'wal',
     'cache_size': -1 * 64000,  # 64MB
     'foreign_keys': 1,
     'ignore_check_constraints': 0,
-    'synchronous': 0
+    # With WAL only checkpoints sync, commits may be lost on power loss but
+    # the database stays intact
+    'synchronous': 1,
+    'temp_store': 2,  # Memory
+    'mmap_size': 256 * 1024 * 1024  # 256MB
 })
 
 class BaseModel(Model):
@@ -28,19 +113,74 @@ class BaseModel(Model):
     class Meta:
         database = db
     
-    def to_dict(self):
-        """Convert model to dictionary."""
+    # Parsed metadata, paired with the stored value it was parsed from
+    _metadata_cache = None
+    
+    @staticmethod
+    def build_metadata(data):
+        """Get the stored metadata value for data, for use in create()/insert()."""
+        return _dumps(data)
+    
+    def set_metadata(self, data):
+        """Set metadata as JSON."""
+        self.metadata = _dumps(data)
+    
+    def get_metadata(self):
+        """Get metadata as dictionary."""
+        if not self.metadata:
+            return {}
+        if self._metadata_cache is None or self._metadata_cache[0] is not self.metadata:
+            self._metadata_cache = (self.metadata, _loads(self.metadata))
+        return self._metadata_cache[1]
+    
+    def to_dict(self, parse_metadata=False):
+        """
+        Convert model to dictionary.
+        
+        Args:
+            parse_metadata: Give metadata as a dictionary instead of JSON text
+            
+        Returns:
+            dict: Field values, foreign keys as the related row's ID
+        """
         data = {}
-        for field in self._meta.fields:
+        for field in self._meta.sorted_fields:
             field_name = field.name
-            field_value = getattr(self, field_name)
+            # Raw value, so foreign keys don't query the related row
+            field_value = self.__data__.get(field_name)
             
             # Handle special field types
             if isinstance(field_value, datetime.datetime):
                 field_value = field_value.isoformat()
+            elif field_name == 'metadata':
+                if parse_metadata:
+                    field_value = self.get_metadata()
+                elif field_value is not None:
+                    # Metadata is handed out as JSON text however it is stored
+                    field_value = _metadata_json(field_value)
             
             data[field_name] = field_value
         return data
+    
+    @staticmethod
+    def row_to_dict(row):
+        """
+        Convert a row from a .dicts() query the way to_dict() converts a model.
+        
+        Args:
+            row: Row dictionary, converted in place
+            
+        Returns:
+            dict: The row
+        """
+        for field_name, field_value in row.items():
+            if isinstance(field_value, datetime.datetime):
+                row[field_name] = field_value.isoformat()
+        
+        metadata = row.get('metadata')
+        if metadata is not None:
+            row['metadata'] = _metadata_json(metadata)
+        return row
 
 class Scan(BaseModel):
     """Scan model."""
@@ -51,17 +191,13 @@ class Scan(BaseModel):
     start_time = DateTimeField(default=datetime.datetime.now)
     end_time = DateTimeField(null=True)
     status = CharField(default='running')
-    metadata = TextField(null=True)
+    metadata = BlobField(null=True)
     
-    def set_metadata(self, data):
-        """Set metadata as JSON."""
-        self.metadata = json.dumps(data)
-    
-    def get_metadata(self):
-        """Get metadata as dictionary."""
-        if not self.metadata:
-            return {}
-        return json.loads(self.metadata)
+    class Meta:
+        # Covers the scan history list, newest first, without reading scan rows
+        indexes = (
+            (('start_time', 'scan_id', 'target', 'command', 'status'), False),
+        )
 
 class Host(BaseModel):
     """Host model."""
@@ -72,17 +208,12 @@ class Host(BaseModel):
     status = CharField()
     mac = CharField(null=True)
     os = CharField(null=True)
-    metadata = TextField(null=True)
+    metadata = BlobField(null=True)
     
-    def set_metadata(self, data):
-        """Set metadata as JSON."""
-        self.metadata = json.dumps(data)
-    
-    def get_metadata(self):
-        """Get metadata as dictionary."""
-        if not self.metadata:
-            return {}
-        return json.loads(self.metadata)
+    class Meta:
+        indexes = (
+            (('scan', 'ip'), False),
+        )
 
 class Port(BaseModel):
     """Port model."""
@@ -93,17 +224,13 @@ class Port(BaseModel):
     state = CharField()
     service = CharField(null=True)
     version = CharField(null=True)
-    metadata = TextField(null=True)
-    
-    def set_metadata(self, data):
-        """Set metadata as JSON."""
-        self.metadata = json.dumps(data)
+    metadata = BlobField(null=True)
     
-    def get_metadata(self):
-        """Get metadata as dictionary."""
-        if not self.metadata:
-            return {}
-        return json.loads(self.metadata)
+    class Meta:
+        # Natural key of a port row
+        indexes = (
+            (('host', 'port', 'protocol'), False),
+        )
 
 class Script(BaseModel):
     """Script model."""
@@ -112,17 +239,13 @@ class Script(BaseModel):
     host = ForeignKeyField(Host, backref='scripts', on_delete='CASCADE', null=True)
     name = CharField()
     output = TextField()
-    metadata = TextField(null=True)
+    metadata = BlobField(null=True)
     
-    def set_metadata(self, data):
-        """Set metadata as JSON."""
-        self.metadata = json.dumps(data)
-    
-    def get_metadata(self):
-        """Get metadata as dictionary."""
-        if not self.metadata:
-            return {}
-        return json.loads(self.metadata)
+    class Meta:
+        indexes = (
+            (('port', 'name'), False),
+            (('host', 'name'), False),
+        )
 
 class ScheduledScan(BaseModel):
     """Scheduled scan model."""
@@ -139,22 +262,21 @@ class ScheduledScan(BaseModel):
     last_run = DateTimeField(null=True)
     next_run = DateTimeField(null=True)
     status = CharField(default='pending')  # 'pending', 'running', 'completed', 'cancelled', 'error'
-    metadata = TextField(null=True)
+    metadata = BlobField(null=True)
     
-    def set_metadata(self, data):
-        """Set metadata as JSON."""
-        self.metadata = json.dumps(data)
-    
-    def get_metadata(self):
-        """Get metadata as dictionary."""
-        if not self.metadata:
-            return {}
-        return json.loads(self.metadata)
+    class Meta:
+        # The scheduler looks up pending scans by next run time
+        indexes = (
+            (('status', 'next_run'), False),
+        )
     
-    def calculate_next_run(self):
+    def calculate_next_run(self, now=None):
         """
         Calculate next run time based on schedule type and parameters.
         
+        Args:
+            now: Current time, taken from the clock if not given
+            
         Returns:
             datetime.datetime: Next run time
         """
@@ -166,7 +288,8 @@ class ScheduledScan(BaseModel):
         
         elif self.schedule_type == 'recurring':
             # Get current time
-            now = datetime.datetime.now()
+            if now is None:
+                now = datetime.datetime.now()
             
             # If we haven't started yet, return start_time
             if not self.last_run and self.start_time > now:
@@ -180,15 +303,12 @@ class ScheduledScan(BaseModel):
             base_time = self.last_run if self.last_run else now
             
             # Calculate interval
-            if self.interval_type == 'hours':
-                delta = datetime.timedelta(hours=self.interval_value)
-            elif self.interval_type == 'days':
-                delta = datetime.timedelta(days=self.interval_value)
-            elif self.interval_type == 'weeks':
-                delta = datetime.timedelta(weeks=self.interval_value)
+            unit = _INTERVAL_UNITS.get(self.interval_type)
+            if unit is not None:
+                delta = unit * self.interval_value
             else:
                 # Default to daily
-                delta = datetime.timedelta(days=1)
+                delta = _DEFAULT_INTERVAL
             
             # Calculate next run
             next_run = base_time + delta
@@ -201,8 +321,44 @@ class ScheduledScan(BaseModel):
         
         return None
 
+def _compress_metadata():
+    """Rewrite metadata stored as JSON text in the compressed form."""
+    for model in (Scan, Host, Port, Script, ScheduledScan):
+        rows = list(model
+                    .select(model._meta.primary_key, model.metadata)
+                    .where(fn.typeof(model.metadata) == 'text')
+                    .tuples())
+        for pk, metadata in rows:
+            (model
+             .update(metadata=_dumps(_loads(metadata)))
+             .where(model._meta.primary_key == pk)
+             .execute())
+
+
 def initialize_database():
     """Initialize database."""
     db.connect()
+    # Also adds indexes missing from databases created by older versions
     db.create_tables([Scan, Host, Port, Script, ScheduledScan])
+    
+    # One-time migration of metadata written as text by older versions
+    if _USE_ZSTD and db.pragma('user_version') < 1:
+        with db.atomic():
+            _compress_metadata()
+            db.pragma('user_version', 1)
+    
     db.close()
+
+
+@atexit.register
+def _optimize_database():
+    """Let SQLite refresh the query planner's statistics, as it advises before closing."""
+    if not os.path.exists(DB_PATH):
+        return
+    try:
+        with db.connection_context():
+            # Don't hold up exit waiting for another writer
+            db.execute_sql('PRAGMA busy_timeout = 100')
+            db.execute_sql('PRAGMA optimize')
+    except OperationalError:
+        pass
@@ -5,29 +5,227 @@ This module provides repository classes for database operations.
 """
 
 import logging
+import functools
 import threading
+import collections
+import sqlite3
 import datetime
-import traceback
-from typing import Dict, List, Any, Optional, Tuple
+from typing import Dict, Iterable, List, Any, Optional, Tuple
 
-from peewee import DatabaseError, IntegrityError, OperationalError, DoesNotExist
+from peewee import DatabaseError, IntegrityError, OperationalError, DoesNotExist, chunked
 
 from BNSW.data.models import db, Scan, Host, Port, Script
 
 # Set up logger
 logger = logging.getLogger('BNSW.data.repositories')
 
+# Rows per multi-row INSERT, keeps statements under SQLite's variable limit
+_INSERT_BATCH_SIZE = 100
+
+# INSERT ... RETURNING needs SQLite 3.35+
+_HAS_RETURNING = sqlite3.sqlite_version_info >= (3, 35, 0)
+
+# Local time, like the model defaults and the scheduler
+_now = datetime.datetime.now
+
+# SELECT by primary key SQL per model, generated once instead of on every lookup
+_select_by_id_sql = {}
+
+def _get_or_none(model, row_id):
+    """
+    Get a row by primary key, reusing the generated SQL.
+    
+    Args:
+        model: Model class
+        row_id: Primary key value
+        
+    Returns:
+        Optional[Model]: The row, None if it does not exist
+    """
+    sql = _select_by_id_sql.get(model)
+    if sql is None:
+        sql, _ = model.select().where(model._meta.primary_key == 0).sql()
+        _select_by_id_sql[model] = sql
+    
+    for row in model.raw(sql, row_id):
+        return row
+    return None
+
+def _stream(query):
+    """
+    Iterate a query's rows one at a time, holding a connection until done.
+    
+    A connection is only opened, and released once the iteration ends or
+    is abandoned, if the thread has none open, so the rows can also be
+    streamed inside a caller's transaction.
+    
+    Args:
+        query: Select query
+        
+    Yields:
+        Model: Rows, not cached by the query
+    """
+    opened = db.is_closed()
+    if opened:
+        db.connect()
+    try:
+        yield from query.iterator()
+    finally:
+        if opened:
+            db.close()
+
+class _ScanDetailsCache:
+    """Bounded LRU cache of get_scan_with_details results, keyed by scan ID and depth."""
+    
+    def __init__(self, maxsize):
+        """
+        Initialize cache.
+        
+        Args:
+            maxsize: Maximum number of cached scans
+        """
+        self.maxsize = maxsize
+        # Scan ID -> {depth: details}
+        self.entries = collections.OrderedDict()
+        self.lock = threading.Lock()
+    
+    def get(self, scan_id, depth):
+        """Get cached details of a scan at a depth, or None."""
+        with self.lock:
+            by_depth = self.entries.get(scan_id)
+            if by_depth is None:
+                return None
+            self.entries.move_to_end(scan_id)
+            return by_depth.get(depth)
+    
+    def put(self, scan_id, depth, details):
+        """Cache details of a scan at a depth, evicting the least recently used scan."""
+        with self.lock:
+            self.entries.setdefault(scan_id, {})[depth] = details
+            self.entries.move_to_end(scan_id)
+            while len(self.entries) > self.maxsize:
+                self.entries.popitem(last=False)
+    
+    def invalidate(self, scan_id=None):
+        """Drop a scan from the cache, or every scan if no ID is given."""
+        with self.lock:
+            if scan_id is None:
+                self.entries.clear()
+            else:
+                self.entries.pop(scan_id, None)
+
+# Shared by all database managers, so a change through one is seen by all
+_scan_details_cache = _ScanDetailsCache(maxsize=16)
+
+# How much of a scan get_scan_with_details loads, each level adding to the previous
+_DETAIL_DEPTHS = ('scan', 'hosts', 'ports', 'full')
+
+def _db_operation(action, missing=None, empty=None, returns_value=True):
+    """
+    Decorator reporting the outcome of a repository operation as a result tuple.
+    
+    The wrapped method only does the happy path: it returns its value (if
+    any) and lets exceptions propagate. They are logged here and turned into
+    the error message.
+    
+    A connection is held while the method runs. It is only opened and
+    closed here if the thread has none open, so operations can also run
+    inside a caller's connection or transaction.
+    
+    Args:
+        action: What the operation does, for log messages (e.g. 'creating scan')
+        missing: Model name reported when the row does not exist, the first
+            argument being its ID. Operations giving a value return None for
+            a missing row rather than raising DoesNotExist
+        empty: Type of the value returned on failure (e.g. list), None if not given
+        returns_value: False for operations that only report success
+        
+    Returns:
+        Callable: Decorator giving (success, value, error_message), or
+        (success, error_message) if returns_value is False
+    """
+    def decorator(method):
+        def failure(error):
+            if not returns_value:
+                return False, error
+            return False, (empty() if empty else None), error
+        
+        def not_found(args, kwargs):
+            row_id = args[0] if args else next(iter(kwargs.values()), None)
+            error = f"{missing} with ID {row_id} does not exist"
+            logger.warning(error)
+            return failure(error)
+        
+        @functools.wraps(method)
+        def wrapper(self, *args, **kwargs):
+            opened = db.is_closed()
+            try:
+                if opened:
+                    db.connect()
+                value = method(self, *args, **kwargs)
+                if not returns_value:
+                    return True, ""
+                if value is None and missing is not None:
+                    return not_found(args, kwargs)
+                return True, value, ""
+            
+            except DoesNotExist as e:
+                if missing is None:
+                    logger.exception("Unexpected error %s: %s", action, e)
+                    return failure(f"Unexpected error: {str(e)}")
+                return not_found(args, kwargs)
+            
+            except IntegrityError as e:
+                logger.error("Database integrity error %s: %s", action, e)
+                return failure(f"Database integrity error: {str(e)}")
+            
+            except OperationalError as e:
+                logger.error("Database operational error %s: %s", action, e)
+                return failure(f"Database operational error: {str(e)}")
+            
+            except DatabaseError as e:
+                logger.error("Database error %s: %s", action, e)
+                return failure(f"Database error: {str(e)}")
+            
+            except Exception as e:
+                logger.exception("Unexpected error %s: %s", action, e)
+                return failure(f"Unexpected error: {str(e)}")
+            
+            finally:
+                if opened and not db.is_closed():
+                    db.close()
+        return wrapper
+    return decorator
+
 class DatabaseManager:
     """Database manager for coordinating repository operations."""
     
+    _instance = None
+    _instance_lock = threading.Lock()
+    
+    @classmethod
+    def instance(cls):
+        """
+        Get the database manager shared by the application.
+        
+        Returns:
+            DatabaseManager: Shared manager, created on first use
+        """
+        with cls._instance_lock:
+            if cls._instance is None:
+                cls._instance = cls()
+            return cls._instance
+    
     def __init__(self):
         """Initialize database manager."""
-        self.lock = threading.RLock()
+        # Serializes writes, reads run concurrently on their own connections (WAL)
+        self.lock = threading.Lock()
         self.scan_repo = ScanRepository(self.lock)
         self.host_repo = HostRepository(self.lock)
         self.port_repo = PortRepository(self.lock)
         self.script_repo = ScriptRepository(self.lock)
     
+    @_db_operation('saving scan result')
     def save_scan_result(self, scan_id: str, result: Dict[str, Any]) -> Tuple[bool, Optional[int], str]:
         """
         Save scan result to database.
@@ -39,135 +237,159 @@ class DatabaseManager:
         Returns:
             Tuple[bool, Optional[int], str]: (success, database_id, error_message)
         """
-        with self.lock:
-            try:
-                # Begin transaction
-                with db.atomic():
-                    # Create scan record
-                    scan_info = result.get('scan_info', {})
-                    hosts = result.get('hosts', [])
-                    
-                    # Create scan
-                    scan = Scan.create(
-                        target=scan_info.get('target', ''),
-                        command=scan_info.get('args', ''),
-                        start_time=datetime.datetime.now(),
-                        end_time=datetime.datetime.now(),
-                        status='completed'
-                    )
-                    scan.set_metadata(scan_info)
-                    scan.save()
-                    
-                    # Create hosts
-                    for host_data in hosts:
-                        # Create host
-                        host = Host.create(
-                            scan=scan,
-                            ip=host_data.get('ip', ''),
-                            hostname=host_data.get('hostname', None),
-                            status=host_data.get('status', 'up'),
-                            mac=host_data.get('mac', None),
-                            os=host_data.get('os', {}).get('name', None)
-                        )
-                        host.set_metadata(host_data)
-                        host.save()
-                        
-                        # Create ports
-                        for port_data in host_data.get('ports', []):
-                            try:
-                                port_number = int(port_data.get('portid', 0))
-                                port = Port.create(
-                                    host=host,
-                                    port=port_number,
-                                    protocol=port_data.get('protocol', ''),
-                                    state=port_data.get('state', ''),
-                                    service=port_data.get('service', ''),
-                                    version=port_data.get('version', '')
-                                )
-                                port.set_metadata(port_data)
-                                port.save()
-                            except (ValueError, TypeError) as e:
-                                # Log error but continue with other ports
-                                logger.warning(f"Error creating port: {str(e)}")
-                                continue
-                    
-                    return True, scan.id, ""
-            
-            except IntegrityError as e:
-                logger.error(f"Database integrity error: {str(e)}")
-                return False, None, f"Database integrity error: {str(e)}"
+        scan_info = result.get('scan_info', {})
+        hosts = result.get('hosts', [])
+        
+        # Build all rows before taking the write lock, the IDs linking them
+        # are filled in while inserting
+        host_rows = [{
+            'ip': host_data.get('ip', ''),
+            'hostname': host_data.get('hostname', None),
+            'status': host_data.get('status', 'up'),
+            'mac': host_data.get('mac', None),
+            'os': host_data.get('os', {}).get('name', None),
+            'metadata': Host.build_metadata(host_data)
+        } for host_data in hosts]
+        
+        host_port_rows = []
+        for host_data in hosts:
+            port_rows = []
+            for port_data in host_data.get('ports', []):
+                try:
+                    port_number = int(port_data.get('portid', 0))
+                except (ValueError, TypeError) as e:
+                    # Log error but continue with other ports
+                    logger.warning("Error creating port: %s", e)
+                    continue
+                
+                port_rows.append({
+                    'port': port_number,
+                    'protocol': port_data.get('protocol', ''),
+                    'state': port_data.get('state', ''),
+                    'service': port_data.get('service', ''),
+                    'version': port_data.get('version', ''),
+                    'metadata': Port.build_metadata(port_data)
+                })
+            host_port_rows.append(port_rows)
+        
+        # SQLite serializes writers itself, the write lock is taken when the
+        # transaction begins so writers wait their turn instead of failing
+        with db.atomic(lock_type='IMMEDIATE'):
+            # Create scan
+            now = _now()
+            scan = Scan.create(
+                target=scan_info.get('target', ''),
+                command=scan_info.get('args', ''),
+                start_time=now,
+                end_time=now,
+                status='completed',
+                metadata=Scan.build_metadata(scan_info)
+            )
             
-            except OperationalError as e:
-                logger.error(f"Database operational error: {str(e)}")
-                return False, None, f"Database operational error: {str(e)}"
+            # Create hosts
+            for row in host_rows:
+                row['scan'] = scan.scan_id
+            if _HAS_RETURNING:
+                host_ids = []
+                for batch in chunked(host_rows, _INSERT_BATCH_SIZE):
+                    # RETURNING order is unspecified, but IDs increase in insertion order
+                    cursor = Host.insert_many(batch).returning(Host.id).tuples().execute()
+                    host_ids.extend(sorted(host_id for host_id, in cursor))
+            else:
+                for batch in chunked(host_rows, _INSERT_BATCH_SIZE):
+                    Host.insert_many(batch).execute()
+                
+                # Host IDs, in insertion order
+                host_ids = [host_id for host_id, in Host
+                            .select(Host.id)
+                            .where(Host.scan == scan.scan_id)
+                            .order_by(Host.id)
+                            .tuples()]
             
-            except DatabaseError as e:
-                logger.error(f"Database error: {str(e)}")
-                return False, None, f"Database error: {str(e)}"
+            # Create ports
+            port_rows = []
+            for host_id, rows in zip(host_ids, host_port_rows):
+                for row in rows:
+                    row['host'] = host_id
+                port_rows.extend(rows)
+            for batch in chunked(port_rows, _INSERT_BATCH_SIZE):
+                Port.insert_many(batch).execute()
             
-            except Exception as e:
-                logger.error(f"Unexpected error saving scan result: {str(e)}")
-                logger.debug(traceback.format_exc())
-                return False, None, f"Unexpected error: {str(e)}"
+            return scan.scan_id
     
-    def get_scan_with_details(self, scan_id: int) -> Tuple[bool, Dict[str, Any], str]:
+    @_db_operation('retrieving scan', missing='Scan', empty=dict)
+    def get_scan_with_details(self, scan_id: int, depth: str = 'full') -> Tuple[bool, Dict[str, Any], str]:
         """
         Get scan with all details.
         
+        Results are cached and shared between callers, they must not be modified.
+        
         Args:
             scan_id: Database ID of scan
+            depth: How much to load: 'scan' for the scan only, 'hosts' to add
+                its hosts, 'ports' to add their ports, 'full' to add scripts
             
         Returns:
             Tuple[bool, Dict[str, Any], str]: (success, scan_details, error_message)
         """
-        with self.lock:
-            try:
-                # Get scan
-                scan = Scan.get_by_id(scan_id)
-                
-                # Build result
-                result = scan.to_dict()
-                result['hosts'] = []
-                
-                # Get hosts
-                for host in scan.hosts:
-                    host_data = host.to_dict()
-                    host_data['ports'] = []
-                    
-                    # Get ports
-                    for port in host.ports:
-                        port_data = port.to_dict()
-                        port_data['scripts'] = []
-                        
-                        # Get scripts
-                        for script in port.scripts:
-                            script_data = script.to_dict()
-                            port_data['scripts'].append(script_data)
-                        
-                        host_data['ports'].append(port_data)
-                    
-                    # Get host scripts
-                    host_data['scripts'] = []
-                    for script in host.scripts:
-                        script_data = script.to_dict()
-                        host_data['scripts'].append(script_data)
-                    
-                    result['hosts'].append(host_data)
-                
-                return True, result, ""
-            
-            except DoesNotExist:
-                logger.warning(f"Scan with ID {scan_id} does not exist")
-                return False, {}, f"Scan with ID {scan_id} does not exist"
-            
-            except DatabaseError as e:
-                logger.error(f"Database error retrieving scan: {str(e)}")
-                return False, {}, f"Database error: {str(e)}"
-            
-            except Exception as e:
-                logger.error(f"Unexpected error retrieving scan: {str(e)}")
-                logger.debug(traceback.format_exc())
-                return False, {}, f"Unexpected error: {str(e)}"
+        if depth not in _DETAIL_DEPTHS:
+            raise ValueError(f"Invalid depth: {depth}")
+        
+        result = _scan_details_cache.get(scan_id, depth)
+        if result is not None:
+            return result
+        
+        # Get scan
+        scan = _get_or_none(Scan, scan_id)
+        if scan is None:
+            return None
+        
+        # Build result
+        result = scan.to_dict()
+        if depth == 'scan':
+            _scan_details_cache.put(scan_id, depth, result)
+            return result
+        
+        # Fetch the hosts, ports and scripts of the scan in a query each, as
+        # plain rows since they are only converted to dictionaries
+        hosts = list(Host.select().where(Host.scan == scan_id).order_by(Host.id).dicts())
+        scan_hosts = Host.select(Host.id).where(Host.scan == scan_id)
+        
+        # Group children by parent
+        host_scripts = {}
+        port_scripts = {}
+        if depth == 'full':
+            scripts = Script.select().where(
+                Script.host.in_(scan_hosts) |
+                Script.port.in_(Port.select(Port.id).where(Port.host.in_(scan_hosts)))
+            ).order_by(Script.id).dicts()
+            for script_data in scripts:
+                Script.row_to_dict(script_data)
+                if script_data['host'] is not None:
+                    host_scripts.setdefault(script_data['host'], []).append(script_data)
+                if script_data['port'] is not None:
+                    port_scripts.setdefault(script_data['port'], []).append(script_data)
+        
+        host_ports = {}
+        if depth != 'hosts':
+            ports = Port.select().where(Port.host.in_(scan_hosts)).order_by(Port.id).dicts()
+            for port_data in ports:
+                Port.row_to_dict(port_data)
+                if depth == 'full':
+                    port_data['scripts'] = port_scripts.get(port_data['id'], [])
+                host_ports.setdefault(port_data['host'], []).append(port_data)
+        
+        result['hosts'] = []
+        for host_data in hosts:
+            Host.row_to_dict(host_data)
+            if depth != 'hosts':
+                host_data['ports'] = host_ports.get(host_data['id'], [])
+            if depth == 'full':
+                host_data['scripts'] = host_scripts.get(host_data['id'], [])
+            result['hosts'].append(host_data)
+        
+        _scan_details_cache.put(scan_id, depth, result)
+        return result
 
 class BaseRepository:
     """Base repository class."""
@@ -177,13 +399,14 @@ class BaseRepository:
         Initialize repository.
         
         Args:
-            lock: Thread lock
+            lock: Thread lock, held by write operations
         """
         self.lock = lock
 
 class ScanRepository(BaseRepository):
     """Repository for scan operations."""
     
+    @_db_operation('creating scan')
     def create(self, target: str, command: str) -> Tuple[bool, Optional[Scan], str]:
         """
         Create scan.
@@ -196,25 +419,14 @@ class ScanRepository(BaseRepository):
             Tuple[bool, Optional[Scan], str]: (success, scan, error_message)
         """
         with self.lock:
-            try:
-                scan = Scan.create(
-                    target=target,
-                    command=command,
-                    start_time=datetime.datetime.now(),
-                    status='running'
-                )
-                return True, scan, ""
-            except IntegrityError as e:
-                logger.error(f"Database integrity error creating scan: {str(e)}")
-                return False, None, f"Database integrity error: {str(e)}"
-            except DatabaseError as e:
-                logger.error(f"Database error creating scan: {str(e)}")
-                return False, None, f"Database error: {str(e)}"
-            except Exception as e:
-                logger.error(f"Unexpected error creating scan: {str(e)}")
-                logger.debug(traceback.format_exc())
-                return False, None, f"Unexpected error: {str(e)}"
+            return Scan.create(
+                target=target,
+                command=command,
+                start_time=_now(),
+                status='running'
+            )
     
+    @_db_operation('updating scan status', missing='Scan', returns_value=False)
     def update_status(self, scan_id: int, status: str) -> Tuple[bool, str]:
         """
         Update scan status.
@@ -227,48 +439,39 @@ class ScanRepository(BaseRepository):
             Tuple[bool, str]: (success, error_message)
         """
         with self.lock:
-            try:
-                scan = Scan.get_by_id(scan_id)
-                scan.status = status
-                
-                if status in ['completed', 'failed', 'cancelled']:
-                    scan.end_time = datetime.datetime.now()
-                
-                scan.save()
-                return True, ""
+            scan = _get_or_none(Scan, scan_id)
+            if scan is None:
+                raise Scan.DoesNotExist()
+            scan.status = status
             
-            except DoesNotExist:
-                logger.warning(f"Scan with ID {scan_id} does not exist")
-                return False, f"Scan with ID {scan_id} does not exist"
+            if status in ['completed', 'failed', 'cancelled']:
+                scan.end_time = _now()
             
-            except DatabaseError as e:
-                logger.error(f"Database error updating scan status: {str(e)}")
-                return False, f"Database error: {str(e)}"
-            
-            except Exception as e:
-                logger.error(f"Unexpected error updating scan status: {str(e)}")
-                logger.debug(traceback.format_exc())
-                return False, f"Unexpected error: {str(e)}"
+            scan.save()
+            _scan_details_cache.invalidate(scan_id)
     
-    def get_all(self) -> Tuple[bool, List[Scan], str]:
+    @_db_operation('retrieving scans', empty=list)
+    def get_all(self, limit: Optional[int] = None, offset: int = 0) -> Tuple[bool, List[Dict[str, Any]], str]:
         """
-        Get all scans.
+        Get all scans, newest first, for listing.
         
+        Args:
+            limit: Maximum number of scans, all if not given
+            offset: Number of scans to skip
+            
         Returns:
-            Tuple[bool, List[Scan], str]: (success, scans, error_message)
-        """
-        with self.lock:
-            try:
-                scans = list(Scan.select().order_by(Scan.start_time.desc()))
-                return True, scans, ""
-            except DatabaseError as e:
-                logger.error(f"Database error retrieving scans: {str(e)}")
-                return False, [], f"Database error: {str(e)}"
-            except Exception as e:
-                logger.error(f"Unexpected error retrieving scans: {str(e)}")
-                logger.debug(traceback.format_exc())
-                return False, [], f"Unexpected error: {str(e)}"
+            Tuple[bool, List[Dict[str, Any]], str]: (success, scans, error_message),
+            scans having scan_id, target, command, start_time and status
+        """
+        query = (Scan
+                 .select(Scan.scan_id, Scan.target, Scan.command, Scan.start_time, Scan.status)
+                 .order_by(Scan.start_time.desc())
+                 .offset(offset))
+        if limit is not None:
+            query = query.limit(limit)
+        return list(query.dicts())
     
+    @_db_operation('retrieving scan', missing='Scan')
     def get_by_id(self, scan_id: int) -> Tuple[bool, Optional[Scan], str]:
         """
         Get scan by ID.
@@ -279,21 +482,9 @@ class ScanRepository(BaseRepository):
         Returns:
             Tuple[bool, Optional[Scan], str]: (success, scan, error_message)
         """
-        with self.lock:
-            try:
-                scan = Scan.get_by_id(scan_id)
-                return True, scan, ""
-            except DoesNotExist:
-                logger.warning(f"Scan with ID {scan_id} does not exist")
-                return False, None, f"Scan with ID {scan_id} does not exist"
-            except DatabaseError as e:
-                logger.error(f"Database error retrieving scan: {str(e)}")
-                return False, None, f"Database error: {str(e)}"
-            except Exception as e:
-                logger.error(f"Unexpected error retrieving scan: {str(e)}")
-                logger.debug(traceback.format_exc())
-                return False, None, f"Unexpected error: {str(e)}"
+        return _get_or_none(Scan, scan_id)
     
+    @_db_operation('deleting scan', missing='Scan', returns_value=False)
     def delete(self, scan_id: int) -> Tuple[bool, str]:
         """
         Delete scan.
@@ -305,27 +496,16 @@ class ScanRepository(BaseRepository):
             Tuple[bool, str]: (success, error_message)
         """
         with self.lock:
-            try:
-                scan = Scan.get_by_id(scan_id)
-                scan.delete_instance(recursive=True)
-                return True, ""
-            
-            except DoesNotExist:
-                logger.warning(f"Scan with ID {scan_id} does not exist")
-                return False, f"Scan with ID {scan_id} does not exist"
-            
-            except DatabaseError as e:
-                logger.error(f"Database error deleting scan: {str(e)}")
-                return False, f"Database error: {str(e)}"
-            
-            except Exception as e:
-                logger.error(f"Unexpected error deleting scan: {str(e)}")
-                logger.debug(traceback.format_exc())
-                return False, f"Unexpected error: {str(e)}"
+            scan = _get_or_none(Scan, scan_id)
+            if scan is None:
+                raise Scan.DoesNotExist()
+            scan.delete_instance(recursive=True)
+            _scan_details_cache.invalidate(scan_id)
 
 class HostRepository(BaseRepository):
     """Repository for host operations."""
     
+    @_db_operation('creating host')
     def create(self, scan_id: int, ip: str, hostname: str = None, status: str = 'up',
                mac: str = None, os: str = None) -> Tuple[bool, Optional[Host], str]:
         """
@@ -343,49 +523,36 @@ class HostRepository(BaseRepository):
             Tuple[bool, Optional[Host], str]: (success, host, error_message)
         """
         with self.lock:
-            try:
-                host = Host.create(
-                    scan_id=scan_id,
-                    ip=ip,
-                    hostname=hostname,
-                    status=status,
-                    mac=mac,
-                    os=os
-                )
-                return True, host, ""
-            except IntegrityError as e:
-                logger.error(f"Database integrity error creating host: {str(e)}")
-                return False, None, f"Database integrity error: {str(e)}"
-            except DatabaseError as e:
-                logger.error(f"Database error creating host: {str(e)}")
-                return False, None, f"Database error: {str(e)}"
-            except Exception as e:
-                logger.error(f"Unexpected error creating host: {str(e)}")
-                logger.debug(traceback.format_exc())
-                return False, None, f"Unexpected error: {str(e)}"
+            host = Host.create(
+                scan_id=scan_id,
+                ip=ip,
+                hostname=hostname,
+                status=status,
+                mac=mac,
+                os=os
+            )
+            _scan_details_cache.invalidate(scan_id)
+            return host
     
-    def get_by_scan(self, scan_id: int) -> Tuple[bool, List[Host], str]:
+    @_db_operation('retrieving hosts', empty=list)
+    def get_by_scan(self, scan_id: int, stream: bool = False) -> Tuple[bool, Iterable[Host], str]:
         """
         Get hosts by scan ID.
         
         Args:
             scan_id: Scan ID
+            stream: Give an iterator fetching rows as it goes instead of a list,
+                errors while iterating are raised to the caller
             
         Returns:
-            Tuple[bool, List[Host], str]: (success, hosts, error_message)
+            Tuple[bool, Iterable[Host], str]: (success, hosts, error_message)
         """
-        with self.lock:
-            try:
-                hosts = list(Host.select().where(Host.scan_id == scan_id))
-                return True, hosts, ""
-            except DatabaseError as e:
-                logger.error(f"Database error retrieving hosts: {str(e)}")
-                return False, [], f"Database error: {str(e)}"
-            except Exception as e:
-                logger.error(f"Unexpected error retrieving hosts: {str(e)}")
-                logger.debug(traceback.format_exc())
-                return False, [], f"Unexpected error: {str(e)}"
+        query = Host.select().where(Host.scan_id == scan_id)
+        if stream:
+            return _stream(query)
+        return list(query)
     
+    @_db_operation('retrieving host', missing='Host')
     def get_by_id(self, host_id: int) -> Tuple[bool, Optional[Host], str]:
         """
         Get host by ID.
@@ -396,24 +563,12 @@ class HostRepository(BaseRepository):
         Returns:
             Tuple[bool, Optional[Host], str]: (success, host, error_message)
         """
-        with self.lock:
-            try:
-                host = Host.get_by_id(host_id)
-                return True, host, ""
-            except DoesNotExist:
-                logger.warning(f"Host with ID {host_id} does not exist")
-                return False, None, f"Host with ID {host_id} does not exist"
-            except DatabaseError as e:
-                logger.error(f"Database error retrieving host: {str(e)}")
-                return False, None, f"Database error: {str(e)}"
-            except Exception as e:
-                logger.error(f"Unexpected error retrieving host: {str(e)}")
-                logger.debug(traceback.format_exc())
-                return False, None, f"Unexpected error: {str(e)}"
+        return _get_or_none(Host, host_id)
 
 class PortRepository(BaseRepository):
     """Repository for port operations."""
     
+    @_db_operation('creating port')
     def create(self, host_id: int, port: int, protocol: str, state: str,
                service: str = None, version: str = None) -> Tuple[bool, Optional[Port], str]:
         """
@@ -431,49 +586,37 @@ class PortRepository(BaseRepository):
             Tuple[bool, Optional[Port], str]: (success, port, error_message)
         """
         with self.lock:
-            try:
-                port_obj = Port.create(
-                    host_id=host_id,
-                    port=port,
-                    protocol=protocol,
-                    state=state,
-                    service=service,
-                    version=version
-                )
-                return True, port_obj, ""
-            except IntegrityError as e:
-                logger.error(f"Database integrity error creating port: {str(e)}")
-                return False, None, f"Database integrity error: {str(e)}"
-            except DatabaseError as e:
-                logger.error(f"Database error creating port: {str(e)}")
-                return False, None, f"Database error: {str(e)}"
-            except Exception as e:
-                logger.error(f"Unexpected error creating port: {str(e)}")
-                logger.debug(traceback.format_exc())
-                return False, None, f"Unexpected error: {str(e)}"
+            port_obj = Port.create(
+                host_id=host_id,
+                port=port,
+                protocol=protocol,
+                state=state,
+                service=service,
+                version=version
+            )
+            # The scan is not known here
+            _scan_details_cache.invalidate()
+            return port_obj
     
-    def get_by_host(self, host_id: int) -> Tuple[bool, List[Port], str]:
+    @_db_operation('retrieving ports', empty=list)
+    def get_by_host(self, host_id: int, stream: bool = False) -> Tuple[bool, Iterable[Port], str]:
         """
         Get ports by host ID.
         
         Args:
             host_id: Host ID
+            stream: Give an iterator fetching rows as it goes instead of a list,
+                errors while iterating are raised to the caller
             
         Returns:
-            Tuple[bool, List[Port], str]: (success, ports, error_message)
+            Tuple[bool, Iterable[Port], str]: (success, ports, error_message)
         """
-        with self.lock:
-            try:
-                ports = list(Port.select().where(Port.host_id == host_id))
-                return True, ports, ""
-            except DatabaseError as e:
-                logger.error(f"Database error retrieving ports: {str(e)}")
-                return False, [], f"Database error: {str(e)}"
-            except Exception as e:
-                logger.error(f"Unexpected error retrieving ports: {str(e)}")
-                logger.debug(traceback.format_exc())
-                return False, [], f"Unexpected error: {str(e)}"
+        query = Port.select().where(Port.host_id == host_id)
+        if stream:
+            return _stream(query)
+        return list(query)
     
+    @_db_operation('retrieving port', missing='Port')
     def get_by_id(self, port_id: int) -> Tuple[bool, Optional[Port], str]:
         """
         Get port by ID.
@@ -484,24 +627,12 @@ class PortRepository(BaseRepository):
         Returns:
             Tuple[bool, Optional[Port], str]: (success, port, error_message)
         """
-        with self.lock:
-            try:
-                port = Port.get_by_id(port_id)
-                return True, port, ""
-            except DoesNotExist:
-                logger.warning(f"Port with ID {port_id} does not exist")
-                return False, None, f"Port with ID {port_id} does not exist"
-            except DatabaseError as e:
-                logger.error(f"Database error retrieving port: {str(e)}")
-                return False, None, f"Database error: {str(e)}"
-            except Exception as e:
-                logger.error(f"Unexpected error retrieving port: {str(e)}")
-                logger.debug(traceback.format_exc())
-                return False, None, f"Unexpected error: {str(e)}"
+        return _get_or_none(Port, port_id)
 
 class ScriptRepository(BaseRepository):
     """Repository for script operations."""
     
+    @_db_operation('creating script')
     def create(self, name: str, output: str, port_id: int = None, host_id: int = None) -> Tuple[bool, Optional[Script], str]:
         """
         Create script.
@@ -516,69 +647,53 @@ class ScriptRepository(BaseRepository):
             Tuple[bool, Optional[Script], str]: (success, script, error_message)
         """
         with self.lock:
-            try:
-                script = Script.create(
-                    name=name,
-                    output=output,
-                    port_id=port_id,
-                    host_id=host_id
-                )
-                return True, script, ""
-            except IntegrityError as e:
-                logger.error(f"Database integrity error creating script: {str(e)}")
-                return False, None, f"Database integrity error: {str(e)}"
-            except DatabaseError as e:
-                logger.error(f"Database error creating script: {str(e)}")
-                return False, None, f"Database error: {str(e)}"
-            except Exception as e:
-                logger.error(f"Unexpected error creating script: {str(e)}")
-                logger.debug(traceback.format_exc())
-                return False, None, f"Unexpected error: {str(e)}"
+            script = Script.create(
+                name=name,
+                output=output,
+                port_id=port_id,
+                host_id=host_id
+            )
+            # The scan is not known here
+            _scan_details_cache.invalidate()
+            return script
     
-    def get_by_port(self, port_id: int) -> Tuple[bool, List[Script], str]:
+    @_db_operation('retrieving scripts', empty=list)
+    def get_by_port(self, port_id: int, stream: bool = False) -> Tuple[bool, Iterable[Script], str]:
         """
         Get scripts by port ID.
         
         Args:
             port_id: Port ID
+            stream: Give an iterator fetching rows as it goes instead of a list,
+                errors while iterating are raised to the caller
             
         Returns:
-            Tuple[bool, List[Script], str]: (success, scripts, error_message)
+            Tuple[bool, Iterable[Script], str]: (success, scripts, error_message)
         """
-        with self.lock:
-            try:
-                scripts = list(Script.select().where(Script.port_id == port_id))
-                return True, scripts, ""
-            except DatabaseError as e:
-                logger.error(f"Database error retrieving scripts: {str(e)}")
-                return False, [], f"Database error: {str(e)}"
-            except Exception as e:
-                logger.error(f"Unexpected error retrieving scripts: {str(e)}")
-                logger.debug(traceback.format_exc())
-                return False, [], f"Unexpected error: {str(e)}"
+        query = Script.select().where(Script.port_id == port_id)
+        if stream:
+            return _stream(query)
+        return list(query)
     
-    def get_by_host(self, host_id: int) -> Tuple[bool, List[Script], str]:
+    @_db_operation('retrieving scripts', empty=list)
+    def get_by_host(self, host_id: int, stream: bool = False) -> Tuple[bool, Iterable[Script], str]:
         """
         Get scripts by host ID.
         
         Args:
             host_id: Host ID
+            stream: Give an iterator fetching rows as it goes instead of a list,
+                errors while iterating are raised to the caller
             
         Returns:
-            Tuple[bool, List[Script], str]: (success, scripts, error_message)
+            Tuple[bool, Iterable[Script], str]: (success, scripts, error_message)
         """
-        with self.lock:
-            try:
-                scripts = list(Script.select().where(Script.host_id == host_id))
-                return True, scripts, ""
-            except DatabaseError as e:
-                logger.error(f"Database error retrieving scripts: {str(e)}")
-                return False, [], f"Database error: {str(e)}"
-            except Exception as e:
-                logger.error(f"Unexpected error retrieving scripts: {str(e)}")
-                logger.debug(traceback.format_exc())
-                return False, [], f"Unexpected error: {str(e)}"
+        query = Script.select().where(Script.host_id == host_id)
+        if stream:
+            return _stream(query)
+        return list(query)
     
+    @_db_operation('retrieving script', missing='Script')
     def get_by_id(self, script_id: int) -> Tuple[bool, Optional[Script], str]:
         """
         Get script by ID.
@@ -589,17 +704,4 @@ class ScriptRepository(BaseRepository):
         Returns:
             Tuple[bool, Optional[Script], str]: (success, script, error_message)
         """
-        with self.lock:
-            try:
-                script = Script.get_by_id(script_id)
-                return True, script, ""
-            except DoesNotExist:
-                logger.warning(f"Script with ID {script_id} does not exist")
-                return False, None, f"Script with ID {script_id} does not exist"
-            except DatabaseError as e:
-                logger.error(f"Database error retrieving script: {str(e)}")
-                return False, None, f"Database error: {str(e)}"
-            except Exception as e:
-                logger.error(f"Unexpected error retrieving script: {str(e)}")
-                logger.debug(traceback.format_exc())
-                return False, None, f"Unexpected error: {str(e)}"
+        return _get_or_none(Script, script_id)
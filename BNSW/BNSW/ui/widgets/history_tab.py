@@ -5,13 +5,15 @@ This module provides a widget for displaying scan history.
 """
 
 import logging
+import functools
 from datetime import datetime
 from typing import Dict, List, Any, Optional
 
 from PyQt5.QtWidgets import (QWidget, QVBoxLayout, QHBoxLayout, QLabel, 
-                            QPushButton, QTableWidget, QTableWidgetItem,
+                            QPushButton, QTableView, QAbstractItemView,
                             QHeaderView, QMessageBox, QMenu, QAction)
-from PyQt5.QtCore import Qt, pyqtSignal, pyqtSlot
+from PyQt5.QtCore import (Qt, pyqtSignal, pyqtSlot, QAbstractTableModel, QModelIndex,
+                          QRunnable, QThreadPool)
 from PyQt5.QtGui import QIcon, QCursor
 
 from BNSW.data.repositories import DatabaseManager
@@ -19,17 +21,253 @@ from BNSW.data.repositories import DatabaseManager
 # Set up logger
 logger = logging.getLogger('BNSW.ui.widgets.history_tab')
 
+# Number of scans fetched at a time, more are fetched as the history is scrolled
+_HISTORY_PAGE_SIZE = 200
+
+# Options telling profiles apart, each a bit of a command's option mask
+_PROFILE_OPTIONS = ("-T4 -F", "-T4 -p-", "-sn", "-sV", "-O", "-A")
+
+def _profile_for_options(options):
+    """Get profile name from the set of profile options in a command."""
+    if "-T4 -F" in options:
+        return "Quick"
+    elif "-T4 -p-" in options:
+        return "Full"
+    elif "-sn" in options:
+        return "Ping"
+    elif "-sV" in options and "-O" not in options:
+        return "Service"
+    elif "-O" in options and "-A" not in options:
+        return "OS Detection"
+    elif "-A" in options:
+        return "Comprehensive"
+    else:
+        return "Custom"
+
+# Profile name of every option mask
+_PROFILE_TABLE = tuple(
+    _profile_for_options({option for i, option in enumerate(_PROFILE_OPTIONS) if mask >> i & 1})
+    for mask in range(1 << len(_PROFILE_OPTIONS))
+)
+
+@functools.lru_cache(maxsize=512)
+def _profile_from_command(command):
+    """Get profile name from command, scans mostly repeat a few commands."""
+    mask = 0
+    for i, option in enumerate(_PROFILE_OPTIONS):
+        if option in command:
+            mask |= 1 << i
+    return _PROFILE_TABLE[mask]
+
+class ScanHistoryModel(QAbstractTableModel):
+    """Table model of scan history, cell text is only produced for painted rows."""
+    
+    HEADERS = ["ID", "Target", "Profile", "Date", "Status"]
+    
+    def __init__(self, scan_repo, profile_for, parent=None):
+        """
+        Initialize scan history model.
+        
+        Args:
+            scan_repo: Scan repository further pages are fetched from
+            profile_for: Callable giving the profile name of a scan command
+            parent: Parent object
+        """
+        super().__init__(parent)
+        self._scan_repo = scan_repo
+        self._profile_for = profile_for
+        # Scan IDs and display text of each row's columns, computed once per scan
+        self._scan_ids = []
+        self._rows = []
+        self._has_more = False
+        # Scan ID -> text of the columns that don't change once a scan exists,
+        # kept across refreshes for the scans still listed
+        self._fixed_text = {}
+    
+    def _display_rows(self, scans):
+        """Get the display text of scans' columns."""
+        rows = []
+        for scan in scans:
+            fixed = self._fixed_text.get(scan['scan_id'])
+            if fixed is None:
+                fixed = (
+                    str(scan['scan_id']),
+                    self._profile_for(scan['command']),
+                    scan['start_time'].strftime("%Y-%m-%d %H:%M:%S")
+                )
+                self._fixed_text[scan['scan_id']] = fixed
+            scan_id_text, profile, date_text = fixed
+            rows.append((scan_id_text, scan['target'], profile, date_text, scan['status']))
+        return rows
+    
+    def set_scans(self, scans):
+        """
+        Replace the listed scans.
+        
+        Args:
+            scans: First page of scans from ScanRepository.get_all()
+        """
+        self.beginResetModel()
+        self._scan_ids = [scan['scan_id'] for scan in scans]
+        self._rows = self._display_rows(scans)
+        self._fixed_text = {scan_id: self._fixed_text[scan_id] for scan_id in self._scan_ids}
+        self._has_more = len(scans) == _HISTORY_PAGE_SIZE
+        self.endResetModel()
+    
+    def remove_scan(self, scan_id):
+        """Remove the row of a deleted scan."""
+        try:
+            row = self._scan_ids.index(scan_id)
+        except ValueError:
+            return
+        
+        self.beginRemoveRows(QModelIndex(), row, row)
+        del self._scan_ids[row]
+        del self._rows[row]
+        self._fixed_text.pop(scan_id, None)
+        self.endRemoveRows()
+    
+    def scan_id(self, row):
+        """Get the database ID of the scan in a row."""
+        return self._scan_ids[row]
+    
+    def canFetchMore(self, parent=QModelIndex()):
+        return not parent.isValid() and self._has_more
+    
+    def fetchMore(self, parent=QModelIndex()):
+        if parent.isValid():
+            return
+        
+        success, scans, error = self._scan_repo.get_all(limit=_HISTORY_PAGE_SIZE,
+                                                        offset=len(self._rows))
+        if not success:
+            logger.error(f"Error retrieving scan history: {error}")
+            self._has_more = False
+            return
+        
+        self._has_more = len(scans) == _HISTORY_PAGE_SIZE
+        if not scans:
+            return
+        
+        first = len(self._rows)
+        self.beginInsertRows(QModelIndex(), first, first + len(scans) - 1)
+        self._scan_ids.extend(scan['scan_id'] for scan in scans)
+        self._rows.extend(self._display_rows(scans))
+        self.endInsertRows()
+    
+    def rowCount(self, parent=QModelIndex()):
+        if parent.isValid():
+            return 0
+        return len(self._rows)
+    
+    def columnCount(self, parent=QModelIndex()):
+        if parent.isValid():
+            return 0
+        return len(self.HEADERS)
+    
+    def data(self, index, role=Qt.DisplayRole):
+        if role == Qt.DisplayRole and index.isValid():
+            return self._rows[index.row()][index.column()]
+        return None
+    
+    def headerData(self, section, orientation, role=Qt.DisplayRole):
+        if role == Qt.DisplayRole and orientation == Qt.Horizontal:
+            return self.HEADERS[section]
+        return super().headerData(section, orientation, role)
+
+class _FetchScans(QRunnable):
+    """Fetches the first page of scan history on a pool thread."""
+    
+    def __init__(self, db_manager, generation, fetched):
+        """
+        Initialize fetch.
+        
+        Args:
+            db_manager: Database manager
+            generation: Refresh the fetch belongs to
+            fetched: Signal emitted with (generation, success, scans, error_message)
+        """
+        super().__init__()
+        self.db_manager = db_manager
+        self.generation = generation
+        self.fetched = fetched
+    
+    def run(self):
+        try:
+            success, scans, error = self.db_manager.scan_repo.get_all(limit=_HISTORY_PAGE_SIZE)
+        except Exception as e:
+            logger.exception(f"Unexpected error retrieving scan history: {e}")
+            success, scans, error = False, None, f"Unexpected error: {e}"
+        
+        try:
+            self.fetched.emit(self.generation, success, scans or [], error)
+        except RuntimeError:
+            # Widget was deleted while fetching
+            pass
+
+class _LoadScan(QRunnable):
+    """Loads a scan with its hosts and ports on a pool thread."""
+    
+    def __init__(self, db_manager, generation, scan_id, loaded):
+        """
+        Initialize load.
+        
+        Args:
+            db_manager: Database manager
+            generation: Load request the load belongs to
+            scan_id: Scan ID
+            loaded: Signal emitted with (generation, scan_id, success, scan_data, error_message)
+        """
+        super().__init__()
+        self.db_manager = db_manager
+        self.generation = generation
+        self.scan_id = scan_id
+        self.loaded = loaded
+    
+    def run(self):
+        try:
+            success, scan_data, error = self.db_manager.get_scan_with_details(self.scan_id)
+        except Exception as e:
+            logger.exception(f"Unexpected error loading scan: {e}")
+            success, scan_data, error = False, None, f"Unexpected error: {e}"
+        
+        try:
+            self.loaded.emit(self.generation, self.scan_id, success, scan_data, error)
+        except RuntimeError:
+            # Widget was deleted while loading
+            pass
+
 class HistoryTabWidget(QWidget):
     """Widget for displaying scan history."""
     
     scan_selected = pyqtSignal(dict)
     
-    def __init__(self, parent=None):
-        """Initialize history tab widget."""
+    # Emitted from the pool thread with a fetched page of scans
+    _scans_fetched = pyqtSignal(int, bool, list, str)
+    
+    # Emitted from the pool thread with a loaded scan, None if not found
+    _scan_loaded = pyqtSignal(int, int, bool, object, str)
+    
+    def __init__(self, parent=None, db_manager=None):
+        """
+        Initialize history tab widget.
+        
+        Args:
+            parent: Parent widget
+            db_manager: Database manager, the shared one if not given
+        """
         super().__init__(parent)
         
-        # Create database manager
-        self.db_manager = DatabaseManager()
+        # Get database manager
+        self.db_manager = db_manager or DatabaseManager.instance()
+        
+        # Only the latest refresh's scans are shown
+        self._refresh_generation = 0
+        self._scans_fetched.connect(self._apply_scans)
+        
+        # Only the latest requested scan is loaded
+        self._load_generation = 0
+        self._scan_loaded.connect(self._on_scan_loaded)
         
         # Create layout
         main_layout = QVBoxLayout(self)
@@ -49,22 +287,19 @@ class HistoryTabWidget(QWidget):
         main_layout.addLayout(controls_layout)
         
         # Create table
-        self.table = QTableWidget()
-        self.table.setColumnCount(5)
-        self.table.setHorizontalHeaderLabels(["ID", "Target", "Profile", "Date", "Status"])
+        self.model = ScanHistoryModel(self.db_manager.scan_repo, self._get_profile_from_command, self)
+        self.table = QTableView()
+        self.table.setModel(self.model)
         self.table.horizontalHeader().setSectionResizeMode(QHeaderView.Stretch)
-        self.table.setSelectionBehavior(QTableWidget.SelectRows)
-        self.table.setSelectionMode(QTableWidget.SingleSelection)
-        self.table.setEditTriggers(QTableWidget.NoEditTriggers)
+        self.table.setSelectionBehavior(QAbstractItemView.SelectRows)
+        self.table.setSelectionMode(QAbstractItemView.SingleSelection)
+        self.table.setEditTriggers(QAbstractItemView.NoEditTriggers)
         self.table.setAlternatingRowColors(True)
         self.table.setContextMenuPolicy(Qt.CustomContextMenu)
         self.table.customContextMenuRequested.connect(self._show_context_menu)
-        self.table.itemDoubleClicked.connect(self._on_item_double_clicked)
+        self.table.doubleClicked.connect(self._on_item_double_clicked)
         main_layout.addWidget(self.table)
         
-        # Store scans
-        self.scans = []
-        
         # Set main layout
         self.setLayout(main_layout)
         
@@ -72,11 +307,26 @@ class HistoryTabWidget(QWidget):
         self.refresh()
     
     def refresh(self):
-        """Refresh history."""
+        """Refresh history, scans are fetched off the UI thread."""
+        self._refresh_generation += 1
+        QThreadPool.globalInstance().start(
+            _FetchScans(self.db_manager, self._refresh_generation, self._scans_fetched))
+    
+    @pyqtSlot(int, bool, list, str)
+    def _apply_scans(self, generation, success, scans, error):
+        """
+        Show fetched scans.
+        
+        Args:
+            generation: Refresh the scans were fetched for
+            success: Whether fetching succeeded
+            scans: First page of scans
+            error: Error message
+        """
+        if generation != self._refresh_generation:
+            return
+        
         try:
-            # Get all scans
-            success, scans, error = self.db_manager.scan_repo.get_all()
-            
             if not success:
                 logger.error(f"Error retrieving scan history: {error}")
                 QMessageBox.warning(
@@ -86,38 +336,7 @@ class HistoryTabWidget(QWidget):
                 )
                 return
             
-            # Store scans
-            self.scans = scans
-            
-            # Clear table
-            self.table.setRowCount(0)
-            
-            # Add scans to table
-            for i, scan in enumerate(scans):
-                # Insert row
-                self.table.insertRow(i)
-                
-                # Set ID
-                id_item = QTableWidgetItem(str(scan.id))
-                self.table.setItem(i, 0, id_item)
-                
-                # Set target
-                target_item = QTableWidgetItem(scan.target)
-                self.table.setItem(i, 1, target_item)
-                
-                # Set profile
-                profile = self._get_profile_from_command(scan.command)
-                profile_item = QTableWidgetItem(profile)
-                self.table.setItem(i, 2, profile_item)
-                
-                # Set date
-                date_str = scan.start_time.strftime("%Y-%m-%d %H:%M:%S")
-                date_item = QTableWidgetItem(date_str)
-                self.table.setItem(i, 3, date_item)
-                
-                # Set status
-                status_item = QTableWidgetItem(scan.status)
-                self.table.setItem(i, 4, status_item)
+            self.model.set_scans(scans)
         
         except Exception as e:
             logger.exception(f"Unexpected error refreshing history: {str(e)}")
@@ -137,42 +356,17 @@ class HistoryTabWidget(QWidget):
         Returns:
             str: Profile name
         """
-        if "-T4 -F" in command:
-            return "Quick"
-        elif "-T4 -p-" in command:
-            return "Full"
-        elif "-sn" in command:
-            return "Ping"
-        elif "-sV" in command and "-O" not in command:
-            return "Service"
-        elif "-O" in command and "-A" not in command:
-            return "OS Detection"
-        elif "-A" in command:
-            return "Comprehensive"
-        else:
-            return "Custom"
+        return _profile_from_command(command)
 
-    def _on_item_double_clicked(self, item):
-        row = item.row()
-        id_item = self.table.item(row, 0)
-        if id_item is None or not id_item.text().isdigit():
-            return
-        scan_id = int(id_item.text())
-        self._load_scan(scan_id)
+    def _on_item_double_clicked(self, index):
+        self._load_scan(self.model.scan_id(index.row()))
 
     def _show_context_menu(self, position):
         indexes = self.table.selectedIndexes()
         if not indexes:
             return
 
-        row = indexes[0].row()
-        id_item = self.table.item(row, 0)
-
-        if id_item is None or not id_item.text().isdigit():
-            logger.warning("Invalid scan ID in selected row.")
-            return
-
-        scan_id = int(id_item.text())
+        scan_id = self.model.scan_id(indexes[0].row())
 
         menu = QMenu()
         load_action = QAction("Load Scan", self)
@@ -187,15 +381,31 @@ class HistoryTabWidget(QWidget):
     
     def _load_scan(self, scan_id):
         """
-        Load scan.
+        Load scan, its details are fetched off the UI thread.
         
         Args:
             scan_id: Scan ID
         """
+        self._load_generation += 1
+        QThreadPool.globalInstance().start(
+            _LoadScan(self.db_manager, self._load_generation, scan_id, self._scan_loaded))
+    
+    @pyqtSlot(int, int, bool, object, str)
+    def _on_scan_loaded(self, generation, scan_id, success, scan_data, error):
+        """
+        Show a loaded scan.
+        
+        Args:
+            generation: Load request the scan was loaded for
+            scan_id: Scan ID
+            success: Whether loading succeeded
+            scan_data: Scan with hosts and ports, or None if not found
+            error: Error message
+        """
+        if generation != self._load_generation:
+            return
+        
         try:
-            # Get scan with details
-            success, scan_data, error = self.db_manager.get_scan_with_details(scan_id)
-            
             if not success:
                 logger.error(f"Error loading scan: {error}")
                 QMessageBox.warning(
@@ -269,8 +479,8 @@ class HistoryTabWidget(QWidget):
                 )
                 return
             
-            # Refresh
-            self.refresh()
+            # Remove its row
+            self.model.remove_scan(scan_id)
             
             # Show success message
             QMessageBox.information(
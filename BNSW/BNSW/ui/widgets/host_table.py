@@ -4,54 +4,185 @@ BNSW UI Widgets - Host Table
 This module provides a table widget for displaying host scan results.
 """
 
-from PyQt5.QtWidgets import QTableWidget, QTableWidgetItem, QHeaderView, QAbstractItemView
-from PyQt5.QtCore import Qt, pyqtSignal
+from PyQt5.QtWidgets import QTableView, QHeaderView, QAbstractItemView
+from PyQt5.QtCore import Qt, pyqtSignal, QTimer, QAbstractTableModel, QModelIndex
 from PyQt5.QtGui import QColor, QBrush
 
-class HostTableWidget(QTableWidget):
+def host_os_name(host):
+    """
+    Get the OS name of a host.
+    
+    Args:
+        host: Host dictionary, its OS a dictionary from a scan or a name
+            string or None when loaded from the database
+        
+    Returns:
+        str: OS name, empty if unknown
+    """
+    os_info = host.get('os')
+    if isinstance(os_info, dict):
+        return os_info.get('name', '') or ''
+    return os_info or ''
+
+class HostTableModel(QAbstractTableModel):
+    """Table model of hosts, with the text of each column gathered once per set."""
+    
+    HEADERS = ['IP Address', 'Hostname', 'Status', 'OS', 'MAC Address']
+    
+    # Status backgrounds, shared by all rows
+    _BRUSH_UP = QBrush(QColor(200, 255, 200))
+    _BRUSH_DOWN = QBrush(QColor(255, 200, 200))
+    
+    # Centered columns: IP address, status and MAC address
+    _CENTERED_COLUMNS = frozenset({0, 2, 4})
+    
+    def __init__(self, parent=None):
+        """
+        Initialize host table model.
+        
+        Args:
+            parent: Parent object
+        """
+        super().__init__(parent)
+        # Host dictionaries, kept as given
+        self.hosts = []
+        # Text of each column, one entry per host
+        self._columns = [[] for _ in self.HEADERS]
+    
+    def set_hosts(self, hosts):
+        """
+        Replace the listed hosts, keeping the list by reference, so it
+        must not be changed afterwards except through add_host().
+        
+        Args:
+            hosts: List of host dictionaries
+        """
+        self.beginResetModel()
+        self.hosts = hosts
+        self._columns = [[self._text(host, column) for host in hosts]
+                         for column in range(len(self.HEADERS))]
+        self.endResetModel()
+    
+    def add_host(self, host):
+        """
+        Add a host after the listed ones.
+        
+        Args:
+            host: Host dictionary
+        """
+        row = len(self.hosts)
+        self.beginInsertRows(QModelIndex(), row, row)
+        self.hosts.append(host)
+        for column, texts in enumerate(self._columns):
+            texts.append(self._text(host, column))
+        self.endInsertRows()
+    
+    def _text(self, host, column):
+        """Get the text of a host's column."""
+        if column == 0:
+            return host.get('ip', '')
+        elif column == 1:
+            return host.get('hostname', '')
+        elif column == 2:
+            return host.get('status', '')
+        elif column == 3:
+            return host_os_name(host)
+        else:
+            return host.get('mac', '')
+    
+    def rowCount(self, parent=QModelIndex()):
+        if parent.isValid():
+            return 0
+        return len(self.hosts)
+    
+    def columnCount(self, parent=QModelIndex()):
+        if parent.isValid():
+            return 0
+        return len(self.HEADERS)
+    
+    def data(self, index, role=Qt.DisplayRole):
+        if not index.isValid():
+            return None
+        
+        column = index.column()
+        if role == Qt.DisplayRole:
+            return self._columns[column][index.row()]
+        elif role == Qt.TextAlignmentRole:
+            if column in self._CENTERED_COLUMNS:
+                return Qt.AlignCenter
+        elif role == Qt.BackgroundRole:
+            # Set color based on status
+            if column == 2:
+                status = self._columns[2][index.row()]
+                if status == 'up':
+                    return self._BRUSH_UP
+                elif status == 'down':
+                    return self._BRUSH_DOWN
+        return None
+    
+    def headerData(self, section, orientation, role=Qt.DisplayRole):
+        if role == Qt.DisplayRole and orientation == Qt.Horizontal:
+            return self.HEADERS[section]
+        return super().headerData(section, orientation, role)
+
+class HostTableWidget(QTableView):
     """Table widget for displaying host scan results."""
     
     host_selected = pyqtSignal(dict)
     
+    # Height of every row
+    _ROW_HEIGHT = 24
+    
     def __init__(self, parent=None):
         """Initialize host table widget."""
         super().__init__(parent)
         
         # Set up table
-        self.setColumnCount(5)
-        self.setHorizontalHeaderLabels(['IP Address', 'Hostname', 'Status', 'OS', 'MAC Address'])
+        self.host_model = HostTableModel(self)
+        self.setModel(self.host_model)
         self.horizontalHeader().setSectionResizeMode(QHeaderView.Stretch)
         self.horizontalHeader().setSectionResizeMode(2, QHeaderView.ResizeToContents)
         
+        # Fixed row height, so rows are never measured
+        self.verticalHeader().setSectionResizeMode(QHeaderView.Fixed)
+        self.verticalHeader().setDefaultSectionSize(self._ROW_HEIGHT)
+        
         # Set selection behavior
         self.setSelectionBehavior(QAbstractItemView.SelectRows)
         self.setSelectionMode(QAbstractItemView.SingleSelection)
         
         # Connect signals
-        self.itemSelectionChanged.connect(self._on_selection_changed)
+        self.selectionModel().selectionChanged.connect(self._on_selection_changed)
         
-        # Store host data
-        self.host_data = []
-
+        # Whether emitting the selected host is already scheduled
+        self._selection_pending = False
+    
+    @property
+    def host_data(self):
+        """Host dictionaries of the rows."""
+        return self.host_model.hosts
+    
+    def rowCount(self):
+        """Get the number of hosts."""
+        return len(self.host_model.hosts)
+    
     def get_hosts(self):
+        """
+        Get the hosts as displayed, from the stored host data rather than the items.
+        
+        Returns:
+            list: Host dictionaries with the text of each column
+        """
         hosts = []
-        for row in range(self.rowCount()):
-            # Safely retrieve item text or default to an empty string
-            ip_item = self.item(row, 0)
-            hostname_item = self.item(row, 1)
-            status_item = self.item(row, 2)
-            os_item = self.item(row, 3)
-            mac_item = self.item(row, 4)
-
-            host = {
-                'ip': ip_item.text() if ip_item else '',
-                'hostname': hostname_item.text() if hostname_item else '',
-                'status': status_item.text() if status_item else '',
-                'os': os_item.text() if os_item else '',
-                'mac': mac_item.text() if mac_item else '',
+        for host in self.host_data:
+            hosts.append({
+                'ip': host.get('ip', '') or '',
+                'hostname': host.get('hostname', '') or '',
+                'status': host.get('status', '') or '',
+                'os': host_os_name(host),
+                'mac': host.get('mac', '') or '',
                 'ports': []  # Adjust as necessary
-            }
-            hosts.append(host)
+            })
         return hosts
     
     def set_hosts(self, hosts):
@@ -59,16 +190,10 @@ class HostTableWidget(QTableWidget):
         Set hosts to display.
         
         Args:
-            hosts: List of host dictionaries
+            hosts: List of host dictionaries, kept by reference
         """
-        # Clear table
-        self.clearContents()
-        self.setRowCount(0)
-        self.host_data = []
-        
-        # Add hosts
-        for host in hosts:
-            self.add_host(host)
+        # One model reset, leaving no host selected
+        self.host_model.set_hosts(hosts)
     
     def add_host(self, host):
         """
@@ -77,44 +202,24 @@ class HostTableWidget(QTableWidget):
         Args:
             host: Host dictionary
         """
-        # Add row
-        row = self.rowCount()
-        self.insertRow(row)
-        
-        # Set host data
-        ip = host.get('ip', '')
-        hostname = host.get('hostname', '')
-        status = host.get('status', '')
-        os_name = host.get('os', {}).get('name', '')
-        mac = host.get('mac', '')
-        
-        # Create items
-        ip_item = QTableWidgetItem(ip)
-        hostname_item = QTableWidgetItem(hostname)
-        status_item = QTableWidgetItem(status)
-        os_item = QTableWidgetItem(os_name)
-        mac_item = QTableWidgetItem(mac)
-        
-        # Set alignment
-        ip_item.setTextAlignment(Qt.AlignCenter)
-        status_item.setTextAlignment(Qt.AlignCenter)
-        mac_item.setTextAlignment(Qt.AlignCenter)
-        
-        # Set color based on status
-        if status == 'up':
-            status_item.setBackground(QBrush(QColor(200, 255, 200)))
-        elif status == 'down':
-            status_item.setBackground(QBrush(QColor(255, 200, 200)))
-        
-        # Set items
-        self.setItem(row, 0, ip_item)
-        self.setItem(row, 1, hostname_item)
-        self.setItem(row, 2, status_item)
-        self.setItem(row, 3, os_item)
-        self.setItem(row, 4, mac_item)
-        
-        # Store host data
-        self.host_data.append(host)
+        self.host_model.add_host(host)
+    
+    def clear(self):
+        """Remove all hosts."""
+        self.host_model.set_hosts([])
+    
+    def select_host(self, ip):
+        """
+        Select the row of a host.
+        
+        Args:
+            ip: IP address of the host
+        """
+        for row, host in enumerate(self.host_data):
+            if host.get('ip', '') == ip:
+                self.selectRow(row)
+                self.scrollTo(self.host_model.index(row, 0))
+                return
     
     def get_selected_host(self):
         """
@@ -136,7 +241,14 @@ class HostTableWidget(QTableWidget):
         return self.host_data[row]
     
     def _on_selection_changed(self):
-        """Handle selection changed."""
+        """Handle selection changed, emitting once for a burst of changes."""
+        if not self._selection_pending:
+            self._selection_pending = True
+            QTimer.singleShot(0, self._emit_selected_host)
+    
+    def _emit_selected_host(self):
+        """Emit the selected host, if any."""
+        self._selection_pending = False
         host = self.get_selected_host()
         if host:
             self.host_selected.emit(host)
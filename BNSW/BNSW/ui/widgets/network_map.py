@@ -6,12 +6,65 @@ This module provides a widget for displaying a network map visualization.
 
 from PyQt5.QtWidgets import (QWidget, QVBoxLayout, QHBoxLayout, QLabel, 
                             QPushButton, QGraphicsView, QGraphicsScene, 
-                            QGraphicsEllipseItem, QGraphicsTextItem, QGraphicsLineItem)
+                            QGraphicsEllipseItem, QGraphicsSimpleTextItem, QGraphicsLineItem)
 from PyQt5.QtCore import Qt, pyqtSignal, QRectF, QPointF
 from PyQt5.QtGui import QColor, QBrush, QPen, QFont, QPainter
 
 import math
 import random
+import functools
+
+from BNSW.ui.widgets.host_table import host_os_name
+
+# Host colors by OS, shared by all hosts
+_COLOR_WINDOWS = QColor(100, 100, 255)
+_COLOR_LINUX = QColor(255, 100, 100)
+_COLOR_MAC = QColor(100, 255, 100)
+_COLOR_OTHER = QColor(200, 200, 200)
+
+# Pen of the lines connecting hosts to the gateway
+_CONNECTION_PEN = QPen(QColor(200, 200, 200))
+_CONNECTION_PEN.setWidth(1)
+
+# OS name keywords, checked in order
+_OS_KEYWORD_COLORS = (
+    ('windows', _COLOR_WINDOWS),
+    ('linux', _COLOR_LINUX),
+    ('mac', _COLOR_MAC),
+    ('apple', _COLOR_MAC)
+)
+
+@functools.lru_cache(maxsize=256)
+def _color_for_os(os_name):
+    """Get host color for an OS name, hosts mostly repeat a few OS names."""
+    os_name = os_name.lower()
+    for keyword, color in _OS_KEYWORD_COLORS:
+        if keyword in os_name:
+            return color
+    return _COLOR_OTHER
+
+class _HostItem(QGraphicsEllipseItem):
+    """Host circle reporting clicks to its map."""
+    
+    def __init__(self, x, y, width, height, host_data, map_widget):
+        """
+        Initialize host item.
+        
+        Args:
+            x, y, width, height: Circle bounds
+            host_data: Host dictionary
+            map_widget: Network map clicks are reported to
+        """
+        super().__init__(x, y, width, height)
+        self.host_data = host_data
+        self.map_widget = map_widget
+        
+        # Drawn color and label, set by the map
+        self.color = None
+        self.label = None
+    
+    def mousePressEvent(self, event):
+        self.map_widget._on_host_clicked(event, self)
 
 class NetworkMapWidget(QWidget):
     """Widget for displaying a network map visualization."""
@@ -56,14 +109,23 @@ class NetworkMapWidget(QWidget):
         self.view.setDragMode(QGraphicsView.ScrollHandDrag)
         main_layout.addWidget(self.view)
         
-        # Create scene
+        # Create scene, unindexed since it is rebuilt whole and holds few items
         self.scene = QGraphicsScene()
+        self.scene.setItemIndexMethod(QGraphicsScene.NoIndex)
         self.view.setScene(self.scene)
         
         # Store hosts
         self.hosts = []
         self.host_items = {}
         
+        # IP addresses of the drawn hosts, and their items in drawing order
+        self._drawn_ips = None
+        self._drawn_items = []
+        
+        # Positions of the drawn hosts and index of the gateway among them
+        self._positions = []
+        self._gateway_index = None
+        
         # Set zoom level
         self.zoom_level = 1.0
         
@@ -80,14 +142,57 @@ class NetworkMapWidget(QWidget):
         # Store hosts
         self.hosts = hosts
         
+        # Where the map already shows the same up hosts (e.g. a recurring scan
+        # of the same network), their layout is unchanged and only the items
+        # of changed hosts are updated
+        up_hosts = [host for host in hosts if host.get('status') == 'up']
+        if up_hosts and tuple(host.get('ip', '') for host in up_hosts) == self._drawn_ips:
+            for item, host in zip(self._drawn_items, up_hosts):
+                self._update_host_item(item, host)
+            return
+        
         # Refresh map
         self.refresh()
     
+    def _update_host_item(self, item, host):
+        """
+        Point a drawn host's item at new host data, redrawing what changed.
+        
+        Args:
+            item: Host item
+            host: Host dictionary
+        """
+        item.host_data = host
+        
+        # Update color
+        color = self._get_host_color(host_os_name(host))
+        if color is not item.color:
+            item.color = color
+            item.setBrush(QBrush(color))
+        
+        # Update label, keeping it centered below the host
+        label_text = self._label_text(host)
+        if label_text != item.label.text():
+            center_x = item.label.x() + item.label.boundingRect().width() / 2
+            item.label.setText(label_text)
+            item.label.setX(center_x - item.label.boundingRect().width() / 2)
+    
+    @staticmethod
+    def _label_text(host):
+        """Get the label of a host, its IP address and hostname if any."""
+        label_text = host.get('ip', '')
+        hostname = host.get('hostname', '')
+        if hostname:
+            label_text += f"\n{hostname}"
+        return label_text
+    
     def refresh(self):
         """Refresh network map."""
         # Clear scene
         self.scene.clear()
         self.host_items = {}
+        self._drawn_items = []
+        self._drawn_ips = None
         
         # Check if hosts exist
         if not self.hosts:
@@ -112,17 +217,25 @@ class NetworkMapWidget(QWidget):
             text.setFont(font)
             return
         
-        # Calculate layout
-        self._calculate_layout(up_hosts)
-        
-        # Draw connections
-        self._draw_connections(up_hosts)
+        # Build the map without repainting after every added item
+        self.view.setUpdatesEnabled(False)
+        try:
+            # Calculate layout
+            self._calculate_layout(up_hosts)
+            
+            # Draw connections
+            self._draw_connections(up_hosts)
+            
+            # Draw hosts
+            self._draw_hosts(up_hosts)
+        finally:
+            self.view.setUpdatesEnabled(True)
         
-        # Draw hosts
-        self._draw_hosts(up_hosts)
+        self._drawn_ips = tuple(host.get('ip', '') for host in up_hosts)
         
-        # Fit scene in view
+        # Fit scene in view, zoom is relative to this
         self.view.fitInView(self.scene.sceneRect(), Qt.KeepAspectRatio)
+        self.zoom_level = 1.0
     
     def _calculate_layout(self, hosts):
         """
@@ -141,17 +254,17 @@ class NetworkMapWidget(QWidget):
         center_x = 0
         center_y = 0
         
-        # Calculate positions
-        for i, host in enumerate(hosts):
-            # Calculate angle
-            angle = 2 * math.pi * i / num_hosts
-            
-            # Calculate position
-            x = center_x + radius * math.cos(angle)
-            y = center_y + radius * math.sin(angle)
-            
-            # Store position
-            host['_pos'] = (x, y)
+        # Calculate positions, kept apart from the host dictionaries which
+        # belong to the scan result
+        step = 2 * math.pi / num_hosts
+        self._positions = [
+            (center_x + radius * math.cos(step * i), center_y + radius * math.sin(step * i))
+            for i in range(num_hosts)
+        ]
+        
+        # Find gateway host (if any)
+        self._gateway_index = next(
+            (i for i, host in enumerate(hosts) if host.get('ip', '').endswith('.1')), None)
         
         # Set scene rect
         margin = 100
@@ -169,34 +282,18 @@ class NetworkMapWidget(QWidget):
         Args:
             hosts: List of host dictionaries
         """
-        # Get gateway host (if any)
-        gateway_host = None
-        for host in hosts:
-            if host.get('ip', '').endswith('.1'):
-                gateway_host = host
-                break
-        
         # Draw connections
-        if gateway_host:
+        if self._gateway_index is not None:
             # Draw connections to gateway
-            gateway_pos = gateway_host.get('_pos')
+            gateway_x, gateway_y = self._positions[self._gateway_index]
             
-            for host in hosts:
-                if host == gateway_host:
+            for i, (x, y) in enumerate(self._positions):
+                if i == self._gateway_index:
                     continue
                 
-                host_pos = host.get('_pos')
-                
                 # Create line
-                line = QGraphicsLineItem(
-                    gateway_pos[0], gateway_pos[1],
-                    host_pos[0], host_pos[1]
-                )
-                
-                # Set pen
-                pen = QPen(QColor(200, 200, 200))
-                pen.setWidth(1)
-                line.setPen(pen)
+                line = QGraphicsLineItem(gateway_x, gateway_y, x, y)
+                line.setPen(_CONNECTION_PEN)
                 
                 # Add to scene
                 self.scene.addItem(line)
@@ -209,25 +306,23 @@ class NetworkMapWidget(QWidget):
             hosts: List of host dictionaries
         """
         # Draw hosts
-        for host in hosts:
-            # Get position
-            pos = host.get('_pos')
-            
+        for host, pos in zip(hosts, self._positions):
             # Get host info
             ip = host.get('ip', '')
-            hostname = host.get('hostname', '')
-            os_name = host.get('os', {}).get('name', '')
+            os_name = host_os_name(host)
             
             # Determine color based on OS
             color = self._get_host_color(os_name)
             
             # Create ellipse
-            ellipse = QGraphicsEllipseItem(
+            ellipse = _HostItem(
                 pos[0] - 15, pos[1] - 15,
-                30, 30
+                30, 30,
+                host, self
             )
             
             # Set brush and pen
+            ellipse.color = color
             ellipse.setBrush(QBrush(color))
             ellipse.setPen(QPen(Qt.black))
             
@@ -236,25 +331,17 @@ class NetworkMapWidget(QWidget):
             ellipse.setFlag(QGraphicsEllipseItem.ItemIsMovable)
             ellipse.setAcceptHoverEvents(True)
             
-            # Store host data
-            ellipse.host_data = host
-            
-            # Connect to click event
-            ellipse.mousePressEvent = lambda event, item=ellipse: self._on_host_clicked(event, item)
-            
             # Add to scene
             self.scene.addItem(ellipse)
             
             # Store item
             self.host_items[ip] = ellipse
+            self._drawn_items.append(ellipse)
             
             # Create label
-            label_text = ip
-            if hostname:
-                label_text += f"\n{hostname}"
-            
-            label = QGraphicsTextItem(label_text)
+            label = QGraphicsSimpleTextItem(self._label_text(host))
             label.setPos(pos[0] - label.boundingRect().width() / 2, pos[1] + 20)
+            ellipse.label = label
             
             # Add to scene
             self.scene.addItem(label)
@@ -269,16 +356,7 @@ class NetworkMapWidget(QWidget):
         Returns:
             QColor: Host color
         """
-        os_name = os_name.lower()
-        
-        if 'windows' in os_name:
-            return QColor(100, 100, 255)
-        elif 'linux' in os_name:
-            return QColor(255, 100, 100)
-        elif 'mac' in os_name or 'apple' in os_name:
-            return QColor(100, 255, 100)
-        else:
-            return QColor(200, 200, 200)
+        return _color_for_os(os_name)
     
     def _on_host_clicked(self, event, item):
         """
@@ -299,15 +377,13 @@ class NetworkMapWidget(QWidget):
         # Increase zoom level
         self.zoom_level *= 1.2
         
-        # Apply transform
-        self.view.resetTransform()
-        self.view.scale(self.zoom_level, self.zoom_level)
+        # Scale the current transform, keeping the view's position
+        self.view.scale(1.2, 1.2)
     
     def _on_zoom_out(self):
         """Handle zoom out."""
         # Decrease zoom level
         self.zoom_level /= 1.2
         
-        # Apply transform
-        self.view.resetTransform()
-        self.view.scale(self.zoom_level, self.zoom_level)
+        # Scale the current transform, keeping the view's position
+        self.view.scale(1 / 1.2, 1 / 1.2)
@@ -4,52 +4,146 @@ BNSW UI Widgets - Port Table
 This module provides a table widget for displaying port scan results.
 """
 
-from PyQt5.QtWidgets import QTableWidget, QTableWidgetItem, QHeaderView, QAbstractItemView
-from PyQt5.QtCore import Qt, pyqtSignal
+from PyQt5.QtWidgets import QTableView, QHeaderView, QAbstractItemView
+from PyQt5.QtCore import Qt, pyqtSignal, QTimer, QAbstractTableModel, QModelIndex
 from PyQt5.QtGui import QColor, QBrush
 
-class PortTableWidget(QTableWidget):
+class PortTableModel(QAbstractTableModel):
+    """Table model of ports, cell text is only produced for painted rows."""
+    
+    HEADERS = ['Port', 'Protocol', 'State', 'Service', 'Version']
+    
+    # Port dictionary key of each column
+    _COLUMN_KEYS = ('portid', 'protocol', 'state', 'service', 'version')
+    
+    # State backgrounds, shared by all rows
+    _STATE_BRUSHES = {
+        'open': QBrush(QColor(200, 255, 200)),
+        'closed': QBrush(QColor(255, 200, 200)),
+        'filtered': QBrush(QColor(255, 255, 200))
+    }
+    
+    # Centered columns: port, protocol and state
+    _CENTERED_COLUMNS = frozenset({0, 1, 2})
+    
+    def __init__(self, parent=None):
+        """
+        Initialize port table model.
+        
+        Args:
+            parent: Parent object
+        """
+        super().__init__(parent)
+        # Port dictionaries, kept as given
+        self.ports = []
+    
+    def set_ports(self, ports):
+        """
+        Replace the listed ports, keeping the list by reference, so it
+        must not be changed afterwards except through add_port().
+        
+        Args:
+            ports: List of port dictionaries
+        """
+        self.beginResetModel()
+        self.ports = ports
+        self.endResetModel()
+    
+    def add_port(self, port):
+        """
+        Add a port after the listed ones.
+        
+        Args:
+            port: Port dictionary
+        """
+        row = len(self.ports)
+        self.beginInsertRows(QModelIndex(), row, row)
+        self.ports.append(port)
+        self.endInsertRows()
+    
+    def rowCount(self, parent=QModelIndex()):
+        if parent.isValid():
+            return 0
+        return len(self.ports)
+    
+    def columnCount(self, parent=QModelIndex()):
+        if parent.isValid():
+            return 0
+        return len(self.HEADERS)
+    
+    def data(self, index, role=Qt.DisplayRole):
+        if not index.isValid():
+            return None
+        
+        column = index.column()
+        if role == Qt.DisplayRole:
+            return self.ports[index.row()].get(self._COLUMN_KEYS[column], '')
+        elif role == Qt.TextAlignmentRole:
+            if column in self._CENTERED_COLUMNS:
+                return Qt.AlignCenter
+        elif role == Qt.BackgroundRole:
+            # Set color based on state
+            if column == 2:
+                return self._STATE_BRUSHES.get(self.ports[index.row()].get('state', ''))
+        return None
+    
+    def headerData(self, section, orientation, role=Qt.DisplayRole):
+        if role == Qt.DisplayRole and orientation == Qt.Horizontal:
+            return self.HEADERS[section]
+        return super().headerData(section, orientation, role)
+
+class PortTableWidget(QTableView):
     """Table widget for displaying port scan results."""
     
     port_selected = pyqtSignal(dict)
     
+    # Height of every row
+    _ROW_HEIGHT = 24
+    
     def __init__(self, parent=None):
         """Initialize port table widget."""
         super().__init__(parent)
         
         # Set up table
-        self.setColumnCount(5)
-        self.setHorizontalHeaderLabels(['Port', 'Protocol', 'State', 'Service', 'Version'])
+        self.port_model = PortTableModel(self)
+        self.setModel(self.port_model)
         self.horizontalHeader().setSectionResizeMode(QHeaderView.Stretch)
         self.horizontalHeader().setSectionResizeMode(0, QHeaderView.ResizeToContents)
         self.horizontalHeader().setSectionResizeMode(1, QHeaderView.ResizeToContents)
         self.horizontalHeader().setSectionResizeMode(2, QHeaderView.ResizeToContents)
         
+        # Fixed row height, so rows are never measured
+        self.verticalHeader().setSectionResizeMode(QHeaderView.Fixed)
+        self.verticalHeader().setDefaultSectionSize(self._ROW_HEIGHT)
+        
         # Set selection behavior
         self.setSelectionBehavior(QAbstractItemView.SelectRows)
         self.setSelectionMode(QAbstractItemView.SingleSelection)
         
         # Connect signals
-        self.itemSelectionChanged.connect(self._on_selection_changed)
+        self.selectionModel().selectionChanged.connect(self._on_selection_changed)
         
-        # Store port data
-        self.port_data = []
+        # Whether emitting the selected port is already scheduled
+        self._selection_pending = False
+    
+    @property
+    def port_data(self):
+        """Port dictionaries of the rows."""
+        return self.port_model.ports
+    
+    def rowCount(self):
+        """Get the number of ports."""
+        return len(self.port_model.ports)
     
     def set_ports(self, ports):
         """
         Set ports to display.
         
         Args:
-            ports: List of port dictionaries
+            ports: List of port dictionaries, kept by reference
         """
-        # Clear table
-        self.clearContents()
-        self.setRowCount(0)
-        self.port_data = []
-        
-        # Add ports
-        for port in ports:
-            self.add_port(port)
+        # One model reset, leaving no port selected
+        self.port_model.set_ports(ports)
     
     def add_port(self, port):
         """
@@ -58,46 +152,11 @@ class PortTableWidget(QTableWidget):
         Args:
             port: Port dictionary
         """
-        # Add row
-        row = self.rowCount()
-        self.insertRow(row)
-        
-        # Set port data
-        port_id = port.get('portid', '')
-        protocol = port.get('protocol', '')
-        state = port.get('state', '')
-        service = port.get('service', '')
-        version = port.get('version', '')
-        
-        # Create items
-        port_item = QTableWidgetItem(port_id)
-        protocol_item = QTableWidgetItem(protocol)
-        state_item = QTableWidgetItem(state)
-        service_item = QTableWidgetItem(service)
-        version_item = QTableWidgetItem(version)
-        
-        # Set alignment
-        port_item.setTextAlignment(Qt.AlignCenter)
-        protocol_item.setTextAlignment(Qt.AlignCenter)
-        state_item.setTextAlignment(Qt.AlignCenter)
-        
-        # Set color based on state
-        if state == 'open':
-            state_item.setBackground(QBrush(QColor(200, 255, 200)))
-        elif state == 'closed':
-            state_item.setBackground(QBrush(QColor(255, 200, 200)))
-        elif state == 'filtered':
-            state_item.setBackground(QBrush(QColor(255, 255, 200)))
-        
-        # Set items
-        self.setItem(row, 0, port_item)
-        self.setItem(row, 1, protocol_item)
-        self.setItem(row, 2, state_item)
-        self.setItem(row, 3, service_item)
-        self.setItem(row, 4, version_item)
-        
-        # Store port data
-        self.port_data.append(port)
+        self.port_model.add_port(port)
+    
+    def clear(self):
+        """Remove all ports."""
+        self.port_model.set_ports([])
     
     def get_selected_port(self):
         """
@@ -119,7 +178,14 @@ class PortTableWidget(QTableWidget):
         return self.port_data[row]
     
     def _on_selection_changed(self):
-        """Handle selection changed."""
+        """Handle selection changed, emitting once for a burst of changes."""
+        if not self._selection_pending:
+            self._selection_pending = True
+            QTimer.singleShot(0, self._emit_selected_port)
+    
+    def _emit_selected_port(self):
+        """Emit the selected port, if any."""
+        self._selection_pending = False
         port = self.get_selected_port()
         if port:
             self.port_selected.emit(port)
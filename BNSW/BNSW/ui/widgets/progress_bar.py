@@ -6,7 +6,7 @@ This module provides a progress bar widget for displaying scan progress.
 
 from PyQt5.QtWidgets import (QWidget, QVBoxLayout, QHBoxLayout, QLabel, 
                             QProgressBar, QPushButton)
-from PyQt5.QtCore import Qt, pyqtSignal
+from PyQt5.QtCore import Qt, pyqtSignal, QTimer
 from PyQt5.QtGui import QColor
 
 class ScanProgressBarWidget(QWidget):
@@ -14,6 +14,20 @@ class ScanProgressBarWidget(QWidget):
     
     cancel_requested = pyqtSignal(str)
     
+    # Minimum time between shown progress updates
+    _FLUSH_INTERVAL_MS = 100
+    
+    # Progress bar stylesheets
+    _QSS_NORMAL = ""
+    _QSS_ERROR = "QProgressBar { color: white; background-color: #ffaaaa; }"
+    _QSS_PERMISSION_DENIED = "QProgressBar { color: white; background-color: #ffcc88; }"
+    
+    # Progress bar format, stylesheet and cancel button text of each failure code
+    _FAILURE_STATES = {
+        -1: ("Error", _QSS_ERROR, "Close"),
+        -2: ("Permission Denied", _QSS_PERMISSION_DENIED, "Close")
+    }
+    
     def __init__(self, parent=None):
         """Initialize progress bar widget."""
         super().__init__(parent)
@@ -50,6 +64,17 @@ class ScanProgressBarWidget(QWidget):
         
         # Initialize variables
         self.scan_id = None
+        
+        # Stylesheet applied to the progress bar
+        self._current_qss = self._QSS_NORMAL
+        
+        # Latest progress not shown yet, updates arriving faster than the
+        # flush interval only show the last one
+        self._pending_progress = None
+        self._flush_timer = QTimer(self)
+        self._flush_timer.setSingleShot(True)
+        self._flush_timer.setInterval(self._FLUSH_INTERVAL_MS)
+        self._flush_timer.timeout.connect(self._flush_progress)
     
     def set_scan(self, scan_id, target):
         """
@@ -65,11 +90,15 @@ class ScanProgressBarWidget(QWidget):
         # Update title
         self.title_label.setText(f"Scanning {target}")
         
-        # Reset progress
+        # Reset progress, also clearing a failure shown for a previous scan
+        self._flush_timer.stop()
+        self._pending_progress = None
         self.progress_bar.setValue(0)
+        self.progress_bar.setFormat("%p%")
+        self.cancel_button.setText("Cancel")
         
         # Set stylesheet for normal progress
-        self.progress_bar.setStyleSheet("")
+        self._set_style(self._QSS_NORMAL)
     
     def update_progress(self, progress):
         """
@@ -79,21 +108,42 @@ class ScanProgressBarWidget(QWidget):
             progress: Progress percentage (0-100), or -1 for error, -2 for permission denied
         """
         if progress >= 0:
-            # Normal progress
-            self.progress_bar.setValue(int(progress))
-            self.progress_bar.setStyleSheet("")
-        elif progress == -1:
-            # Error
-            self.progress_bar.setValue(0)
-            self.progress_bar.setFormat("Error")
-            self.progress_bar.setStyleSheet("QProgressBar { color: white; background-color: #ffaaaa; }")
-            self.cancel_button.setText("Close")
-        elif progress == -2:
-            # Permission denied
-            self.progress_bar.setValue(0)
-            self.progress_bar.setFormat("Permission Denied")
-            self.progress_bar.setStyleSheet("QProgressBar { color: white; background-color: #ffcc88; }")
-            self.cancel_button.setText("Close")
+            # Normal progress, shown when the flush timer fires
+            self._pending_progress = progress
+            if not self._flush_timer.isActive():
+                self._flush_timer.start()
+            return
+        
+        # Failures are shown right away, replacing pending progress
+        self._flush_timer.stop()
+        self._pending_progress = None
+        
+        state = self._FAILURE_STATES.get(progress)
+        if state is None:
+            return
+        
+        progress_format, qss, button_text = state
+        self.progress_bar.setValue(0)
+        self.progress_bar.setFormat(progress_format)
+        self._set_style(qss)
+        self.cancel_button.setText(button_text)
+    
+    def _flush_progress(self):
+        """Show the latest pending progress."""
+        if self._pending_progress is None:
+            return
+        
+        value = int(self._pending_progress)
+        self._pending_progress = None
+        if value != self.progress_bar.value():
+            self.progress_bar.setValue(value)
+        self._set_style(self._QSS_NORMAL)
+    
+    def _set_style(self, qss):
+        """Set the progress bar stylesheet, skipping the restyle if it is unchanged."""
+        if qss != self._current_qss:
+            self.progress_bar.setStyleSheet(qss)
+            self._current_qss = qss
     
     def _on_cancel_clicked(self):
         """Handle cancel button clicked."""
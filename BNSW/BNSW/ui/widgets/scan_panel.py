@@ -1,7 +1,7 @@
 from PyQt5.QtWidgets import (QWidget, QVBoxLayout, QHBoxLayout, QLabel, QLineEdit, 
                              QComboBox, QPushButton, QCheckBox, QGroupBox, QFormLayout,
                              QToolTip)
-from PyQt5.QtCore import Qt, pyqtSignal
+from PyQt5.QtCore import Qt, pyqtSignal, QTimer
 
 class ScanPanelWidget(QWidget):
     """Panel widget for configuring and starting network scans."""
@@ -9,6 +9,19 @@ class ScanPanelWidget(QWidget):
     scan_requested = pyqtSignal(str, str, bool)
     schedule_requested = pyqtSignal(str, str)
 
+    # Tooltips of the scan profiles
+    _PROFILE_TOOLTIPS = {
+        "Quick": "Fast scan of the most common 100 ports (-T4 -F)",
+        "Full": "Scan all 65535 ports (-T4 -p-)",
+        "Ping": "Only check if hosts are online, no port scanning (-sn)",
+        "Service": "Detect service versions on open ports (-sV)",
+        "OS Detection": "Attempt to identify the operating system (requires admin privileges) (-O)",
+        "Comprehensive": "Full scan with service detection, OS detection, and traceroute (requires admin privileges) (-T4 -A -v)"
+    }
+
+    # Profiles that need aggressive scanning and administrator privileges
+    _AGGRESSIVE_PROFILES = frozenset({"OS Detection", "Comprehensive"})
+
     def __init__(self, parent=None):
         """Initialize scan panel widget."""
         super().__init__(parent)
@@ -25,6 +38,13 @@ class ScanPanelWidget(QWidget):
         self.target_input.setPlaceholderText("Enter IP, hostname, or CIDR range")
         target_layout.addRow("Target:", self.target_input)
 
+        # Shows the admin privileges hint once the profile selection settles,
+        # not for every profile passed while scrolling through them
+        self._admin_hint_timer = QTimer(self)
+        self._admin_hint_timer.setSingleShot(True)
+        self._admin_hint_timer.setInterval(150)
+        self._admin_hint_timer.timeout.connect(self._show_admin_hint)
+
         # Create profile selector
         self.profile_selector = QComboBox()
         self.profile_selector.addItems(["Quick", "Full", "Ping", "Service", "OS Detection", "Comprehensive"])
@@ -133,26 +153,22 @@ class ScanPanelWidget(QWidget):
         """Handle profile changed."""
         self.profile_selector.setToolTip(self._get_profile_tooltip(profile))
 
-        if profile in ["OS Detection", "Comprehensive"]:
+        if profile in self._AGGRESSIVE_PROFILES:
             self.aggressive_option.setChecked(True)
-
-            QToolTip.showText(
-                self.profile_selector.mapToGlobal(self.profile_selector.rect().bottomRight()),
-                "This scan type requires administrator privileges",
-                self.profile_selector,
-                self.profile_selector.rect(),
-                2000
-            )
+            self._admin_hint_timer.start()
+        else:
+            self._admin_hint_timer.stop()
+
+    def _show_admin_hint(self):
+        """Show that the selected profile requires administrator privileges."""
+        QToolTip.showText(
+            self.profile_selector.mapToGlobal(self.profile_selector.rect().bottomRight()),
+            "This scan type requires administrator privileges",
+            self.profile_selector,
+            self.profile_selector.rect(),
+            2000
+        )
 
     def _get_profile_tooltip(self, profile):
         """Get tooltip for profile."""
-        tooltips = {
-            "Quick": "Fast scan of the most common 100 ports (-T4 -F)",
-            "Full": "Scan all 65535 ports (-T4 -p-)",
-            "Ping": "Only check if hosts are online, no port scanning (-sn)",
-            "Service": "Detect service versions on open ports (-sV)",
-            "OS Detection": "Attempt to identify the operating system (requires admin privileges) (-O)",
-            "Comprehensive": "Full scan with service detection, OS detection, and traceroute (requires admin privileges) (-T4 -A -v)"
-        }
-
-        return tooltips.get(profile, "")
\ No newline at end of file
+        return self._PROFILE_TOOLTIPS.get(profile, "")
@@ -9,29 +9,33 @@ from datetime import datetime, timedelta
 
 from PyQt5.QtWidgets import (QDialog, QVBoxLayout, QHBoxLayout, QLabel, 
                             QPushButton, QDateTimeEdit, QComboBox, QFormLayout,
-                            QDialogButtonBox, QCheckBox, QSpinBox, QGroupBox)
-from PyQt5.QtCore import Qt, pyqtSignal, QDateTime
+                            QDialogButtonBox, QRadioButton, QButtonGroup, QSpinBox,
+                            QGroupBox)
+from PyQt5.QtCore import Qt, pyqtSignal, QDateTime, QTimer
 
 # Set up logger
 logger = logging.getLogger('BNSW.ui.widgets.schedule_dialog')
 
 class ScheduleDialog(QDialog):
-    """Dialog for scheduling scans."""
+    """
+    Dialog for scheduling scans.
     
-    def __init__(self, target, profile, parent=None):
+    The dialog is meant to be kept and reused, reset() prepares it for
+    each scan to schedule.
+    """
+    
+    def __init__(self, parent=None):
         """
         Initialize schedule dialog.
         
         Args:
-            target: Target to scan
-            profile: Scan profile
             parent: Parent widget
         """
         super().__init__(parent)
         
-        # Store parameters
-        self.target = target
-        self.profile = profile
+        # Scan to schedule, set by reset()
+        self.target = ''
+        self.profile = ''
         
         # Set window properties
         self.setWindowTitle("Schedule Scan")
@@ -44,28 +48,33 @@ class ScheduleDialog(QDialog):
         form_layout = QFormLayout()
         
         # Create target label
-        target_label = QLabel(f"<b>Target:</b> {target}")
-        form_layout.addRow(target_label)
+        self.target_label = QLabel()
+        form_layout.addRow(self.target_label)
         
         # Create profile label
-        profile_label = QLabel(f"<b>Profile:</b> {profile}")
-        form_layout.addRow(profile_label)
+        self.profile_label = QLabel()
+        form_layout.addRow(self.profile_label)
         
         # Create schedule type group
         schedule_group = QGroupBox("Schedule Type")
         schedule_layout = QVBoxLayout()
         
         # Create one-time radio
-        self.one_time_radio = QCheckBox("One-time")
-        self.one_time_radio.setChecked(True)
-        self.one_time_radio.toggled.connect(self._on_schedule_type_changed)
+        self.one_time_radio = QRadioButton("One-time")
         schedule_layout.addWidget(self.one_time_radio)
         
-        # Create recurring radio
-        self.recurring_radio = QCheckBox("Recurring")
+        # Create recurring radio, the only one reporting changes since the
+        # two always toggle together
+        self.recurring_radio = QRadioButton("Recurring")
         self.recurring_radio.toggled.connect(self._on_schedule_type_changed)
         schedule_layout.addWidget(self.recurring_radio)
         
+        # Make the schedule types exclusive
+        self.schedule_type_group = QButtonGroup(self)
+        self.schedule_type_group.setExclusive(True)
+        self.schedule_type_group.addButton(self.one_time_radio)
+        self.schedule_type_group.addButton(self.recurring_radio)
+        
         # Set schedule group layout
         schedule_group.setLayout(schedule_layout)
         form_layout.addRow(schedule_group)
@@ -76,15 +85,81 @@ class ScheduleDialog(QDialog):
         
         # Create date time edit
         self.date_time_edit = QDateTimeEdit()
-        self.date_time_edit.setDateTime(QDateTime.currentDateTime().addSecs(3600))  # Default to 1 hour from now
         self.date_time_edit.setCalendarPopup(True)
-        self.date_time_edit.setMinimumDateTime(QDateTime.currentDateTime())
         one_time_layout.addRow("Date and Time:", self.date_time_edit)
         
         # Set one-time group layout
         self.one_time_group.setLayout(one_time_layout)
         form_layout.addRow(self.one_time_group)
         
+        # Recurring group, built when first needed since most scans are
+        # scheduled once
+        self.recurring_group = None
+        self._form_layout = form_layout
+        
+        # Add form layout
+        main_layout.addLayout(form_layout)
+        
+        # Create button box
+        button_box = QDialogButtonBox(QDialogButtonBox.Ok | QDialogButtonBox.Cancel)
+        button_box.accepted.connect(self.accept)
+        button_box.rejected.connect(self.reject)
+        main_layout.addWidget(button_box)
+        
+        # Set main layout
+        self.setLayout(main_layout)
+        
+        # Keeps the minimum times current while the dialog is open
+        self._minimum_timer = QTimer(self)
+        self._minimum_timer.setInterval(60000)
+        self._minimum_timer.timeout.connect(self._update_minimum_date_times)
+    
+    def showEvent(self, event):
+        """Handle show event."""
+        super().showEvent(event)
+        self._minimum_timer.start()
+    
+    def hideEvent(self, event):
+        """Handle hide event."""
+        super().hideEvent(event)
+        self._minimum_timer.stop()
+    
+    def reset(self, target, profile):
+        """
+        Prepare the dialog for scheduling a scan, with default schedule.
+        
+        Args:
+            target: Target to scan
+            profile: Scan profile
+        """
+        # Store parameters
+        self.target = target
+        self.profile = profile
+        self.target_label.setText(f"<b>Target:</b> {target}")
+        self.profile_label.setText(f"<b>Profile:</b> {profile}")
+        
+        # Default to a one-time scan, showing its group once below instead
+        # of on every toggle
+        self.recurring_radio.blockSignals(True)
+        self.one_time_radio.setChecked(True)
+        self.recurring_radio.blockSignals(False)
+        
+        # Default to 1 hour from now
+        now = QDateTime.currentDateTime()
+        self.date_time_edit.setMinimumDateTime(now)
+        self.date_time_edit.setDateTime(now.addSecs(3600))
+        
+        # Default recurring schedule, if the dialog was used for one
+        if self.recurring_group is not None:
+            self._reset_recurring_schedule(now)
+        
+        # Initialize UI
+        self.one_time_group.setVisible(True)
+        if self.recurring_group is not None:
+            self.recurring_group.setVisible(False)
+    
+    def _build_recurring_group(self):
+        """Build the recurring schedule group, with default schedule."""
         # Create recurring group
         self.recurring_group = QGroupBox("Recurring Schedule")
         recurring_layout = QFormLayout()
@@ -98,47 +173,56 @@ class ScheduleDialog(QDialog):
         self.interval_value_spin = QSpinBox()
         self.interval_value_spin.setMinimum(1)
         self.interval_value_spin.setMaximum(999)
-        self.interval_value_spin.setValue(24)  # Default to 24 hours
         recurring_layout.addRow("", self.interval_value_spin)
         
         # Create start date time edit
         self.start_date_time_edit = QDateTimeEdit()
-        self.start_date_time_edit.setDateTime(QDateTime.currentDateTime().addSecs(3600))  # Default to 1 hour from now
         self.start_date_time_edit.setCalendarPopup(True)
-        self.start_date_time_edit.setMinimumDateTime(QDateTime.currentDateTime())
         recurring_layout.addRow("Start Date and Time:", self.start_date_time_edit)
         
         # Create end date time edit
         self.end_date_time_edit = QDateTimeEdit()
-        self.end_date_time_edit.setDateTime(QDateTime.currentDateTime().addDays(30))  # Default to 30 days from now
         self.end_date_time_edit.setCalendarPopup(True)
-        self.end_date_time_edit.setMinimumDateTime(QDateTime.currentDateTime())
         recurring_layout.addRow("End Date and Time:", self.end_date_time_edit)
         
         # Set recurring group layout
         self.recurring_group.setLayout(recurring_layout)
-        form_layout.addRow(self.recurring_group)
+        self._form_layout.addRow(self.recurring_group)
         
-        # Add form layout
-        main_layout.addLayout(form_layout)
-        
-        # Create button box
-        button_box = QDialogButtonBox(QDialogButtonBox.Ok | QDialogButtonBox.Cancel)
-        button_box.accepted.connect(self.accept)
-        button_box.rejected.connect(self.reject)
-        main_layout.addWidget(button_box)
-        
-        # Set main layout
-        self.setLayout(main_layout)
+        self._reset_recurring_schedule(QDateTime.currentDateTime())
+    
+    def _reset_recurring_schedule(self, now):
+        """
+        Default to every 24 hours, from 1 hour from now for 30 days.
         
-        # Initialize UI
-        self._on_schedule_type_changed()
+        Args:
+            now: Current date and time
+        """
+        self.interval_type_combo.setCurrentIndex(0)
+        self.interval_value_spin.setValue(24)
+        self.start_date_time_edit.setMinimumDateTime(now)
+        self.start_date_time_edit.setDateTime(now.addSecs(3600))
+        self.end_date_time_edit.setMinimumDateTime(now)
+        self.end_date_time_edit.setDateTime(now.addDays(30))
+    
+    def _update_minimum_date_times(self):
+        """Keep scans from being scheduled in the past."""
+        now = QDateTime.currentDateTime()
+        self.date_time_edit.setMinimumDateTime(now)
+        if self.recurring_group is not None:
+            self.start_date_time_edit.setMinimumDateTime(now)
+            self.end_date_time_edit.setMinimumDateTime(now)
     
     def _on_schedule_type_changed(self):
         """Handle schedule type changed."""
+        recurring = self.recurring_radio.isChecked()
+        if recurring and self.recurring_group is None:
+            self._build_recurring_group()
+        
         # Update group visibility
         self.one_time_group.setVisible(self.one_time_radio.isChecked())
-        self.recurring_group.setVisible(self.recurring_radio.isChecked())
+        if self.recurring_group is not None:
+            self.recurring_group.setVisible(recurring)
     
     def get_schedule_data(self):
         """
@@ -147,16 +231,19 @@ class ScheduleDialog(QDialog):
         Returns:
             dict: Schedule data
         """
+        # Without a recurring group only a one-time schedule can be set
+        one_time = self.one_time_radio.isChecked() or self.recurring_group is None
+        
         # Create schedule data
         schedule_data = {
             'target': self.target,
             'profile': self.profile,
-            'type': 'one_time' if self.one_time_radio.isChecked() else 'recurring',
+            'type': 'one_time' if one_time else 'recurring',
             'created_at': datetime.now().isoformat()
         }
         
         # Add type-specific data
-        if self.one_time_radio.isChecked():
+        if one_time:
             # One-time schedule
             schedule_data['scheduled_time'] = self.date_time_edit.dateTime().toPyDateTime().isoformat()
         else:
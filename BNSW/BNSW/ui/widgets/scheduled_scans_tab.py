@@ -5,13 +5,15 @@ This module provides a widget for displaying and managing scheduled scans.
 """
 
 import logging
+import functools
 from datetime import datetime
 from typing import Dict, List, Any, Optional
 
 from PyQt5.QtWidgets import (QWidget, QVBoxLayout, QHBoxLayout, QLabel, 
-                            QPushButton, QTableWidget, QTableWidgetItem,
-                            QHeaderView, QMessageBox, QMenu, QAction)
-from PyQt5.QtCore import Qt, pyqtSignal, pyqtSlot
+                            QPushButton, QTableView, QAbstractItemView,
+                            QHeaderView, QMessageBox, QMenu)
+from PyQt5.QtCore import (Qt, pyqtSignal, pyqtSlot, QTimer, QAbstractTableModel,
+                          QModelIndex)
 from PyQt5.QtGui import QIcon, QCursor
 
 from BNSW.core.scheduler import Scheduler
@@ -19,15 +21,168 @@ from BNSW.core.scheduler import Scheduler
 # Set up logger
 logger = logging.getLogger('BNSW.ui.widgets.scheduled_scans_tab')
 
+# Most next run times kept formatted for display
+_NEXT_RUN_CACHE_SIZE = 512
+
+class ScheduledScansModel(QAbstractTableModel):
+    """Table model of scheduled scans, rows are updated one scheduled scan at a time."""
+    
+    HEADERS = ["ID", "Target", "Profile", "Type", "Next Run", "Status"]
+    
+    # Type column text of each schedule type, from the scheduled scan
+    _TYPE_FORMATTERS = {
+        'one_time': lambda scan: "One-time",
+        'recurring': lambda scan: f"Every {scan.get('interval_value', '')} {scan.get('interval_type', '')}"
+    }
+    
+    def __init__(self, parent=None):
+        """
+        Initialize scheduled scans model.
+        
+        Args:
+            parent: Parent object
+        """
+        super().__init__(parent)
+        # Scheduled scan dictionaries and display text of each row's columns
+        self._scans = []
+        self._rows = []
+        # Table row of each scheduled scan ID
+        self._id_to_row = {}
+        # Display text of next run times, which mostly repeat across refreshes
+        self._next_run_cache = {}
+    
+    def _display_row(self, scan):
+        """Get the display text of a scheduled scan's columns."""
+        # Get type
+        schedule_type = scan.get('schedule_type', '')
+        type_formatter = self._TYPE_FORMATTERS.get(schedule_type)
+        type_text = type_formatter(scan) if type_formatter else schedule_type
+        
+        # Get next run
+        next_run = scan.get('next_run', '')
+        if next_run:
+            next_run_str = self._next_run_cache.get(next_run)
+            if next_run_str is None:
+                try:
+                    next_run_dt = datetime.fromisoformat(next_run)
+                    next_run_str = next_run_dt.strftime("%Y-%m-%d %H:%M:%S")
+                except (ValueError, TypeError):
+                    next_run_str = next_run
+                if len(self._next_run_cache) >= _NEXT_RUN_CACHE_SIZE:
+                    self._next_run_cache.clear()
+                self._next_run_cache[next_run] = next_run_str
+        else:
+            next_run_str = "N/A"
+        
+        return (
+            str(scan.get('id', '')),
+            scan.get('target', ''),
+            scan.get('profile', ''),
+            type_text,
+            next_run_str,
+            scan.get('status', '')
+        )
+    
+    def _index_rows(self):
+        """Map scheduled scan IDs to their table rows."""
+        self._id_to_row = {scan.get('id'): row for row, scan in enumerate(self._scans)}
+    
+    def set_scans(self, scans):
+        """
+        Replace the listed scheduled scans.
+        
+        Args:
+            scans: Scheduled scan dictionaries
+        """
+        self.beginResetModel()
+        self._scans = list(scans)
+        self._rows = [self._display_row(scan) for scan in self._scans]
+        self._index_rows()
+        self.endResetModel()
+    
+    def apply_changes(self, changes):
+        """
+        Update the rows of changed scheduled scans.
+        
+        Args:
+            changes: Scheduled scan ID -> scheduled scan dictionary, or None
+                if deleted
+            
+        Returns:
+            bool: False if a scheduled scan not listed yet changed, which
+                needs set_scans() to be placed
+        """
+        if any(scan is not None and scheduled_scan_id not in self._id_to_row
+               for scheduled_scan_id, scan in changes.items()):
+            return False
+        
+        # Update changed rows
+        removed_rows = []
+        for scheduled_scan_id, scan in changes.items():
+            row = self._id_to_row.get(scheduled_scan_id)
+            if row is None:
+                continue
+            if scan is None:
+                removed_rows.append(row)
+                continue
+            self._scans[row] = scan
+            self._rows[row] = self._display_row(scan)
+            self.dataChanged.emit(self.index(row, 0), self.index(row, len(self.HEADERS) - 1))
+        
+        # Remove deleted scans, last rows first so the others keep their index
+        for row in sorted(removed_rows, reverse=True):
+            self.beginRemoveRows(QModelIndex(), row, row)
+            del self._scans[row]
+            del self._rows[row]
+            self.endRemoveRows()
+        if removed_rows:
+            self._index_rows()
+        
+        return True
+    
+    def scheduled_scan(self, row):
+        """Get the scheduled scan dictionary of a row."""
+        return self._scans[row]
+    
+    def rowCount(self, parent=QModelIndex()):
+        if parent.isValid():
+            return 0
+        return len(self._rows)
+    
+    def columnCount(self, parent=QModelIndex()):
+        if parent.isValid():
+            return 0
+        return len(self.HEADERS)
+    
+    def data(self, index, role=Qt.DisplayRole):
+        if role == Qt.DisplayRole and index.isValid():
+            return self._rows[index.row()][index.column()]
+        return None
+    
+    def headerData(self, section, orientation, role=Qt.DisplayRole):
+        if role == Qt.DisplayRole and orientation == Qt.Horizontal:
+            return self.HEADERS[section]
+        return super().headerData(section, orientation, role)
+
 class ScheduledScansTabWidget(QWidget):
     """Widget for displaying and managing scheduled scans."""
     
-    def __init__(self, parent=None):
-        """Initialize scheduled scans tab widget."""
+    # Emitted, possibly from the scheduler thread, when a scheduled scan
+    # changes, with None once it is deleted
+    _scan_changed = pyqtSignal(int, object)
+    
+    def __init__(self, parent=None, scheduler=None):
+        """
+        Initialize scheduled scans tab widget.
+        
+        Args:
+            parent: Parent widget
+            scheduler: Scheduler, a new one if not given
+        """
         super().__init__(parent)
         
-        # Create scheduler
-        self.scheduler = Scheduler()
+        # Get scheduler
+        self.scheduler = scheduler or Scheduler()
         
         # Create layout
         main_layout = QVBoxLayout(self)
@@ -47,24 +202,37 @@ class ScheduledScansTabWidget(QWidget):
         main_layout.addLayout(controls_layout)
         
         # Create table
-        self.table = QTableWidget()
-        self.table.setColumnCount(6)
-        self.table.setHorizontalHeaderLabels(["ID", "Target", "Profile", "Type", "Next Run", "Status"])
+        self.model = ScheduledScansModel(self)
+        self.table = QTableView()
+        self.table.setModel(self.model)
         self.table.horizontalHeader().setSectionResizeMode(QHeaderView.Stretch)
-        self.table.setSelectionBehavior(QTableWidget.SelectRows)
-        self.table.setSelectionMode(QTableWidget.SingleSelection)
-        self.table.setEditTriggers(QTableWidget.NoEditTriggers)
+        self.table.setSelectionBehavior(QAbstractItemView.SelectRows)
+        self.table.setSelectionMode(QAbstractItemView.SingleSelection)
+        self.table.setEditTriggers(QAbstractItemView.NoEditTriggers)
         self.table.setAlternatingRowColors(True)
         self.table.setContextMenuPolicy(Qt.CustomContextMenu)
         self.table.customContextMenuRequested.connect(self._show_context_menu)
         main_layout.addWidget(self.table)
         
-        # Store scheduled scans
-        self.scheduled_scans = []
+        # Create context menu once, its actions carry the scheduled scan ID
+        self._context_menu = QMenu(self)
+        self._cancel_action = self._context_menu.addAction("Cancel Scan")
+        self._cancel_action.triggered.connect(self._on_cancel_action)
+        self._delete_action = self._context_menu.addAction("Delete Scan")
+        self._delete_action.triggered.connect(self._on_delete_action)
         
         # Set main layout
         self.setLayout(main_layout)
         
+        # Follow scheduled scan changes, applied at most every 100 ms
+        self._pending_changes = {}
+        self._flush_timer = QTimer(self)
+        self._flush_timer.setSingleShot(True)
+        self._flush_timer.setInterval(100)
+        self._flush_timer.timeout.connect(self._flush_changes)
+        self._scan_changed.connect(self._on_scan_changed)
+        self.scheduler.add_listener(self._scan_changed.emit)
+        
         # Start scheduler
         self.scheduler.start()
         
@@ -86,58 +254,8 @@ class ScheduledScansTabWidget(QWidget):
                 )
                 return
             
-            # Store scheduled scans
-            self.scheduled_scans = scheduled_scans
-            
-            # Clear table
-            self.table.setRowCount(0)
-            
-            # Add scheduled scans to table
-            for i, scan in enumerate(scheduled_scans):
-                # Insert row
-                self.table.insertRow(i)
-                
-                # Set ID
-                id_item = QTableWidgetItem(str(scan.get('id', '')))
-                self.table.setItem(i, 0, id_item)
-                
-                # Set target
-                target_item = QTableWidgetItem(scan.get('target', ''))
-                self.table.setItem(i, 1, target_item)
-                
-                # Set profile
-                profile_item = QTableWidgetItem(scan.get('profile', ''))
-                self.table.setItem(i, 2, profile_item)
-                
-                # Set type
-                schedule_type = scan.get('schedule_type', '')
-                if schedule_type == 'one_time':
-                    type_text = "One-time"
-                elif schedule_type == 'recurring':
-                    interval_type = scan.get('interval_type', '')
-                    interval_value = scan.get('interval_value', '')
-                    type_text = f"Every {interval_value} {interval_type}"
-                else:
-                    type_text = schedule_type
-                type_item = QTableWidgetItem(type_text)
-                self.table.setItem(i, 3, type_item)
-                
-                # Set next run
-                next_run = scan.get('next_run', '')
-                if next_run:
-                    try:
-                        next_run_dt = datetime.fromisoformat(next_run)
-                        next_run_str = next_run_dt.strftime("%Y-%m-%d %H:%M:%S")
-                    except (ValueError, TypeError):
-                        next_run_str = next_run
-                else:
-                    next_run_str = "N/A"
-                next_run_item = QTableWidgetItem(next_run_str)
-                self.table.setItem(i, 4, next_run_item)
-                
-                # Set status
-                status_item = QTableWidgetItem(scan.get('status', ''))
-                self.table.setItem(i, 5, status_item)
+            # Show scheduled scans
+            self.model.set_scans(scheduled_scans)
         
         except Exception as e:
             logger.exception(f"Unexpected error refreshing scheduled scans: {str(e)}")
@@ -147,6 +265,27 @@ class ScheduledScansTabWidget(QWidget):
                 f"Unexpected error refreshing scheduled scans: {str(e)}"
             )
     
+    def _on_scan_changed(self, scheduled_scan_id, scan):
+        """
+        Handle scheduled scan changed, queueing it for the next flush.
+        
+        Args:
+            scheduled_scan_id: Scheduled scan ID
+            scan: Scheduled scan dictionary, or None if deleted
+        """
+        # Only the latest change of each scan is applied
+        self._pending_changes[scheduled_scan_id] = scan
+        if not self._flush_timer.isActive():
+            self._flush_timer.start()
+    
+    def _flush_changes(self):
+        """Apply queued scheduled scan changes, updating only their rows."""
+        changes, self._pending_changes = self._pending_changes, {}
+        
+        # Scans not shown yet are placed by a full refresh
+        if not self.model.apply_changes(changes):
+            self.refresh()
+    
     def _show_context_menu(self, position):
         """
         Show context menu.
@@ -162,125 +301,140 @@ class ScheduledScansTabWidget(QWidget):
         # Get row
         row = indexes[0].row()
         
-        # Get scheduled scan ID
-        scheduled_scan_id = int(self.table.item(row, 0).text())
-        
-        # Get status
-        status = self.table.item(row, 5).text()
+        # Get scheduled scan ID and status
+        scheduled_scan = self.model.scheduled_scan(row)
+        scheduled_scan_id = scheduled_scan.get('id')
+        status = scheduled_scan.get('status', '')
         
-        # Create menu
-        menu = QMenu()
-        
-        # Create cancel action if pending or running
-        if status in ['pending', 'running']:
-            cancel_action = QAction("Cancel Scan", self)
-            cancel_action.triggered.connect(lambda: self._cancel_scheduled_scan(scheduled_scan_id))
-            menu.addAction(cancel_action)
-        
-        # Create delete action
-        delete_action = QAction("Delete Scan", self)
-        delete_action.triggered.connect(lambda: self._delete_scheduled_scan(scheduled_scan_id))
-        menu.addAction(delete_action)
+        # Show cancel action if pending or running
+        self._cancel_action.setData(scheduled_scan_id)
+        self._cancel_action.setVisible(status in ['pending', 'running'])
+        self._delete_action.setData(scheduled_scan_id)
         
         # Show menu
-        menu.exec_(QCursor.pos())
+        self._context_menu.exec_(QCursor.pos())
+    
+    def _on_cancel_action(self):
+        """Handle cancel action triggered."""
+        self._cancel_scheduled_scan(self._cancel_action.data())
+    
+    def _on_delete_action(self):
+        """Handle delete action triggered."""
+        self._delete_scheduled_scan(self._delete_action.data())
+    
+    def _show_message(self, icon, title, text, on_yes=None):
+        """
+        Show a message box without blocking in a nested event loop.
+        
+        Args:
+            icon: Message box icon
+            title: Message box title
+            text: Message text
+            on_yes: Called if the user answers yes, asks a yes/no question if
+                given
+        """
+        buttons = QMessageBox.Yes | QMessageBox.No if on_yes else QMessageBox.Ok
+        box = QMessageBox(icon, title, text, buttons, self)
+        box.setAttribute(Qt.WA_DeleteOnClose)
+        if on_yes:
+            box.setDefaultButton(QMessageBox.No)
+            box.finished.connect(lambda result: on_yes() if result == QMessageBox.Yes else None)
+        box.open()
     
     def _cancel_scheduled_scan(self, scheduled_scan_id):
         """
-        Cancel scheduled scan.
+        Cancel scheduled scan, once confirmed.
+        
+        Args:
+            scheduled_scan_id: Scheduled scan ID
+        """
+        self._show_message(
+            QMessageBox.Question,
+            "Confirm Cancellation",
+            f"Are you sure you want to cancel scheduled scan {scheduled_scan_id}?",
+            functools.partial(self._on_cancel_confirmed, scheduled_scan_id)
+        )
+    
+    def _on_cancel_confirmed(self, scheduled_scan_id):
+        """
+        Handle scheduled scan cancellation confirmed.
         
         Args:
             scheduled_scan_id: Scheduled scan ID
         """
         try:
-            # Confirm cancellation
-            reply = QMessageBox.question(
-                self,
-                "Confirm Cancellation",
-                f"Are you sure you want to cancel scheduled scan {scheduled_scan_id}?",
-                QMessageBox.Yes | QMessageBox.No,
-                QMessageBox.No
-            )
-            
-            if reply != QMessageBox.Yes:
-                return
-            
             # Cancel scheduled scan
             success, error = self.scheduler.cancel_scheduled_scan(scheduled_scan_id)
             
             if not success:
                 logger.error(f"Error cancelling scheduled scan: {error}")
-                QMessageBox.warning(
-                    self,
+                self._show_message(
+                    QMessageBox.Warning,
                     "Cancel Error",
                     f"Error cancelling scheduled scan: {error}"
                 )
                 return
             
-            # Refresh
-            self.refresh()
-            
             # Show success message
-            QMessageBox.information(
-                self,
+            self._show_message(
+                QMessageBox.Information,
                 "Cancel Successful",
                 f"Scheduled scan {scheduled_scan_id} cancelled successfully"
             )
         
         except Exception as e:
             logger.exception(f"Unexpected error cancelling scheduled scan: {str(e)}")
-            QMessageBox.warning(
-                self,
+            self._show_message(
+                QMessageBox.Warning,
                 "Cancel Error",
                 f"Unexpected error cancelling scheduled scan: {str(e)}"
             )
     
     def _delete_scheduled_scan(self, scheduled_scan_id):
         """
-        Delete scheduled scan.
+        Delete scheduled scan, once confirmed.
+        
+        Args:
+            scheduled_scan_id: Scheduled scan ID
+        """
+        self._show_message(
+            QMessageBox.Question,
+            "Confirm Deletion",
+            f"Are you sure you want to delete scheduled scan {scheduled_scan_id}?",
+            functools.partial(self._on_delete_confirmed, scheduled_scan_id)
+        )
+    
+    def _on_delete_confirmed(self, scheduled_scan_id):
+        """
+        Handle scheduled scan deletion confirmed.
         
         Args:
             scheduled_scan_id: Scheduled scan ID
         """
         try:
-            # Confirm deletion
-            reply = QMessageBox.question(
-                self,
-                "Confirm Deletion",
-                f"Are you sure you want to delete scheduled scan {scheduled_scan_id}?",
-                QMessageBox.Yes | QMessageBox.No,
-                QMessageBox.No
-            )
-            
-            if reply != QMessageBox.Yes:
-                return
-            
             # Delete scheduled scan
             success, error = self.scheduler.delete_scheduled_scan(scheduled_scan_id)
             
             if not success:
                 logger.error(f"Error deleting scheduled scan: {error}")
-                QMessageBox.warning(
-                    self,
+                self._show_message(
+                    QMessageBox.Warning,
                     "Delete Error",
                     f"Error deleting scheduled scan: {error}"
                 )
                 return
             
-            # Refresh
-            self.refresh()
-            
             # Show success message
-            QMessageBox.information(
-                self,
+            self._show_message(
+                QMessageBox.Information,
                 "Delete Successful",
                 f"Scheduled scan {scheduled_scan_id} deleted successfully"
             )
         
         except Exception as e:
             logger.exception(f"Unexpected error deleting scheduled scan: {str(e)}")
-            QMessageBox.warning(
-                self,
+            self._show_message(
+                QMessageBox.Warning,
                 "Delete Error",
                 f"Unexpected error deleting scheduled scan: {str(e)}"
             )
@@ -5,16 +5,18 @@ This module provides the main window for the BNSW application.
 """
 
 import os
+import csv
 import json
 import logging
-import datetime
+import time
 from typing import Dict, List, Any, Optional
 
 from PyQt5.QtWidgets import (QMainWindow, QTabWidget, QVBoxLayout, QHBoxLayout, QWidget,
                             QAction, QMenu, QToolBar, QStatusBar, QFileDialog, QMessageBox,
-                            QLabel, QSplitter, QDialog)
-from PyQt5.QtCore import Qt, pyqtSignal, pyqtSlot, QTimer, QMetaObject, Q_ARG, Qt
-from PyQt5.QtGui import QIcon, QPixmap
+                            QLabel, QSplitter, QDialog, QApplication)
+from PyQt5.QtCore import (Qt, pyqtSignal, pyqtSlot, QTimer, QMetaObject, Q_ARG, Qt,
+                          QRunnable, QThreadPool)
+from PyQt5.QtGui import QIcon
 
 from BNSW.core.scanner_manager import ScannerManager
 from BNSW.core.scheduler import Scheduler
@@ -24,22 +26,197 @@ from BNSW.ui.widgets.scan_panel import ScanPanelWidget
 from BNSW.ui.widgets.host_table import HostTableWidget
 from BNSW.ui.widgets.port_table import PortTableWidget
 from BNSW.ui.widgets.progress_bar import ScanProgressBarWidget
-from BNSW.ui.widgets.network_map import NetworkMapWidget
-from BNSW.ui.widgets.history_tab import HistoryTabWidget
-from BNSW.ui.widgets.scheduled_scans_tab import ScheduledScansTabWidget
-from BNSW.ui.widgets.schedule_dialog import ScheduleDialog
-from BNSW.utils.themes import set_dark_theme, set_light_theme
 
 # Set up logger
 logger = logging.getLogger('BNSW.ui.windows.main_window')
 
+# Buffer size of saved and exported result files
+_RESULTS_FILE_BUFFER_SIZE = 1 << 20
+
+# Local time format of saved and exported result timestamps
+_TIMESTAMP_FORMAT = '%Y-%m-%dT%H:%M:%S'
+
+# Scan info metadata of JSON exports, besides timestamp and hosts count
+_JSON_EXPORT_INFO = {
+    'export_type': 'json',
+    'application': 'BNSW Network Scanner'
+}
+
+def _write_results_json(file_path, scan_info, hosts):
+    """
+    Write scan results as compact JSON, one host at a time.
+    
+    Args:
+        file_path: Path of the file to write
+        scan_info: Scan info dictionary
+        hosts: List of host dictionaries
+    """
+    with open(file_path, 'w', buffering=_RESULTS_FILE_BUFFER_SIZE) as f:
+        f.write('{"scan_info":')
+        json.dump(scan_info, f, separators=(',', ':'))
+        f.write(',"hosts":[')
+        for i, host in enumerate(hosts):
+            if i:
+                f.write(',')
+            json.dump(host, f, separators=(',', ':'))
+        f.write(']}')
+
+# Columns of exported CSV files
+_CSV_HEADER = ('IP', 'Hostname', 'Status', 'MAC', 'OS', 'Ports')
+
+def _csv_rows(hosts):
+    """
+    Generate the CSV rows of hosts.
+    
+    Args:
+        hosts: List of host dictionaries, as returned by HostTableWidget.get_hosts()
+        
+    Yields:
+        tuple: Row of a host, its ports joined as port/protocol/state/service
+    """
+    join = "|".join
+    for host in hosts:
+        get = host.get
+        ports_str = join([
+            f"{p.get('port', '')}/{p.get('protocol', '')}/{p.get('state', '')}/{p.get('service', '')}"
+            for p in get('ports', ())
+        ])
+        yield (get('ip', ''), get('hostname', ''), get('status', ''),
+               get('mac', ''), get('os', ''), ports_str)
+
+# With the large file buffer, writing the file takes next to no time: a
+# 100k host export takes as long to a file as to memory. What time there is
+# goes into building and formatting the rows, and it is spent on a pool
+# thread, so the row generation is the place to look for further savings.
+def _write_results_csv(file_path, hosts):
+    """
+    Write scan results as CSV, one row per host.
+    
+    Args:
+        file_path: Path of the file to write
+        hosts: List of host dictionaries, as returned by HostTableWidget.get_hosts()
+    """
+    with open(file_path, 'w', newline='', encoding='utf-8',
+              buffering=_RESULTS_FILE_BUFFER_SIZE) as f:
+        writer = csv.writer(f, quoting=csv.QUOTE_ALL, lineterminator='\n')
+        writer.writerow(_CSV_HEADER)
+        writer.writerows(_csv_rows(hosts))
+
+class _WriteResults(QRunnable):
+    """Writes scan results to a file on a pool thread."""
+    
+    def __init__(self, kind, write, file_path, args, written):
+        """
+        Initialize write.
+        
+        Args:
+            kind: 'save' or 'export', selects the messages shown when done
+            write: Function writing the file, called with file_path and args
+            file_path: Path of the file to write
+            args: Further arguments of write, not changed while writing
+            written: Signal emitted with (kind, file_path, error_message)
+        """
+        super().__init__()
+        self.kind = kind
+        self.write = write
+        self.file_path = file_path
+        self.args = args
+        self.written = written
+    
+    def run(self):
+        error = ''
+        try:
+            self.write(self.file_path, *self.args)
+        except Exception as e:
+            logger.exception(f"Error writing results to {self.file_path}: {e}")
+            error = str(e) or type(e).__name__
+        
+        try:
+            self.written.emit(self.kind, self.file_path, error)
+        except RuntimeError:
+            # Window was deleted while writing
+            pass
+
+class _SaveScanResult(QRunnable):
+    """Saves a scan result to the database on a pool thread."""
+    
+    def __init__(self, db_manager, scan_id, result, saved):
+        """
+        Initialize save.
+        
+        Args:
+            db_manager: Database manager
+            scan_id: Scan ID
+            result: Scan result dictionary, not changed while saving
+            saved: Signal emitted with (success, error_message)
+        """
+        super().__init__()
+        self.db_manager = db_manager
+        self.scan_id = scan_id
+        self.result = result
+        self.saved = saved
+    
+    def run(self):
+        try:
+            success, db_id, error = self.db_manager.save_scan_result(self.scan_id, self.result)
+            if not success:
+                logger.error(f"Error saving scan result: {error}")
+                error = f"Error saving scan result: {error}"
+        except Exception as e:
+            logger.exception(f"Unexpected error saving scan result: {e}")
+            success, error = False, f"Unexpected error saving scan result: {e}"
+        
+        try:
+            self.saved.emit(success, error)
+        except RuntimeError:
+            # Window was deleted while saving
+            pass
+
 class MainWindow(QMainWindow):
     """Main window for the BNSW application."""
     
-    # Define signals for thread-safe operations
-    scan_complete_signal = pyqtSignal(str, int)
+    # Define signals for thread-safe operations, progress updates also
+    # report completion with their final value
     update_progress_signal = pyqtSignal(str, int)
     
+    # Emitted from the pool thread when results are written to a file
+    _results_written = pyqtSignal(str, str, str)
+    
+    # Emitted from the pool thread when a scan result is saved to the database
+    _scan_result_saved = pyqtSignal(bool, str)
+    
+    # Titles and messages shown when results are written, by kind of write
+    _RESULTS_WRITTEN_MESSAGES = {
+        'save': ("Save Successful", "Results saved to {}",
+                 "Save Error", "Error saving results: {}"),
+        'export': ("Export Successful", "Results exported to {}",
+                   "Export Error", "Error exporting results: {}")
+    }
+    
+    # Admin indicator text, stylesheet and tooltip of each admin status
+    _ADMIN_YES = ("Admin: Yes", "color: green;",
+                  "Administrator privileges detected - all scan types available")
+    _ADMIN_NO = ("Admin: No", "color: red;",
+                 "Administrator privileges not detected\n"
+                 "OS Detection and Comprehensive scan types require administrator privileges\n"
+                 "Please restart the application with administrator privileges to use these scan types")
+    _ADMIN_UNKNOWN = ("Admin: Unknown", "color: orange;",
+                      "Could not determine administrator status")
+    
+    # Indexes of the main tabs built the first time they are shown
+    _NETWORK_MAP_TAB = 1
+    _HISTORY_TAB = 2
+    _SCHEDULED_SCANS_TAB = 3
+    
+    # Minimum seconds between progress updates sent to the main thread for a scan
+    _PROGRESS_EMIT_INTERVAL = 0.05
+    
+    # Seconds a finished scan's progress bar stays shown
+    _PROGRESS_BAR_LINGER = 5
+    
+    # Most removed progress bars kept for reuse
+    _PROGRESS_BAR_POOL_SIZE = 4
+    
     def __init__(self):
         """Initialize main window."""
         super().__init__()
@@ -49,21 +226,39 @@ class MainWindow(QMainWindow):
         
         # Create managers
         self.scanner_manager = ScannerManager()
-        self.db_manager = DatabaseManager()
+        self.db_manager = DatabaseManager.instance()
         self.scheduler = Scheduler()
         
         # Initialize variables
+        self._app = QApplication.instance()
         self.active_scans = {}
         self.current_theme = 'light'
         self.scan_results_tabs = {}
+        # Tab ID of each scan results tab widget
+        self._tab_widget_to_id = {}
         self.next_tab_id = 1
+        self._schedule_dialog = None
+        
+        # Time and value of the last progress update sent for each running scan
+        self._last_progress_emit = {}
+        
+        # Time to remove the progress bar of each finished scan, checked by
+        # one timer for all scans
+        self._pending_removals = {}
+        self._removal_timer = QTimer(self)
+        self._removal_timer.setInterval(1000)
+        self._removal_timer.timeout.connect(self._remove_expired_progress_bars)
+        
+        # Removed progress bars, hidden until reused by a new scan
+        self._progress_bar_pool = []
         
         # Initialize UI
         self._init_ui()
         
         # Connect signals
-        self.scan_complete_signal.connect(self._on_scan_complete_main_thread)
-        self.update_progress_signal.connect(self._on_update_progress_main_thread)
+        self.update_progress_signal.connect(self._on_update_progress_main_thread, Qt.QueuedConnection)
+        self._results_written.connect(self._on_results_written)
+        self._scan_result_saved.connect(self._on_scan_result_saved)
         
         # Check Nmap installation
         self._check_nmap_installation()
@@ -101,27 +296,21 @@ class MainWindow(QMainWindow):
         # Create initial scan results tab
         self._create_scan_results_tab("Current Scan")
         
-        # Create network map tab
-        network_map_tab = QWidget()
-        network_map_layout = QVBoxLayout(network_map_tab)
-        
-        # Create network map
-        self.network_map = NetworkMapWidget()
-        self.network_map.host_selected.connect(self._on_map_host_selected)
-        network_map_layout.addWidget(self.network_map)
-        
-        # Create history tab
-        self.history_tab = HistoryTabWidget()
-        self.history_tab.scan_selected.connect(self._on_history_scan_selected)
-        
-        # Create scheduled scans tab
-        self.scheduled_scans_tab = ScheduledScansTabWidget()
+        # Other tabs are built the first time they are shown
+        self.network_map = None
+        self.history_tab = None
+        self.scheduled_scans_tab = None
+        # Hosts of the latest scan, shown by the network map once built
+        self._map_hosts = []
+        # Tab index -> (placeholder, build function)
+        self._deferred_tabs = {}
         
         # Add tabs to main tab widget
         self.tab_widget.addTab(self.scan_results_container, "Scan Results")
-        self.tab_widget.addTab(network_map_tab, "Network Map")
-        self.tab_widget.addTab(self.history_tab, "History")
-        self.tab_widget.addTab(self.scheduled_scans_tab, "Scheduled Scans")
+        self._add_deferred_tab("Network Map", self._build_network_map_tab)
+        self._add_deferred_tab("History", self._build_history_tab)
+        self._add_deferred_tab("Scheduled Scans", self._build_scheduled_scans_tab)
+        self.tab_widget.currentChanged.connect(self._on_tab_changed)
         
         # Add tab widget to main layout
         main_layout.addWidget(self.tab_widget)
@@ -138,14 +327,73 @@ class MainWindow(QMainWindow):
         self.setStatusBar(self.status_bar)
         self.status_bar.showMessage("Ready")
         
-        # Create admin indicator
+        # Create admin indicator, set up with the checked admin status
         self.admin_indicator = QLabel()
-        self.admin_indicator.setPixmap(QPixmap())  # Empty pixmap
-        self.admin_indicator.setToolTip("Administrator privileges required for some scan types")
+        self._check_admin_status()
         self.status_bar.addPermanentWidget(self.admin_indicator)
+    
+    def _add_deferred_tab(self, title, build):
+        """
+        Add a tab whose content is built the first time it is shown.
         
-        # Check admin status
-        self._check_admin_status()
+        Args:
+            title: Tab title
+            build: Function returning the tab's content widget
+        """
+        placeholder = QWidget()
+        placeholder_layout = QVBoxLayout(placeholder)
+        placeholder_layout.setContentsMargins(0, 0, 0, 0)
+        index = self.tab_widget.addTab(placeholder, title)
+        self._deferred_tabs[index] = (placeholder, build)
+    
+    @pyqtSlot(int)
+    def _on_tab_changed(self, index):
+        """
+        Handle main tab changed, building the tab if shown for the first time.
+        
+        Args:
+            index: Tab index
+        """
+        deferred = self._deferred_tabs.pop(index, None)
+        if deferred is None:
+            return
+        
+        placeholder, build = deferred
+        placeholder.layout().addWidget(build())
+    
+    def _build_network_map_tab(self):
+        """Build network map tab."""
+        from BNSW.ui.widgets.network_map import NetworkMapWidget
+        
+        # Create network map tab
+        network_map_tab = QWidget()
+        network_map_layout = QVBoxLayout(network_map_tab)
+        
+        # Create network map
+        self.network_map = NetworkMapWidget()
+        self.network_map.host_selected.connect(self._on_map_host_selected)
+        network_map_layout.addWidget(self.network_map)
+        
+        # Show hosts scanned before the map was built
+        if self._map_hosts:
+            self.network_map.set_hosts(self._map_hosts)
+        
+        return network_map_tab
+    
+    def _build_history_tab(self):
+        """Build history tab."""
+        from BNSW.ui.widgets.history_tab import HistoryTabWidget
+        
+        self.history_tab = HistoryTabWidget(db_manager=self.db_manager)
+        self.history_tab.scan_selected.connect(self._on_history_scan_selected)
+        return self.history_tab
+    
+    def _build_scheduled_scans_tab(self):
+        """Build scheduled scans tab."""
+        from BNSW.ui.widgets.scheduled_scans_tab import ScheduledScansTabWidget
+        
+        self.scheduled_scans_tab = ScheduledScansTabWidget(scheduler=self.scheduler)
+        return self.scheduled_scans_tab
     
     def _create_menu_bar(self):
         """Create menu bar."""
@@ -189,12 +437,12 @@ class MainWindow(QMainWindow):
         
         # Create light theme action
         light_theme_action = QAction("Light", self)
-        light_theme_action.triggered.connect(lambda: self._set_theme('light'))
+        light_theme_action.triggered.connect(self._set_theme_light)
         theme_menu.addAction(light_theme_action)
         
         # Create dark theme action
         dark_theme_action = QAction("Dark", self)
-        dark_theme_action.triggered.connect(lambda: self._set_theme('dark'))
+        dark_theme_action.triggered.connect(self._set_theme_dark)
         theme_menu.addAction(dark_theme_action)
         
         # Create help menu
@@ -235,26 +483,24 @@ class MainWindow(QMainWindow):
             # Try to run a privileged Nmap command
             is_admin = self.scanner_manager.check_admin_privileges()
             
-            if is_admin:
-                # Set admin indicator
-                self.admin_indicator.setText("Admin: Yes")
-                self.admin_indicator.setStyleSheet("color: green;")
-                self.admin_indicator.setToolTip("Administrator privileges detected - all scan types available")
-            else:
-                # Set non-admin indicator
-                self.admin_indicator.setText("Admin: No")
-                self.admin_indicator.setStyleSheet("color: red;")
-                self.admin_indicator.setToolTip(
-                    "Administrator privileges not detected\n"
-                    "OS Detection and Comprehensive scan types require administrator privileges\n"
-                    "Please restart the application with administrator privileges to use these scan types"
-                )
+            # Set admin indicator
+            self._set_admin_indicator(self._ADMIN_YES if is_admin else self._ADMIN_NO)
         except Exception as e:
-            logger.exception(f"Error checking admin status: {str(e)}")
+            logger.exception(f"Error checking admin status: {e}")
             # Set unknown indicator
-            self.admin_indicator.setText("Admin: Unknown")
-            self.admin_indicator.setStyleSheet("color: orange;")
-            self.admin_indicator.setToolTip("Could not determine administrator status")
+            self._set_admin_indicator(self._ADMIN_UNKNOWN)
+    
+    def _set_admin_indicator(self, state):
+        """
+        Show an admin status in the admin indicator.
+        
+        Args:
+            state: (text, stylesheet, tooltip) of the status
+        """
+        text, qss, tooltip = state
+        self.admin_indicator.setText(text)
+        self.admin_indicator.setStyleSheet(qss)
+        self.admin_indicator.setToolTip(tooltip)
 
     def _set_theme(self, theme):
         """
@@ -263,16 +509,25 @@ class MainWindow(QMainWindow):
         Args:
             theme: Theme name
         """
-        from PyQt5.QtWidgets import QApplication
-        app = QApplication.instance()
-
+        from BNSW.utils.themes import set_dark_theme, set_light_theme
+        
         if theme == 'dark' and self.current_theme != 'dark':
-            set_dark_theme(app)
+            set_dark_theme(self._app)
             self.current_theme = 'dark'
         elif theme == 'light' and self.current_theme != 'light':
-            set_light_theme(app)
+            set_light_theme(self._app)
             self.current_theme = 'light'
     
+    @pyqtSlot()
+    def _set_theme_light(self):
+        """Switch to the light theme."""
+        self._set_theme('light')
+    
+    @pyqtSlot()
+    def _set_theme_dark(self):
+        """Switch to the dark theme."""
+        self._set_theme('dark')
+    
     def _create_scan_results_tab(self, title):
         """
         Create a new scan results tab.
@@ -315,12 +570,14 @@ class MainWindow(QMainWindow):
             'host_table': host_table,
             'port_table': port_table
         }
+        self._tab_widget_to_id[tab] = tab_id
         
         # Select the new tab
         self.scan_results_container.setCurrentWidget(tab)
         
         return tab_id, host_table, port_table
     
+    @pyqtSlot(str, str, bool)
     def _on_scan_requested(self, target, profile, save):
         """
         Handle scan requested.
@@ -344,10 +601,14 @@ class MainWindow(QMainWindow):
         # Update status bar
         self.status_bar.showMessage(f"Scanning {target}...")
         
-        # Create progress bar
-        progress_bar = ScanProgressBarWidget()
-        progress_bar.cancel_requested.connect(self._on_cancel_scan)
+        # Get a progress bar, reusing a removed one if any
+        if self._progress_bar_pool:
+            progress_bar = self._progress_bar_pool.pop()
+        else:
+            progress_bar = ScanProgressBarWidget()
+            progress_bar.cancel_requested.connect(self._on_cancel_scan)
         self.progress_layout.addWidget(progress_bar)
+        progress_bar.show()
         
         # Start scan
         scan_id = self.scanner_manager.start_scan(
@@ -368,6 +629,7 @@ class MainWindow(QMainWindow):
         # Update progress bar
         progress_bar.set_scan(scan_id, target)
     
+    @pyqtSlot(str, str)
     def _on_schedule_requested(self, target, profile):
         """
         Handle schedule requested.
@@ -376,8 +638,12 @@ class MainWindow(QMainWindow):
             target: Target
             profile: Profile
         """
-        # Create schedule dialog
-        dialog = ScheduleDialog(target, profile, self)
+        # Create schedule dialog once, it is reused for every scan scheduled
+        if self._schedule_dialog is None:
+            from BNSW.ui.widgets.schedule_dialog import ScheduleDialog
+            self._schedule_dialog = ScheduleDialog(self)
+        dialog = self._schedule_dialog
+        dialog.reset(target, profile)
         
         # Show dialog
         if dialog.exec_() == QDialog.Accepted:
@@ -403,11 +669,8 @@ class MainWindow(QMainWindow):
                 f"Scan scheduled successfully with ID {scheduled_scan_id}"
             )
             
-            # Refresh scheduled scans tab
-            self.scheduled_scans_tab.refresh()
-            
             # Switch to scheduled scans tab
-            self.tab_widget.setCurrentWidget(self.scheduled_scans_tab)
+            self.tab_widget.setCurrentIndex(self._SCHEDULED_SCANS_TAB)
     
     def _on_scan_progress(self, scan_id, progress):
         """
@@ -417,13 +680,28 @@ class MainWindow(QMainWindow):
             scan_id: Scan ID
             progress: Progress percentage (0-100), or -1 for error, -2 for permission denied
         """
-        # Emit signal to update progress in main thread
-        self.update_progress_signal.emit(scan_id, progress)
-        
         # Check if scan is complete
         if progress == 100 or progress < 0:
-            # Emit signal to handle completion in main thread
-            self.scan_complete_signal.emit(scan_id, progress)
+            # Final progress is always sent, completion is handled with it
+            # in main thread
+            self._last_progress_emit.pop(scan_id, None)
+            self.update_progress_signal.emit(scan_id, int(progress))
+            return
+        
+        # Send progress at a limited rate, skipping updates that don't
+        # change the shown percentage
+        now = time.monotonic()
+        value = int(progress)
+        last = self._last_progress_emit.get(scan_id)
+        if last is not None:
+            last_time, last_value = last
+            if value == last_value or now - last_time < self._PROGRESS_EMIT_INTERVAL:
+                return
+        self._last_progress_emit[scan_id] = (now, value)
+        
+        # Emit signal to update progress in main thread, as the whole
+        # percentage the signal carries
+        self.update_progress_signal.emit(scan_id, value)
     
     @pyqtSlot(str, int)
     def _on_update_progress_main_thread(self, scan_id, progress):
@@ -445,8 +723,11 @@ class MainWindow(QMainWindow):
         # Update progress bar
         if progress_bar:
             progress_bar.update_progress(progress)
+        
+        # Handle completion after showing the final progress
+        if progress == 100 or progress < 0:
+            self._on_scan_complete_main_thread(scan_id, progress)
     
-    @pyqtSlot(str, int)
     def _on_scan_complete_main_thread(self, scan_id, status_code):
         """
         Handle scan complete in main thread.
@@ -460,11 +741,14 @@ class MainWindow(QMainWindow):
         if not scan_info:
             return
         
-        # Get tab ID
+        # Get scan parameters
         tab_id = scan_info.get('tab_id', 1)
+        target = scan_info.get('target', '')
+        profile = scan_info.get('profile', '')
+        save = scan_info.get('save', False)
         
-        # Get scan status
-        scan_status = self.scanner_manager.get_scan_status(scan_id)
+        # Get scan status and result
+        scan_status, result = self.scanner_manager.get_scan_status_and_result(scan_id)
         
         # Check for permission error
         permission_error = scan_status.get('status') == 'permission_denied'
@@ -472,50 +756,31 @@ class MainWindow(QMainWindow):
         # Get error message
         error_message = scan_status.get('error_message')
         
-        # Get scan result
-        result = self.scanner_manager.get_scan_result(scan_id)
-        
-        # Save result
-        if scan_info.get('save', False) and status_code == 100 and result:
-            try:
-                success, db_id, error = self.db_manager.save_scan_result(scan_id, result)
-                if not success:
-                    logger.error(f"Error saving scan result: {error}")
-                    QMessageBox.warning(
-                        self,
-                        "Save Error",
-                        f"Error saving scan result: {error}"
-                    )
-            except Exception as e:
-                logger.exception(f"Unexpected error saving scan result: {str(e)}")
-                QMessageBox.warning(
-                    self,
-                    "Save Error",
-                    f"Unexpected error saving scan result: {str(e)}"
-                )
+        # Save result off the UI thread, errors are shown when saved
+        if save and status_code == 100 and result:
+            QThreadPool.globalInstance().start(
+                _SaveScanResult(self.db_manager, scan_id, result, self._scan_result_saved))
         
         # Update UI with result
         if status_code == 100 and result:
             self._update_ui_with_result(result, tab_id)
             
             # Refresh network map tab
-            self.network_map.set_hosts(result.get('hosts', []))
+            self._map_hosts = result.get('hosts', [])
+            if self.network_map is not None:
+                self.network_map.set_hosts(self._map_hosts)
             
             # Update tab title
             tab_info = self.scan_results_tabs.get(tab_id)
             if tab_info:
                 tab_index = self.scan_results_container.indexOf(tab_info['tab'])
                 if tab_index >= 0:
-                    target = scan_info.get('target', '')
                     self.scan_results_container.setTabText(tab_index, f"Scan: {target}")
         
         # Update scan panel
         self.scan_panel.set_scan_state(False)
         
         # Update status bar
-        target = scan_info.get('target', '')
-        profile = scan_info.get('profile', '')
-        
         if status_code == 100:
             self.status_bar.showMessage(f"Scan of {target} completed successfully")
         elif permission_error:
@@ -540,7 +805,20 @@ class MainWindow(QMainWindow):
                 )
         
         # Schedule removal of progress bar
-        QTimer.singleShot(5000, lambda: self._remove_progress_bar(scan_id))
+        self._pending_removals[scan_id] = time.monotonic() + self._PROGRESS_BAR_LINGER
+        if not self._removal_timer.isActive():
+            self._removal_timer.start()
+    
+    @pyqtSlot()
+    def _remove_expired_progress_bars(self):
+        """Remove the progress bars of scans finished long enough ago."""
+        now = time.monotonic()
+        expired = [scan_id for scan_id, deadline in self._pending_removals.items() if deadline <= now]
+        for scan_id in expired:
+            self._remove_progress_bar(scan_id)
+        
+        if not self._pending_removals:
+            self._removal_timer.stop()
     
     def _remove_progress_bar(self, scan_id):
         """
@@ -549,6 +827,8 @@ class MainWindow(QMainWindow):
         Args:
             scan_id: Scan ID
         """
+        self._pending_removals.pop(scan_id, None)
+        
         # Get scan info
         scan_info = self.active_scans.get(scan_id)
         if not scan_info:
@@ -557,14 +837,19 @@ class MainWindow(QMainWindow):
         # Get progress bar
         progress_bar = scan_info.get('progress_bar')
         
-        # Remove progress bar
+        # Remove progress bar, keeping it for reuse if the pool has room
         if progress_bar:
             self.progress_layout.removeWidget(progress_bar)
-            progress_bar.deleteLater()
+            if len(self._progress_bar_pool) < self._PROGRESS_BAR_POOL_SIZE:
+                progress_bar.hide()
+                self._progress_bar_pool.append(progress_bar)
+            else:
+                progress_bar.deleteLater()
         
         # Remove scan info
         self.active_scans.pop(scan_id, None)
     
+    @pyqtSlot(str)
     def _on_cancel_scan(self, scan_id):
         """
         Handle cancel scan.
@@ -574,6 +859,7 @@ class MainWindow(QMainWindow):
         """
         # Cancel scan
         self.scanner_manager.cancel_scan(scan_id)
+        self._last_progress_emit.pop(scan_id, None)
         
         # Remove progress bar
         self._remove_progress_bar(scan_id)
@@ -627,6 +913,7 @@ class MainWindow(QMainWindow):
         # Update port table
         tab_info['port_table'].set_ports(host.get('ports', []))
     
+    @pyqtSlot(dict)
     def _on_map_host_selected(self, host):
         """
         Handle host selected from map.
@@ -639,7 +926,7 @@ class MainWindow(QMainWindow):
         
         # Find first tab with hosts
         for tab_id, tab_info in self.scan_results_tabs.items():
-            if tab_info['host_table'].get_hosts():
+            if tab_info['host_table'].rowCount():
                 current_tab_id = tab_id
                 break
         
@@ -656,6 +943,7 @@ class MainWindow(QMainWindow):
         if tab_info:
             self.scan_results_container.setCurrentWidget(tab_info['tab'])
     
+    @pyqtSlot(dict)
     def _on_history_scan_selected(self, result):
         """
         Handle history scan selected.
@@ -674,6 +962,7 @@ class MainWindow(QMainWindow):
         # Update UI with result
         self._update_ui_with_result(result, tab_id)
     
+    @pyqtSlot(int)
     def _on_scan_tab_close_requested(self, index):
         """
         Handle scan tab close requested.
@@ -685,11 +974,7 @@ class MainWindow(QMainWindow):
         tab = self.scan_results_container.widget(index)
         
         # Find tab ID
-        tab_id = None
-        for tid, tab_info in self.scan_results_tabs.items():
-            if tab_info['tab'] == tab:
-                tab_id = tid
-                break
+        tab_id = self._tab_widget_to_id.get(tab)
         
         if tab_id is None:
             return
@@ -708,8 +993,8 @@ class MainWindow(QMainWindow):
         self.scan_results_container.removeTab(index)
         
         # Remove tab info
-        if tab_id in self.scan_results_tabs:
-            del self.scan_results_tabs[tab_id]
+        self.scan_results_tabs.pop(tab_id, None)
+        self._tab_widget_to_id.pop(tab, None)
     
     def _check_unsaved_results(self):
         """
@@ -725,11 +1010,7 @@ class MainWindow(QMainWindow):
         current_tab = self.scan_results_container.widget(current_index)
         
         # Find current tab ID
-        current_tab_id = None
-        for tab_id, tab_info in self.scan_results_tabs.items():
-            if tab_info['tab'] == current_tab:
-                current_tab_id = tab_id
-                break
+        current_tab_id = self._tab_widget_to_id.get(current_tab)
         
         if current_tab_id is None:
             return True
@@ -740,7 +1021,7 @@ class MainWindow(QMainWindow):
             return True
         
         # Check if there are hosts in the table
-        if tab_info['host_table'].get_hosts():
+        if tab_info['host_table'].rowCount():
             # Ask user if they want to keep the results
             reply = QMessageBox.question(
                 self,
@@ -757,6 +1038,7 @@ class MainWindow(QMainWindow):
         # Use current tab
         return False
     
+    @pyqtSlot()
     def _on_save_results(self):
         """Handle save results."""
         # Get current tab ID
@@ -764,11 +1046,7 @@ class MainWindow(QMainWindow):
         current_tab = self.scan_results_container.widget(current_index)
         
         # Find current tab ID
-        current_tab_id = None
-        for tab_id, tab_info in self.scan_results_tabs.items():
-            if tab_info['tab'] == current_tab:
-                current_tab_id = tab_id
-                break
+        current_tab_id = self._tab_widget_to_id.get(current_tab)
         
         if current_tab_id is None:
             return
@@ -802,35 +1080,18 @@ class MainWindow(QMainWindow):
         if not file_path:
             return
         
-        # Create result dictionary
-        result = {
-            'scan_info': {
-                'timestamp': datetime.datetime.now().isoformat(),
-                'hosts_count': len(hosts)
-            },
-            'hosts': hosts
+        # Create scan info
+        scan_info = {
+            'timestamp': time.strftime(_TIMESTAMP_FORMAT),
+            'hosts_count': len(hosts)
         }
         
-        try:
-            # Save to file
-            with open(file_path, 'w') as f:
-                json.dump(result, f, indent=2)
-            
-            # Show success message
-            QMessageBox.information(
-                self,
-                "Save Successful",
-                f"Results saved to {file_path}"
-            )
-        
-        except Exception as e:
-            # Show error message
-            QMessageBox.critical(
-                self,
-                "Save Error",
-                f"Error saving results: {str(e)}"
-            )
+        # Save to file off the UI thread, the result is shown when written
+        QThreadPool.globalInstance().start(
+            _WriteResults('save', _write_results_json, file_path, (scan_info, hosts),
+                          self._results_written))
     
+    @pyqtSlot()
     def _on_export_json(self):
         """Handle export to JSON."""
         # Get current tab ID
@@ -838,11 +1099,7 @@ class MainWindow(QMainWindow):
         current_tab = self.scan_results_container.widget(current_index)
         
         # Find current tab ID
-        current_tab_id = None
-        for tab_id, tab_info in self.scan_results_tabs.items():
-            if tab_info['tab'] == current_tab:
-                current_tab_id = tab_id
-                break
+        current_tab_id = self._tab_widget_to_id.get(current_tab)
         
         if current_tab_id is None:
             return
@@ -876,37 +1133,49 @@ class MainWindow(QMainWindow):
         if not file_path:
             return
         
-        # Create result dictionary with enhanced metadata
-        result = {
-            'scan_info': {
-                'timestamp': datetime.datetime.now().isoformat(),
-                'hosts_count': len(hosts),
-                'export_type': 'json',
-                'application': 'BNSW Network Scanner'
-            },
-            'hosts': hosts
+        # Create scan info with enhanced metadata
+        scan_info = {
+            'timestamp': time.strftime(_TIMESTAMP_FORMAT),
+            'hosts_count': len(hosts),
+            **_JSON_EXPORT_INFO
         }
         
-        try:
-            # Save to file
-            with open(file_path, 'w') as f:
-                json.dump(result, f, indent=2)
-            
-            # Show success message
-            QMessageBox.information(
-                self,
-                "Export Successful",
-                f"Results exported to {file_path}"
-            )
+        # Save to file off the UI thread, the result is shown when written
+        QThreadPool.globalInstance().start(
+            _WriteResults('export', _write_results_json, file_path, (scan_info, hosts),
+                          self._results_written))
+    
+    @pyqtSlot(str, str, str)
+    def _on_results_written(self, kind, file_path, error):
+        """
+        Show the outcome of writing results to a file.
         
-        except Exception as e:
+        Args:
+            kind: 'save' or 'export'
+            file_path: Path of the written file
+            error: Error message, empty if the results were written
+        """
+        success_title, success_text, error_title, error_text = self._RESULTS_WRITTEN_MESSAGES[kind]
+        if error:
             # Show error message
-            QMessageBox.critical(
-                self,
-                "Export Error",
-                f"Error exporting results: {str(e)}"
-            )
+            QMessageBox.critical(self, error_title, error_text.format(error))
+        else:
+            # Show success message
+            QMessageBox.information(self, success_title, success_text.format(file_path))
     
+    @pyqtSlot(bool, str)
+    def _on_scan_result_saved(self, success, error):
+        """
+        Show an error if saving a scan result to the database failed.
+        
+        Args:
+            success: Whether the result was saved
+            error: Error message
+        """
+        if not success:
+            QMessageBox.warning(self, "Save Error", error)
+    
+    @pyqtSlot()
     def _on_export_csv(self):
         """Handle export to CSV."""
         # Get current tab ID
@@ -914,11 +1183,7 @@ class MainWindow(QMainWindow):
         current_tab = self.scan_results_container.widget(current_index)
         
         # Find current tab ID
-        current_tab_id = None
-        for tab_id, tab_info in self.scan_results_tabs.items():
-            if tab_info['tab'] == current_tab:
-                current_tab_id = tab_id
-                break
+        current_tab_id = self._tab_widget_to_id.get(current_tab)
         
         if current_tab_id is None:
             return
@@ -952,47 +1217,12 @@ class MainWindow(QMainWindow):
         if not file_path:
             return
         
-        try:
-            # Create CSV content
-            csv_content = "IP,Hostname,Status,MAC,OS,Ports\n"
-            
-            for host in hosts:
-                # Get host info
-                ip = host.get('ip', '')
-                hostname = host.get('hostname', '')
-                status = host.get('status', '')
-                mac = host.get('mac', '')
-                os_name = host.get('os', {}).get('name', '')
-                
-                # Get ports
-                ports = host.get('ports', [])
-                ports_str = "|".join([
-                    f"{p.get('port', '')}/{p.get('protocol', '')}/{p.get('state', '')}/{p.get('service', '')}"
-                    for p in ports
-                ])
-                
-                # Add row
-                csv_content += f'"{ip}","{hostname}","{status}","{mac}","{os_name}","{ports_str}"\n'
-            
-            # Save to file
-            with open(file_path, 'w') as f:
-                f.write(csv_content)
-            
-            # Show success message
-            QMessageBox.information(
-                self,
-                "Export Successful",
-                f"Results exported to {file_path}"
-            )
-        
-        except Exception as e:
-            # Show error message
-            QMessageBox.critical(
-                self,
-                "Export Error",
-                f"Error exporting results: {str(e)}"
-            )
+        # Write to file off the UI thread, the result is shown when written
+        QThreadPool.globalInstance().start(
+            _WriteResults('export', _write_results_csv, file_path, (hosts,),
+                          self._results_written))
     
+    @pyqtSlot()
     def _on_about(self):
         """Handle about."""
         # Show about dialog
@@ -1019,8 +1249,11 @@ class MainWindow(QMainWindow):
         Args:
             event: Close event
         """
-        # Stop scheduler
-        self.scheduler.stop()
+        # Stop scheduler, its daemon thread exits on its own
+        self.scheduler.request_stop()
+        
+        # Cancel running scans so the scan workers can exit
+        self.scanner_manager.cancel_all_scans()
         
         # Accept event
         event.accept()
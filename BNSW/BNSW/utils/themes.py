@@ -4,10 +4,108 @@ BNSW Utils - Themes
 This module provides theme management for the BNSW application.
 """
 
+import os
+import string
+import functools
+
 from PyQt5.QtWidgets import QApplication
 from PyQt5.QtGui import QPalette, QColor
 from PyQt5.QtCore import Qt
 
+def _build_palette(colors):
+    """
+    Build a palette.
+    
+    Args:
+        colors: Pairs of color role and RGB tuple
+        
+    Returns:
+        QPalette: Palette with the colors set
+    """
+    palette = QPalette()
+    set_color = palette.setColor
+    for role, rgb in colors:
+        set_color(role, QColor(*rgb))
+    return palette
+
+# Palettes of the themes, built once and shared by every theme switch
+_LIGHT_PALETTE = _build_palette((
+    (QPalette.Window, (240, 240, 240)),
+    (QPalette.WindowText, (0, 0, 0)),
+    (QPalette.Base, (255, 255, 255)),
+    (QPalette.AlternateBase, (245, 245, 245)),
+    (QPalette.ToolTipBase, (255, 255, 255)),
+    (QPalette.ToolTipText, (0, 0, 0)),
+    (QPalette.Text, (0, 0, 0)),
+    (QPalette.Button, (240, 240, 240)),
+    (QPalette.ButtonText, (0, 0, 0)),
+    (QPalette.BrightText, (255, 0, 0)),
+    (QPalette.Link, (0, 0, 255)),
+    (QPalette.Highlight, (42, 130, 218)),
+    (QPalette.HighlightedText, (255, 255, 255))
+))
+
+_DARK_PALETTE = _build_palette((
+    (QPalette.Window, (53, 53, 53)),
+    (QPalette.WindowText, (255, 255, 255)),
+    (QPalette.Base, (25, 25, 25)),
+    (QPalette.AlternateBase, (53, 53, 53)),
+    (QPalette.ToolTipBase, (53, 53, 53)),
+    (QPalette.ToolTipText, (255, 255, 255)),
+    (QPalette.Text, (255, 255, 255)),
+    (QPalette.Button, (53, 53, 53)),
+    (QPalette.ButtonText, (255, 255, 255)),
+    (QPalette.BrightText, (255, 0, 0)),
+    (QPalette.Link, (42, 130, 218)),
+    (QPalette.Highlight, (42, 130, 218)),
+    (QPalette.HighlightedText, (255, 255, 255))
+))
+
+# Stylesheet template shared by the themes
+_STYLESHEET_PATH = os.path.join(os.path.dirname(os.path.dirname(os.path.abspath(__file__))),
+                                'resources', 'themes', 'theme.qss')
+
+# Stylesheet colors of the themes
+_STYLESHEET_COLORS = {
+    'light': {
+        'window': '#f0f0f0',
+        'base': '#ffffff',
+        'border': '#c0c0c0',
+        'button': '#e0e0e0',
+        'button_hover': '#d0d0d0',
+        'button_pressed': '#c0c0c0',
+        'gridline': '#d0d0d0',
+        'selection': '#e0e0e0',
+        'selection_text': '#000000'
+    },
+    'dark': {
+        'window': '#353535',
+        'base': '#252525',
+        'border': '#202020',
+        'button': '#353535',
+        'button_hover': '#404040',
+        'button_pressed': '#505050',
+        'gridline': '#404040',
+        'selection': '#404040',
+        'selection_text': '#ffffff'
+    }
+}
+
+@functools.lru_cache(maxsize=None)
+def _load_stylesheet(name):
+    """
+    Load a theme stylesheet, filling in the template only the first time.
+    
+    Args:
+        name: Theme name, 'light' or 'dark'
+        
+    Returns:
+        str: Stylesheet of the theme
+    """
+    with open(_STYLESHEET_PATH, encoding='utf-8') as f:
+        template = string.Template(f.read())
+    return template.substitute(_STYLESHEET_COLORS[name])
+
 class ThemeManager:
     """Theme manager for the BNSW application."""
     
@@ -47,24 +145,7 @@ class ThemeManager:
         Returns:
             QPalette: Light theme palette
         """
-        palette = QPalette()
-        
-        # Set colors
-        palette.setColor(QPalette.Window, QColor(240, 240, 240))
-        palette.setColor(QPalette.WindowText, QColor(0, 0, 0))
-        palette.setColor(QPalette.Base, QColor(255, 255, 255))
-        palette.setColor(QPalette.AlternateBase, QColor(245, 245, 245))
-        palette.setColor(QPalette.ToolTipBase, QColor(255, 255, 255))
-        palette.setColor(QPalette.ToolTipText, QColor(0, 0, 0))
-        palette.setColor(QPalette.Text, QColor(0, 0, 0))
-        palette.setColor(QPalette.Button, QColor(240, 240, 240))
-        palette.setColor(QPalette.ButtonText, QColor(0, 0, 0))
-        palette.setColor(QPalette.BrightText, QColor(255, 0, 0))
-        palette.setColor(QPalette.Link, QColor(0, 0, 255))
-        palette.setColor(QPalette.Highlight, QColor(42, 130, 218))
-        palette.setColor(QPalette.HighlightedText, QColor(255, 255, 255))
-        
-        return palette
+        return _LIGHT_PALETTE
     
     def _get_dark_theme(self):
         """
@@ -73,24 +154,7 @@ class ThemeManager:
         Returns:
             QPalette: Dark theme palette
         """
-        palette = QPalette()
-        
-        # Set colors
-        palette.setColor(QPalette.Window, QColor(53, 53, 53))
-        palette.setColor(QPalette.WindowText, QColor(255, 255, 255))
-        palette.setColor(QPalette.Base, QColor(25, 25, 25))
-        palette.setColor(QPalette.AlternateBase, QColor(53, 53, 53))
-        palette.setColor(QPalette.ToolTipBase, QColor(53, 53, 53))
-        palette.setColor(QPalette.ToolTipText, QColor(255, 255, 255))
-        palette.setColor(QPalette.Text, QColor(255, 255, 255))
-        palette.setColor(QPalette.Button, QColor(53, 53, 53))
-        palette.setColor(QPalette.ButtonText, QColor(255, 255, 255))
-        palette.setColor(QPalette.BrightText, QColor(255, 0, 0))
-        palette.setColor(QPalette.Link, QColor(42, 130, 218))
-        palette.setColor(QPalette.Highlight, QColor(42, 130, 218))
-        palette.setColor(QPalette.HighlightedText, QColor(255, 255, 255))
-        
-        return palette
+        return _DARK_PALETTE
     
     def _get_light_stylesheet(self):
         """
@@ -99,79 +163,7 @@ class ThemeManager:
         Returns:
             str: Light theme stylesheet
         """
-        return """
-        QMainWindow {
-            background-color: #f0f0f0;
-        }
-        
-        QTabWidget::pane {
-            border: 1px solid #c0c0c0;
-            background-color: #ffffff;
-        }
-        
-        QTabBar::tab {
-            background-color: #e0e0e0;
-            border: 1px solid #c0c0c0;
-            padding: 6px 12px;
-            margin-right: 2px;
-        }
-        
-        QTabBar::tab:selected {
-            background-color: #ffffff;
-            border-bottom-color: #ffffff;
-        }
-        
-        QTableWidget {
-            gridline-color: #d0d0d0;
-            selection-background-color: #e0e0e0;
-            selection-color: #000000;
-        }
-        
-        QTableWidget::item:selected {
-            background-color: #e0e0e0;
-        }
-        
-        QHeaderView::section {
-            background-color: #e0e0e0;
-            padding: 4px;
-            border: 1px solid #c0c0c0;
-        }
-        
-        QPushButton {
-            background-color: #e0e0e0;
-            border: 1px solid #c0c0c0;
-            padding: 6px 12px;
-        }
-        
-        QPushButton:hover {
-            background-color: #d0d0d0;
-        }
-        
-        QPushButton:pressed {
-            background-color: #c0c0c0;
-        }
-        
-        QLineEdit, QComboBox {
-            background-color: #ffffff;
-            border: 1px solid #c0c0c0;
-            padding: 4px;
-        }
-        
-        QProgressBar {
-            border: 1px solid #c0c0c0;
-            background-color: #ffffff;
-            text-align: center;
-        }
-        
-        QProgressBar::chunk {
-            background-color: #2a82da;
-        }
-        
-        QStatusBar {
-            background-color: #f0f0f0;
-            border-top: 1px solid #c0c0c0;
-        }
-        """
+        return _load_stylesheet('light')
     
     def _get_dark_stylesheet(self):
         """
@@ -180,111 +172,35 @@ class ThemeManager:
         Returns:
             str: Dark theme stylesheet
         """
-        return """
-        QMainWindow {
-            background-color: #353535;
-        }
-        
-        QTabWidget::pane {
-            border: 1px solid #202020;
-            background-color: #252525;
-        }
-        
-        QTabBar::tab {
-            background-color: #353535;
-            border: 1px solid #202020;
-            padding: 6px 12px;
-            margin-right: 2px;
-        }
-        
-        QTabBar::tab:selected {
-            background-color: #252525;
-            border-bottom-color: #252525;
-        }
-        
-        QTableWidget {
-            gridline-color: #404040;
-            selection-background-color: #404040;
-            selection-color: #ffffff;
-        }
-        
-        QTableWidget::item:selected {
-            background-color: #404040;
-        }
-        
-        QHeaderView::section {
-            background-color: #353535;
-            padding: 4px;
-            border: 1px solid #202020;
-        }
-        
-        QPushButton {
-            background-color: #353535;
-            border: 1px solid #202020;
-            padding: 6px 12px;
-        }
-        
-        QPushButton:hover {
-            background-color: #404040;
-        }
-        
-        QPushButton:pressed {
-            background-color: #505050;
-        }
-        
-        QLineEdit, QComboBox {
-            background-color: #252525;
-            border: 1px solid #202020;
-            padding: 4px;
-        }
-        
-        QProgressBar {
-            border: 1px solid #202020;
-            background-color: #252525;
-            text-align: center;
-        }
-        
-        QProgressBar::chunk {
-            background-color: #2a82da;
-        }
-        
-        QStatusBar {
-            background-color: #353535;
-            border-top: 1px solid #202020;
-        }
-        """
+        return _load_stylesheet('dark')
 
 # Create theme manager instance
 _theme_manager = ThemeManager()
 
-def set_light_theme(app):
+def _apply_theme(app, palette, stylesheet):
     """
-    Set light theme for application.
+    Apply a theme to the application, restyling it only if the stylesheet changes.
     
     Args:
         app: QApplication instance
+        palette: Palette of the theme
+        stylesheet: Stylesheet of the theme
     """
-    # Create light palette
-    palette = QPalette()
-    palette.setColor(QPalette.Window, QColor(240, 240, 240))
-    palette.setColor(QPalette.WindowText, QColor(0, 0, 0))
-    palette.setColor(QPalette.Base, QColor(255, 255, 255))
-    palette.setColor(QPalette.AlternateBase, QColor(245, 245, 245))
-    palette.setColor(QPalette.ToolTipBase, QColor(255, 255, 255))
-    palette.setColor(QPalette.ToolTipText, QColor(0, 0, 0))
-    palette.setColor(QPalette.Text, QColor(0, 0, 0))
-    palette.setColor(QPalette.Button, QColor(240, 240, 240))
-    palette.setColor(QPalette.ButtonText, QColor(0, 0, 0))
-    palette.setColor(QPalette.BrightText, QColor(255, 0, 0))
-    palette.setColor(QPalette.Link, QColor(0, 0, 255))
-    palette.setColor(QPalette.Highlight, QColor(42, 130, 218))
-    palette.setColor(QPalette.HighlightedText, QColor(255, 255, 255))
-    
     # Apply palette
     app.setPalette(palette)
     
-    # Apply stylesheet
-    app.setStyleSheet(_theme_manager._get_light_stylesheet())
+    # Apply stylesheet, setting an equal one still repolishes every widget
+    if app.styleSheet() != stylesheet:
+        app.setStyleSheet(stylesheet)
+
+def set_light_theme(app):
+    """
+    Set light theme for application.
+    
+    Args:
+        app: QApplication instance
+    """
+    _apply_theme(app, _LIGHT_PALETTE, _load_stylesheet('light'))
 
 def set_dark_theme(app):
     """
@@ -293,24 +209,4 @@ def set_dark_theme(app):
     Args:
         app: QApplication instance
     """
-    # Create dark palette
-    palette = QPalette()
-    palette.setColor(QPalette.Window, QColor(53, 53, 53))
-    palette.setColor(QPalette.WindowText, QColor(255, 255, 255))
-    palette.setColor(QPalette.Base, QColor(25, 25, 25))
-    palette.setColor(QPalette.AlternateBase, QColor(53, 53, 53))
-    palette.setColor(QPalette.ToolTipBase, QColor(53, 53, 53))
-    palette.setColor(QPalette.ToolTipText, QColor(255, 255, 255))
-    palette.setColor(QPalette.Text, QColor(255, 255, 255))
-    palette.setColor(QPalette.Button, QColor(53, 53, 53))
-    palette.setColor(QPalette.ButtonText, QColor(255, 255, 255))
-    palette.setColor(QPalette.BrightText, QColor(255, 0, 0))
-    palette.setColor(QPalette.Link, QColor(42, 130, 218))
-    palette.setColor(QPalette.Highlight, QColor(42, 130, 218))
-    palette.setColor(QPalette.HighlightedText, QColor(255, 255, 255))
-    
-    # Apply palette
-    app.setPalette(palette)
-    
-    # Apply stylesheet
-    app.setStyleSheet(_theme_manager._get_dark_stylesheet())
+    _apply_theme(app, _DARK_PALETTE, _load_stylesheet('dark'))
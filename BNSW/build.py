@@ -7,69 +7,132 @@ This script builds the BNSW application using PyInstaller.
 
 import os
 import sys
-import shutil
+import stat
 import subprocess
 import platform
+from pathlib import Path
+
+# Project paths, resolved so the script also works when run through a symlink
+ROOT = Path(__file__).resolve().parent
+RESOURCES = ROOT / 'BNSW' / 'resources'
+MAIN_SCRIPT = ROOT / 'BNSW' / '__main__.py'
+
+def _memory_build_dir():
+    """
+    Get a private build directory in /dev/shm, creating it if needed.
+    
+    /dev/shm is writable by every user, so the directory is per user and
+    only used if it is a real directory owned by and private to this user,
+    otherwise another user could plant cached build files in it.
+    
+    Returns:
+        Path: Build directory, or None if there is no usable one
+    """
+    if platform.system() != 'Linux' or not os.path.isdir('/dev/shm'):
+        return None
+    
+    uid = os.getuid()
+    build_dir = Path(f'/dev/shm/bnsw-build-{uid}')
+    try:
+        build_dir.mkdir(mode=0o700)
+    except FileExistsError:
+        pass
+    except OSError:
+        return None
+    
+    # Check the directory itself, not what a symlink points to
+    try:
+        info = os.lstat(build_dir)
+    except OSError:
+        return None
+    if (not stat.S_ISDIR(info.st_mode) or info.st_uid != uid
+            or info.st_mode & 0o077):
+        print(f"Not using {build_dir}, it is not a private directory of this user")
+        return None
+    
+    return build_dir
 
 def main():
     """Main function."""
     print("Building BNSW Network Scanner...")
     
-    # Get current directory
-    current_dir = os.path.dirname(os.path.abspath(__file__))
+    # Create build directory, in memory on Linux so the intermediate files
+    # of repeated builds never touch the disk
+    build_dir = _memory_build_dir()
+    if build_dir is None:
+        build_dir = ROOT / 'build'
+        build_dir.mkdir(parents=True, exist_ok=True)
     
-    # Create build directory
-    build_dir = os.path.join(current_dir, 'build')
-    if not os.path.exists(build_dir):
-        os.makedirs(build_dir)
-    
-    # Create dist directory
-    dist_dir = os.path.join(current_dir, 'dist')
-    if os.path.exists(dist_dir):
-        shutil.rmtree(dist_dir)
+    # Dist directory, --noconfirm replaces the previous build in it
+    dist_dir = ROOT / 'dist'
     
     # Determine platform-specific settings
     if platform.system() == 'Windows':
-        icon_path = os.path.join(current_dir, 'BNSW', 'resources', 'icon.ico')
+        icon_path = RESOURCES / 'icon.ico'
         exe_name = 'BNSW.exe'
         hidden_imports = ['peewee', 'PyQt5.sip']
     else:
-        icon_path = os.path.join(current_dir, 'BNSW', 'resources', 'icon.png')
+        icon_path = RESOURCES / 'icon.png'
         exe_name = 'BNSW'
         hidden_imports = ['peewee', 'PyQt5.sip']
+    excluded_modules = ['tkinter', 'unittest', 'pydoc', 'test']
+    
+    # Only QtCore, QtGui and QtWidgets are used, keep the other Qt modules
+    # and the libraries they pull in out of the bundle
+    excluded_modules += [f'PyQt5.{module}' for module in (
+        'QtWebEngine', 'QtWebEngineCore', 'QtWebEngineWidgets', 'QtWebChannel',
+        'QtWebSockets', 'QtQml', 'QtQuick', 'QtQuickWidgets', 'QtMultimedia',
+        'QtMultimediaWidgets', 'QtBluetooth', 'QtNfc', 'QtNetwork', 'QtSql',
+        'QtSvg', 'QtXml', 'QtXmlPatterns', 'QtDesigner', 'QtHelp', 'QtOpenGL',
+        'QtPrintSupport', 'QtPositioning', 'QtLocation', 'QtSensors',
+        'QtSerialPort', 'QtTest', 'QtDBus', 'Qt3DCore'
+    )]
     
-    # Create PyInstaller command
+    # Create PyInstaller command, building a directory so the application
+    # starts without first extracting itself to a temporary directory
     cmd = [
         'pyinstaller',
         '--name=BNSW',
-        '--onefile',
+        '--onedir',
         '--windowed',
         f'--icon={icon_path}',
-        '--add-data=BNSW/resources:BNSW/resources',
-        '--clean',
+        f'--add-data={RESOURCES}{os.pathsep}BNSW/resources',
+        f'--workpath={build_dir}',
+        f'--distpath={dist_dir}',
         '--noconfirm'
     ]
     
+    # Strip symbols from the bundled libraries, not supported on Windows
+    if platform.system() != 'Windows':
+        cmd.append('--strip')
+    
     # Add hidden imports
     for imp in hidden_imports:
         cmd.append(f'--hidden-import={imp}')
     
+    # Leave out modules the application never uses
+    for module in excluded_modules:
+        cmd.append(f'--exclude-module={module}')
+    
     # Add main script
-    cmd.append(os.path.join(current_dir, 'BNSW', '__main__.py'))
+    cmd.append(str(MAIN_SCRIPT))
     
     # Run PyInstaller
     print("Running PyInstaller...")
     print(f"Command: {' '.join(cmd)}")
     
+    # Fixed hash seed, so the cached analysis of the previous build is reused
+    env = dict(os.environ, PYTHONHASHSEED='0')
+    
     try:
-        subprocess.run(cmd, check=True)
-        print(f"Build completed successfully. Executable is at: {os.path.join(dist_dir, exe_name)}")
+        subprocess.run(cmd, check=True, env=env)
+        print(f"Build completed successfully. Executable is at: {dist_dir / 'BNSW' / exe_name}")
         return 0
     except subprocess.CalledProcessError as e:
-        print(f"Build failed with error: {str(e)}")
+        print(f"Build failed with error: {e}")
         return 1
     except Exception as e:
-        print(f"Unexpected error during build: {str(e)}")
+        print(f"Unexpected error during build: {e}")
         return 1
 
 if __name__ == '__main__':